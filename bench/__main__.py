@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+import tempfile
+from .fake_discord import DEFAULT_LATENCY
+from .scenarios import SCENARIOS
+
+
+async def run(scenarios, time_scale: float, latency: float):
+    print(f"Time scale {time_scale}: latencies and rate limit windows run {1 / time_scale:g}x faster than Discord.\n")
+    for name in scenarios:
+        with tempfile.TemporaryDirectory() as directory:
+            result = await SCENARIOS[name](directory, time_scale, default_latency=latency)
+        print(result.report() + "\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m bench",
+                                     description="Runs the bot against an in-process fake of Discord.")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append",
+                        help="Scenario to run, can be repeated. Runs every scenario by default.")
+    parser.add_argument("--time-scale", type=float, default=0.1,
+                        help="Factor applied to every latency and rate limit window.")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Seconds each REST request takes before scaling.")
+    args = parser.parse_args()
+    asyncio.run(run(args.scenario or list(SCENARIOS), args.time_scale, args.latency))
@@ -0,0 +1,574 @@
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import disnake
+from disnake.http import HTTPClient, Route
+from main import Keys, SATXBot
+
+_log = logging.getLogger("disnake.http")
+
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+INTERACTION_CALLBACK = "POST /interactions/{interaction_id}/{interaction_token}/callback"
+
+
+class RateLimit(NamedTuple):
+    """At most `limit` requests per `per` seconds."""
+    limit: int
+    per: float
+
+
+# Roughly what Discord enforces: 50 requests per second across the bot and 5 messages per 5 seconds in a channel.
+DEFAULT_GLOBAL_RATE_LIMIT = RateLimit(50, 1.0)
+DEFAULT_RATE_LIMITS = {
+    "POST /channels/{channel_id}/messages": RateLimit(5, 5.0),
+    "PATCH /channels/{channel_id}/messages/{message_id}": RateLimit(5, 5.0),
+}
+DEFAULT_LATENCY = 0.05
+
+
+class FakeResponse(NamedTuple):
+    status: int
+    reason: str
+    headers: Dict[str, str] = {}
+
+
+def _not_found(message: str) -> disnake.NotFound:
+    return disnake.NotFound(FakeResponse(404, "Not Found"), {"message": message, "code": 10000})
+
+
+def _path_pattern(path: str) -> "re.Pattern":
+    return re.compile(re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", path) + "$")
+
+
+_HANDLERS: Dict[Tuple[str, str], Tuple["re.Pattern", Callable]] = {}
+
+
+def _handles(method: str, path: str) -> Callable:
+    def register(handler: Callable) -> Callable:
+        _HANDLERS[(method, path)] = (_path_pattern(path), handler)
+        return handler
+    return register
+
+
+class FakeDiscord:
+    """
+    In-process stand-in for a single Discord guild. It keeps the users, roles, channels, messages and scheduled events
+    that the bot can see, answers REST requests with the payloads Discord would send, and feeds gateway events to a
+    connected bot.
+    """
+
+    def __init__(self, seed: int = 0, guild_id: Optional[int] = None):
+        self._ids = itertools.count(900_000_000_000_000_000)
+        self.random = random.Random(seed)
+        self.bot_user_id = self.snowflake()
+        self.guild_id = guild_id or self.snowflake()
+        self.users: Dict[int, dict] = {}
+        self.member_roles: Dict[int, set] = {}
+        self.roles: Dict[int, dict] = {}
+        self.channels: Dict[int, dict] = {}
+        self.dm_channels: Dict[int, int] = {}
+        self.messages: Dict[int, Dict[int, dict]] = defaultdict(dict)
+        self.events: Dict[int, dict] = {}
+        self.subscribers: Dict[int, List[int]] = {}
+        self.commands: Dict[Optional[int], List[dict]] = defaultdict(list)
+        self.unhandled: Counter = Counter()
+        self.bot: Optional[SATXBot] = None
+        self.add_user("Bench Bot", user_id=self.bot_user_id, bot=True)
+        self.roles[self.guild_id] = self._role_payload(self.guild_id, "@everyone", position=0)
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    """ World Building """
+
+    def add_user(self, name: Optional[str] = None, member: bool = True, user_id: Optional[int] = None,
+                 bot: bool = False) -> int:
+        user_id = user_id or self.snowflake()
+        self.users[user_id] = {"id": str(user_id), "username": name or f"user{len(self.users)}",
+                               "discriminator": "0001", "avatar": None, "bot": bot}
+        if member:
+            self.member_roles[user_id] = set()
+        return user_id
+
+    def add_role(self, name: str, member_ids: Iterable[int] = (), role_id: Optional[int] = None) -> int:
+        role_id = role_id or self.snowflake()
+        self.roles[role_id] = self._role_payload(role_id, name, position=len(self.roles))
+        for member_id in member_ids:
+            self.member_roles[member_id].add(role_id)
+        return role_id
+
+    def add_text_channel(self, name: str) -> int:
+        channel_id = self.snowflake()
+        self.channels[channel_id] = {"id": str(channel_id), "type": 0, "guild_id": str(self.guild_id), "name": name,
+                                     "position": len(self.channels), "permission_overwrites": [], "nsfw": False,
+                                     "parent_id": None, "topic": None, "rate_limit_per_user": 0,
+                                     "last_message_id": None}
+        return channel_id
+
+    def add_message(self, channel_id: int, content: str = "", message_id: Optional[int] = None) -> int:
+        message_id = message_id or self.snowflake()
+        self.messages[channel_id][message_id] = self._message_payload(message_id, channel_id, {"content": content})
+        return message_id
+
+    def add_thread(self, parent_id: int, name: str, thread_id: Optional[int] = None) -> int:
+        thread_id = thread_id or self.snowflake()
+        self.channels[thread_id] = {"id": str(thread_id), "type": 11, "guild_id": str(self.guild_id),
+                                    "parent_id": str(parent_id), "owner_id": str(self.bot_user_id), "name": name,
+                                    "thread_metadata": {"archived": False, "auto_archive_duration": 1440,
+                                                        "archive_timestamp": TIMESTAMP, "locked": False},
+                                    "message_count": 0, "member_count": 0, "rate_limit_per_user": 0,
+                                    "last_message_id": None}
+        return thread_id
+
+    def add_scheduled_event(self, name: str, creator_id: int, subscriber_ids: Iterable[int] = (),
+                            event_id: Optional[int] = None) -> int:
+        event_id = event_id or self.snowflake()
+        self.events[event_id] = {"id": str(event_id), "guild_id": str(self.guild_id), "channel_id": None,
+                                 "creator_id": str(creator_id), "name": name, "description": f"{name} description",
+                                 "scheduled_start_time": TIMESTAMP, "scheduled_end_time": None,
+                                 "privacy_level": 2, "status": 1, "entity_type": 3, "entity_id": None,
+                                 "entity_metadata": {"location": "Bench"}}
+        self.subscribers[event_id] = sorted(set(subscriber_ids) | {creator_id})
+        return event_id
+
+    """ Payloads """
+
+    @staticmethod
+    def _role_payload(role_id: int, name: str, position: int) -> dict:
+        return {"id": str(role_id), "name": name, "color": 0, "hoist": False, "position": position,
+                "permissions": "0", "managed": False, "mentionable": True}
+
+    def _member_payload(self, user_id: int, with_user: bool = True) -> dict:
+        member = {"roles": [str(role_id) for role_id in self.member_roles[user_id]], "joined_at": TIMESTAMP,
+                  "deaf": False, "mute": False, "nick": None}
+        if with_user:
+            member["user"] = self.users[user_id]
+        return member
+
+    def _event_payload(self, event_id: int, with_user_count: bool = False) -> dict:
+        event = dict(self.events[event_id])
+        if with_user_count:
+            event["user_count"] = len(self.subscribers[event_id])
+        return event
+
+    def _message_payload(self, message_id: int, channel_id: int, fields: dict) -> dict:
+        message = {"id": str(message_id), "channel_id": str(channel_id), "author": self.users[self.bot_user_id],
+                   "content": fields.get("content") or "", "embeds": fields.get("embeds") or [],
+                   "components": fields.get("components") or [], "attachments": [], "mentions": [],
+                   "mention_roles": [], "pinned": False, "mention_everyone": False, "tts": False, "type": 0,
+                   "timestamp": TIMESTAMP, "edited_timestamp": None}
+        if channel_id in self.channels:
+            message["guild_id"] = str(self.guild_id)
+        return message
+
+    def guild_payload(self) -> dict:
+        return {"id": str(self.guild_id), "name": "Bench Guild", "icon": None, "owner_id": str(self.bot_user_id),
+                "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+                "explicit_content_filter": 0, "mfa_level": 0, "features": [], "emojis": [], "stickers": [],
+                "roles": list(self.roles.values()),
+                "channels": [channel for channel in self.channels.values() if channel["type"] != 11],
+                "threads": [channel for channel in self.channels.values() if channel["type"] == 11],
+                "members": [self._member_payload(user_id) for user_id in self.member_roles],
+                "member_count": len(self.member_roles),
+                "guild_scheduled_events": [self._event_payload(event_id) for event_id in self.events],
+                "large": False}
+
+    """ REST """
+
+    def handle(self, route: Route, kwargs: Dict[str, Any]) -> Any:
+        route_key = (route.method, route.path)
+        if route_key not in _HANDLERS:
+            self.unhandled[f"{route.method} {route.path}"] += 1
+            return {}
+        pattern, handler = _HANDLERS[route_key]
+        match = pattern.search(route.url.split("?", 1)[0])
+        parameters = {name: int(value) if value.isdigit() else value for name, value in match.groupdict().items()}
+        return handler(self, kwargs.get("json") or {}, kwargs.get("params") or {}, **parameters)
+
+    @_handles("GET", "/guilds/{guild_id}")
+    def get_guild(self, body, params, guild_id):
+        return self.guild_payload()
+
+    @_handles("GET", "/guilds/{guild_id}/roles")
+    def get_roles(self, body, params, guild_id):
+        return list(self.roles.values())
+
+    @_handles("POST", "/guilds/{guild_id}/roles")
+    def create_role(self, body, params, guild_id):
+        role_id = self.add_role(body.get("name", "new role"))
+        self.roles[role_id].update({key: value for key, value in body.items() if key in self.roles[role_id]})
+        return self.roles[role_id]
+
+    @_handles("PATCH", "/guilds/{guild_id}/roles/{role_id}")
+    def edit_role(self, body, params, guild_id, role_id):
+        if role_id not in self.roles:
+            raise _not_found("Unknown Role")
+        self.roles[role_id].update(body)
+        return self.roles[role_id]
+
+    @_handles("DELETE", "/guilds/{guild_id}/roles/{role_id}")
+    def delete_role(self, body, params, guild_id, role_id):
+        if self.roles.pop(role_id, None) is None:
+            raise _not_found("Unknown Role")
+        for role_ids in self.member_roles.values():
+            role_ids.discard(role_id)
+
+    @_handles("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}")
+    def add_member_role(self, body, params, guild_id, user_id, role_id):
+        if role_id not in self.roles or user_id not in self.member_roles:
+            raise _not_found("Unknown Role")
+        self.member_roles[user_id].add(role_id)
+
+    @_handles("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}")
+    def remove_member_role(self, body, params, guild_id, user_id, role_id):
+        if role_id not in self.roles or user_id not in self.member_roles:
+            raise _not_found("Unknown Role")
+        self.member_roles[user_id].discard(role_id)
+
+    @_handles("GET", "/guilds/{guild_id}/scheduled-events")
+    def get_scheduled_events(self, body, params, guild_id):
+        return [self._event_payload(event_id, params.get("with_user_count")) for event_id in self.events]
+
+    @_handles("GET", "/guilds/{guild_id}/scheduled-events/{event_id}")
+    def get_scheduled_event(self, body, params, guild_id, event_id):
+        if event_id not in self.events:
+            raise _not_found("Unknown Guild Scheduled Event")
+        return self._event_payload(event_id, params.get("with_user_count"))
+
+    @_handles("GET", "/guilds/{guild_id}/scheduled-events/{event_id}/users")
+    def get_scheduled_event_users(self, body, params, guild_id, event_id):
+        if event_id not in self.events:
+            raise _not_found("Unknown Guild Scheduled Event")
+        after = int(params.get("after") or 0)
+        page = [user_id for user_id in self.subscribers[event_id] if user_id > after][:int(params.get("limit", 100))]
+        return [{"guild_scheduled_event_id": str(event_id), "user": self.users[user_id],
+                 "member": self._member_payload(user_id, with_user=False)} for user_id in page]
+
+    @_handles("GET", "/users/{user_id}")
+    def get_user(self, body, params, user_id):
+        if user_id not in self.users:
+            raise _not_found("Unknown User")
+        return self.users[user_id]
+
+    @_handles("POST", "/users/@me/channels")
+    def start_private_message(self, body, params):
+        user_id = int(body["recipient_id"])
+        if user_id not in self.dm_channels:
+            self.dm_channels[user_id] = self.snowflake()
+        return {"id": str(self.dm_channels[user_id]), "type": 1, "recipients": [self.users[user_id]],
+                "last_message_id": None}
+
+    @_handles("GET", "/channels/{channel_id}")
+    def get_channel(self, body, params, channel_id):
+        if channel_id not in self.channels:
+            raise _not_found("Unknown Channel")
+        return self.channels[channel_id]
+
+    @_handles("PATCH", "/channels/{channel_id}")
+    def edit_channel(self, body, params, channel_id):
+        if channel_id not in self.channels:
+            raise _not_found("Unknown Channel")
+        self.channels[channel_id].update({key: value for key, value in body.items() if key == "name"})
+        return self.channels[channel_id]
+
+    @_handles("POST", "/channels/{channel_id}/messages")
+    def send_message(self, body, params, channel_id):
+        message_id = self.snowflake()
+        self.messages[channel_id][message_id] = self._message_payload(message_id, channel_id, body)
+        return self.messages[channel_id][message_id]
+
+    @_handles("GET", "/channels/{channel_id}/messages/{message_id}")
+    def get_message(self, body, params, channel_id, message_id):
+        if message_id not in self.messages[channel_id]:
+            raise _not_found("Unknown Message")
+        return self.messages[channel_id][message_id]
+
+    @_handles("PATCH", "/channels/{channel_id}/messages/{message_id}")
+    def edit_message(self, body, params, channel_id, message_id):
+        if message_id not in self.messages[channel_id]:
+            raise _not_found("Unknown Message")
+        self.messages[channel_id][message_id].update(body, edited_timestamp=TIMESTAMP)
+        return self.messages[channel_id][message_id]
+
+    @_handles("DELETE", "/channels/{channel_id}/messages/{message_id}")
+    def delete_message(self, body, params, channel_id, message_id):
+        if self.messages[channel_id].pop(message_id, None) is None:
+            raise _not_found("Unknown Message")
+
+    @_handles("POST", "/channels/{channel_id}/messages/{message_id}/threads")
+    def start_thread_with_message(self, body, params, channel_id, message_id):
+        return self.channels[self.add_thread(channel_id, body.get("name", "thread"), thread_id=message_id)]
+
+    @_handles("GET", "/applications/{application_id}/commands")
+    def get_global_commands(self, body, params, application_id):
+        return self.commands[None]
+
+    @_handles("GET", "/applications/{application_id}/guilds/{guild_id}/commands")
+    def get_guild_commands(self, body, params, application_id, guild_id):
+        return self.commands[guild_id]
+
+    @_handles("PUT", "/applications/{application_id}/commands")
+    def bulk_upsert_global_commands(self, body, params, application_id):
+        return self._overwrite_commands(None, body)
+
+    @_handles("PUT", "/applications/{application_id}/guilds/{guild_id}/commands")
+    def bulk_upsert_guild_commands(self, body, params, application_id, guild_id):
+        return self._overwrite_commands(guild_id, body)
+
+    def _overwrite_commands(self, guild_id: Optional[int], commands: List[dict]) -> List[dict]:
+        self.commands[guild_id] = [{**command, "id": str(self.snowflake()), "application_id": str(self.bot_user_id),
+                                    "guild_id": None if guild_id is None else str(guild_id), "version": "1"}
+                                   for command in commands]
+        return self.commands[guild_id]
+
+    """ Gateway """
+
+    def connect(self, bot: SATXBot):
+        """
+        Does what READY and GUILD_CREATE would do: sets the bot user and fills the cache with the guild.
+        """
+        self.bot = bot
+        state = bot._connection
+        state.user = disnake.ClientUser(state=state, data=self.users[self.bot_user_id])
+        state.application_id = self.bot_user_id
+        state._add_guild_from_data(self.guild_payload())
+        bot.stats.rebuild(state.guilds)
+
+    def dispatch(self, event: str, payload: dict):
+        """
+        Feeds a raw gateway event to the bot as if it came over the websocket, e.g. "GUILD_SCHEDULED_EVENT_USER_ADD".
+        """
+        self.bot._connection.parsers[event](payload)
+
+    def subscribe(self, event_id: int, user_id: int):
+        self.subscribers[event_id] = sorted(set(self.subscribers[event_id]) | {user_id})
+        self.dispatch("GUILD_SCHEDULED_EVENT_USER_ADD", {"guild_scheduled_event_id": str(event_id),
+                                                         "user_id": str(user_id), "guild_id": str(self.guild_id)})
+
+    def update_world(self, event: str, payload: dict):
+        """
+        Applies a raw gateway event to the fake guild so that later REST requests see its effect.
+        """
+        if event in ("GUILD_SCHEDULED_EVENT_CREATE", "GUILD_SCHEDULED_EVENT_UPDATE"):
+            event_id = int(payload["id"])
+            self.events[event_id] = {key: value for key, value in payload.items() if key != "user_count"}
+            self.subscribers.setdefault(event_id, [])
+        elif event == "GUILD_SCHEDULED_EVENT_DELETE":
+            self.events.pop(int(payload["id"]), None)
+        elif event in ("GUILD_SCHEDULED_EVENT_USER_ADD", "GUILD_SCHEDULED_EVENT_USER_REMOVE"):
+            event_id, user_id = int(payload["guild_scheduled_event_id"]), int(payload["user_id"])
+            subscribers = set(self.subscribers.get(event_id, ()))
+            if event == "GUILD_SCHEDULED_EVENT_USER_ADD":
+                subscribers.add(user_id)
+            else:
+                subscribers.discard(user_id)
+            self.subscribers[event_id] = sorted(subscribers)
+
+
+class FakeHTTPClient(HTTPClient):
+    """
+    disnake HTTP client that answers from a FakeDiscord instead of the network. Like the real client it serializes
+    requests per rate limit bucket and sleeps out 429s itself, logging the same warnings, and it adds a configurable
+    latency to each route. `time_scale` speeds up every latency and rate limit window by the same factor.
+    """
+
+    def __init__(self, discord: FakeDiscord, *args,
+                 latencies: Optional[Dict[str, float]] = None,
+                 default_latency: float = DEFAULT_LATENCY,
+                 rate_limits: Optional[Dict[str, RateLimit]] = None,
+                 global_rate_limit: Optional[RateLimit] = DEFAULT_GLOBAL_RATE_LIMIT,
+                 time_scale: float = 1.0,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.discord = discord
+        self.latencies = latencies or {}
+        self.default_latency = default_latency
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.global_rate_limit = global_rate_limit
+        self.time_scale = time_scale
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self.request_seconds: Dict[str, List[float]] = defaultdict(list)
+        self._bucket_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._windows: Dict[str, List[float]] = {}
+        # Interaction responses are sent with this session by disnake's webhook adapter.
+        self._HTTPClient__session = FakeSession(self)
+
+    def latency(self, route_name: str) -> float:
+        latency = self.latencies.get(route_name, self.default_latency)
+        return latency * self.discord.random.uniform(0.8, 1.2) * self.time_scale
+
+    def _retry_after(self, key: str, rate_limit: Optional[RateLimit]) -> float:
+        """
+        Takes a request from a fixed window of `rate_limit`, returning how long to wait if the window is used up.
+        """
+        if rate_limit is None:
+            return 0.0
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or window[0] <= now:
+            window = self._windows[key] = [now + rate_limit.per * self.time_scale, 0]
+        if window[1] >= rate_limit.limit:
+            return window[0] - now
+        window[1] += 1
+        return 0.0
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:
+        route_name = f"{route.method} {route.path}"
+        start = time.perf_counter()
+        async with self._bucket_locks[route.bucket]:
+            while True:
+                await self._global_over.wait()
+                retry_after = self._retry_after(route.bucket, self.rate_limits.get(route_name))
+                if retry_after:
+                    self.rate_limited[route_name] += 1
+                    _log.warning('We are being rate limited. Retrying in %.2f seconds. Handled under the bucket "%s"',
+                                 retry_after, route.bucket)
+                    await asyncio.sleep(retry_after)
+                    continue
+                retry_after = self._retry_after("global", self.global_rate_limit)
+                if retry_after:
+                    self.rate_limited["global"] += 1
+                    _log.warning("Global rate limit has been hit. Retrying in %.2f seconds.", retry_after)
+                    self._global_over.clear()
+                    await asyncio.sleep(retry_after)
+                    self._global_over.set()
+                    continue
+                break
+            await asyncio.sleep(self.latency(route_name))
+            self.calls[route_name] += 1
+            try:
+                return self.discord.handle(route, kwargs)
+            finally:
+                self.request_seconds[route_name].append(time.perf_counter() - start)
+
+    async def close(self):
+        pass
+
+
+def create_bot(discord: FakeDiscord, keys: Keys, **http_options) -> SATXBot:
+    """
+    Builds the real bot with all of its cogs on top of a FakeHTTPClient and connects it to the fake guild.
+    Must be called from inside the running event loop.
+    """
+    original_http_client = disnake.client.HTTPClient
+    disnake.client.HTTPClient = functools.partial(FakeHTTPClient, discord, **http_options)
+    try:
+        intents = disnake.Intents.default()
+        intents.members = True
+        bot = SATXBot(keys.BOT_PREFIX, keys, intents=intents, owner_id=keys.BOT_OWNER_ID,
+                      test_guilds=[keys.TEST_SERVER_ID], sync_commands=False)
+    finally:
+        disnake.client.HTTPClient = original_http_client
+    discord.connect(bot)
+    return bot
+
+
+class FakeWebhookResponse:
+    def __init__(self, http: FakeHTTPClient, route_name: str, status: int, body: str):
+        self.http = http
+        self.route_name = route_name
+        self.status = status
+        self.reason = "OK"
+        self.headers = {"Content-Type": "application/json"}
+        self.body = body
+
+    async def __aenter__(self) -> "FakeWebhookResponse":
+        start = time.perf_counter()
+        await asyncio.sleep(self.http.latency(self.route_name))
+        self.http.calls[self.route_name] += 1
+        self.http.request_seconds[self.route_name].append(time.perf_counter() - start)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self.body
+
+
+class FakeSession:
+    """
+    Stands in for the aiohttp session that interaction responses and followups are sent through.
+    """
+
+    def __init__(self, http: FakeHTTPClient):
+        self.http = http
+
+    def request(self, method: str, url: str, data: Any = None, **kwargs: Any) -> FakeWebhookResponse:
+        path = url.split(Route.BASE, 1)[-1]
+        if path.endswith("/callback"):
+            return FakeWebhookResponse(self.http, INTERACTION_CALLBACK, 204, "")
+        webhook_path = re.sub(r"^/webhooks/\d+/[^/]+", "/webhooks/{webhook_id}/{webhook_token}", path)
+        fields = json.loads(data) if isinstance(data, str) else {}
+        message = self.http.discord._message_payload(self.http.discord.snowflake(), 0, fields)
+        return FakeWebhookResponse(self.http, f"{method} {re.sub(r'/[0-9]+', '/{message_id}', webhook_path)}", 200,
+                                   json.dumps(message))
+
+    async def close(self):
+        pass
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, **fields):
+        await self.interaction.respond(**fields)
+        self._done = True
+
+    async def defer(self, *args, **kwargs):
+        await self._respond()
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await self._respond(content=content)
+
+    async def edit_message(self, content: Optional[str] = None, **kwargs):
+        await self._respond(content=content)
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        await self.interaction.respond(content=content)
+
+
+class FakeInteraction:
+    """
+    Interaction responses go through a webhook session instead of the HTTP client, so slash commands and button
+    clicks are driven with this stand-in. It only records what the bot replied, after the interaction latency.
+    """
+
+    def __init__(self, http: FakeHTTPClient, author: disnake.abc.User, guild: Optional[disnake.Guild] = None,
+                 channel_id: Optional[int] = None, custom_id: Optional[str] = None):
+        self.http = http
+        self.id = http.discord.snowflake()
+        self.author = author
+        self.guild = guild
+        self.channel_id = channel_id
+        self.channel = guild.get_channel_or_thread(channel_id) if guild and channel_id else None
+        self.data = SimpleNamespace(custom_id=custom_id)
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.replies: List[Optional[str]] = []
+
+    async def respond(self, content: Optional[str] = None):
+        await asyncio.sleep(self.http.latency(INTERACTION_CALLBACK))
+        self.replies.append(content)
+
+    async def edit_original_message(self, content: Optional[str] = None, **kwargs):
+        await self.respond(content=content)
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from cogs.scheduled_events.rsvp_state import RsvpState
+from util.gateway_trace import TraceEntry, read_trace
+from .fake_discord import DEFAULT_LATENCY
+from .scenarios import BenchGuild, percentile, start_bot, stop_bot
+
+EVENT_PAYLOADS = ("GUILD_SCHEDULED_EVENT_CREATE", "GUILD_SCHEDULED_EVENT_UPDATE", "GUILD_SCHEDULED_EVENT_DELETE")
+
+
+def trace_user_ids(header: dict, entries: List[TraceEntry]) -> set:
+    user_ids = {creator_id for _, _, creator_id, _, _ in header.get("rsvp_lists", [])}
+    for _, event, data in entries:
+        if event in EVENT_PAYLOADS and data.get("creator_id"):
+            user_ids.add(int(data["creator_id"]))
+        elif event == "INTERACTION_CREATE":
+            user = (data.get("member") or {}).get("user") or data.get("user")
+            if user:
+                user_ids.add(int(user["id"]))
+        elif "user_id" in data:
+            user_ids.add(int(data["user_id"]))
+    return user_ids
+
+
+def trace_guild_id(header: dict) -> int:
+    """
+    The guild that is replayed. The fake Discord has one guild, so a trace of several configured guilds replays the
+    first. Older traces name their only guild.
+    """
+    return int(header["guild_id"]) if "guild_id" in header else int(header["guild_ids"][0])
+
+
+def trace_records(header: dict) -> Dict[int, List[int]]:
+    """
+    The [thread ID, message ID, role ID] of every event recorded in the traced guild when the trace started.
+    """
+    guild_id = trace_guild_id(header)
+    return {event_id: record for event_id, record_guild_id, *record in header.get("event_records", [])
+            if record_guild_id == guild_id}
+
+
+def build_guild(header: dict, entries: List[TraceEntry]) -> BenchGuild:
+    """
+    Recreates the guild as it was when the trace started: every user in the trace is a member, tracked events have
+    their thread, announcement and role, and events that the trace only updates already exist.
+    """
+    guild = BenchGuild(members=0, guild_id=trace_guild_id(header))
+    discord = guild.discord
+    for user_id in trace_user_ids(header, entries):
+        discord.add_user(user_id=user_id)
+
+    first_payloads: Dict[int, dict] = {}
+    created = set()
+    unsubscribed_first: Dict[int, set] = defaultdict(set)
+    subscribed = set()
+    for _, event, data in entries:
+        if event in EVENT_PAYLOADS and int(data["id"]) not in first_payloads:
+            first_payloads[int(data["id"])] = data
+            if event == "GUILD_SCHEDULED_EVENT_CREATE":
+                created.add(int(data["id"]))
+        elif event.startswith("GUILD_SCHEDULED_EVENT_USER"):
+            event_id, user_id = int(data["guild_scheduled_event_id"]), int(data["user_id"])
+            if event.endswith("REMOVE") and (event_id, user_id) not in subscribed:
+                unsubscribed_first[event_id].add(user_id)
+            subscribed.add((event_id, user_id))
+            first_payloads.setdefault(event_id, None)
+
+    records = trace_records(header)
+    for event_id, payload in first_payloads.items():
+        if event_id in created:
+            continue
+        subscriber_ids = unsubscribed_first[event_id]
+        name = payload["name"] if payload else f"[ATX] Event {event_id}"
+        creator_id = int(payload.get("creator_id") or guild.owner_id) if payload else guild.owner_id
+        discord.add_scheduled_event(name, creator_id, subscriber_ids, event_id=event_id)
+        if payload:
+            discord.update_world("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+        if event_id in records:
+            thread_id, message_id, role_id = records[event_id]
+            discord.add_message(guild.events_channel_id, f"New event: {name}", message_id=message_id)
+            discord.add_thread(guild.events_channel_id, name, thread_id=thread_id)
+            discord.add_role(name, subscriber_ids, role_id=role_id)
+    for event_id, (thread_id, message_id, role_id) in records.items():
+        if event_id not in discord.events:
+            # Tracked but gone from the guild, which only a startup reconciliation would notice.
+            discord.add_thread(guild.events_channel_id, f"Event {event_id}", thread_id=thread_id)
+            discord.add_role(f"Event {event_id}", role_id=role_id)
+    for event_id, _, creator_id, list_channel_id, list_message_id in header.get("rsvp_lists", []):
+        discord.dm_channels[creator_id] = list_channel_id
+        discord.add_message(list_channel_id, message_id=list_message_id)
+    return guild
+
+
+class ReplayResult:
+    def __init__(self, trace_path: str, speed: float):
+        self.trace_path = trace_path
+        self.speed = speed
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.elapsed = 0.0
+        self.errors = 0
+        self.rest_requests = 0
+        self.rate_limited = 0
+
+    def summary(self) -> dict:
+        return {"trace": self.trace_path,
+                "speed": self.speed,
+                "elapsed": round(self.elapsed, 4),
+                "events_per_second": round(sum(map(len, self.latencies.values())) / self.elapsed, 2)
+                if self.elapsed else 0.0,
+                "errors": self.errors,
+                "rest_requests": self.rest_requests,
+                "rate_limited": self.rate_limited,
+                "events": {event: {"count": len(latencies),
+                                   "p50": round(percentile(latencies, 0.5), 4),
+                                   "p99": round(percentile(latencies, 0.99), 4)}
+                           for event, latencies in sorted(self.latencies.items())}}
+
+
+async def replay(trace_path: str, directory: str, speed: float, time_scale: float, latency: float) -> ReplayResult:
+    """
+    Feeds every payload of a trace to the bot through its gateway parsers, `speed` times faster than it was recorded
+    or as fast as possible when `speed` is 0. The latency of an entry is how long the listeners it started took.
+    """
+    header, entries = read_trace(trace_path)
+    # The fake Discord has one guild, so payloads from the bot's other guilds are left out.
+    guild_id = str(trace_guild_id(header))
+    entries = [entry for entry in entries if entry[2].get("guild_id", guild_id) == guild_id]
+    guild = build_guild(header, entries)
+    bot, cog = await start_bot(guild, directory, time_scale, default_latency=latency)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+    for event_id, (thread_id, message_id, role_id) in trace_records(header).items():
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, thread_id, message_id, role_id)
+    for rsvp_list in header.get("rsvp_lists", []):
+        cog.rsvp_states[rsvp_list[0]] = RsvpState(*rsvp_list)
+        cog.rsvp_states[rsvp_list[0]].attach(cog.rsvp_totals)
+        await cog.event_records.backend.upsert_rsvp_list(*rsvp_list)
+
+    result = ReplayResult(trace_path, speed)
+    notify_bot_owner = bot.notify_bot_owner
+
+    async def count_error(error):
+        result.errors += 1
+        await notify_bot_owner(error)
+    bot.notify_bot_owner = count_error
+
+    async def measure(event: str, dispatched_at: float, listeners: set):
+        await asyncio.gather(*listeners, return_exceptions=True)
+        result.latencies[event].append(time.perf_counter() - dispatched_at)
+
+    measurements = []
+    start = time.perf_counter()
+    for offset, event, data in entries:
+        if speed:
+            await asyncio.sleep(max(0.0, start + offset / speed - time.perf_counter()))
+        if event == "INTERACTION_CREATE":
+            data = {**data, "token": "replay"}
+        guild.discord.update_world(event, data)
+        before = asyncio.all_tasks()
+        dispatched_at = time.perf_counter()
+        guild.discord.dispatch(event, data)
+        measurements.append(asyncio.create_task(measure(event, dispatched_at, asyncio.all_tasks() - before)))
+    await asyncio.gather(*measurements)
+    result.elapsed = time.perf_counter() - start
+
+    await stop_bot(bot, cog)
+    result.rest_requests = sum(bot.http.calls.values())
+    result.rate_limited = sum(bot.http.rate_limited.values())
+    return result
+
+
+def format_summary(summary: dict, baseline: Optional[dict] = None) -> str:
+    def compare(value: float, baseline_value: Optional[float]) -> str:
+        if baseline_value is None:
+            return f"{value * 1000:9.1f}"
+        return f"{baseline_value * 1000:9.1f} -> {value * 1000:9.1f}"
+
+    baseline_events = baseline["events"] if baseline else {}
+    lines = [f"{summary['trace']} at {'max speed' if not summary['speed'] else str(summary['speed']) + 'x'}: "
+             f"{summary['elapsed']:.2f}s, {summary['events_per_second']} events/s, "
+             f"{summary['rest_requests']} REST requests, {summary['rate_limited']} rate limited, "
+             f"{summary['errors']} errors"]
+    if baseline:
+        lines.append(f"baseline {baseline['trace']}: {baseline['elapsed']:.2f}s, "
+                     f"{baseline['events_per_second']} events/s, {baseline['rest_requests']} REST requests")
+    lines.append(f"{'event':<36}{'count':>7}  {'p50 ms':>9}  {'p99 ms':>9}")
+    for event, stats in summary["events"].items():
+        baseline_stats = baseline_events.get(event, {})
+        lines.append(f"{event:<36}{stats['count']:>7}  {compare(stats['p50'], baseline_stats.get('p50'))}  "
+                     f"{compare(stats['p99'], baseline_stats.get('p99'))}")
+    return "\n".join(lines)
+
+
+async def main(args: argparse.Namespace):
+    with tempfile.TemporaryDirectory() as directory:
+        result = await replay(args.trace, directory, args.speed, args.time_scale, args.latency)
+    summary = result.summary()
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_summary(summary, baseline))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m bench.replay",
+                                     description="Replays a recorded gateway trace against an in-process fake of Discord.")
+    parser.add_argument("trace", help="JSONL trace written by the GATEWAY_TRACE_FILE recorder.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed relative to the recording, or 0 to replay as fast as possible.")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Factor applied to every fake REST latency and rate limit window.")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Seconds each REST request takes before scaling.")
+    parser.add_argument("--summary", help="Write the results as JSON to this path to compare builds later.")
+    parser.add_argument("--compare", help="Summary JSON of an earlier replay to show side by side.")
+    main_args = parser.parse_args()
+    asyncio.run(main(main_args))
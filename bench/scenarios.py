@@ -0,0 +1,596 @@
+import asyncio
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import yaml
+from cogs.scheduled_events.rsvp_state import RsvpState, RsvpStatus
+from cogs.scheduled_events.rsvp_view import rsvp_custom_id
+from cogs.scheduled_events.scheduled_events import (DEFAULT_EVENT_RENAME_WINDOW, DEFAULT_RSVP_DIGEST_INTERVAL,
+                                                    DEFAULT_RSVP_FAN_OUT_CONCURRENCY, DEFAULT_RSVP_LIST_EDIT_WINDOW,
+                                                    ScheduledEventCog)
+from main import Keys, SATXBot
+from util.metrics import metrics
+from util.rest_scheduler import INTERACTIVE, PRIORITY_NAMES, rest_priority
+from .fake_discord import FakeDiscord, FakeHTTPClient, FakeInteraction, create_bot
+
+METROPLEXES = ("ATX", "DTX", "SATX", "HTX", "CSTAT", "FW")
+# Each DM to a new subscriber costs two requests (opening the DM channel and sending), so this stays under the
+# global rate limit of 50 requests per second.
+BENCH_RSVP_DMS_PER_SECOND = 25
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Exact nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class ScenarioResult:
+    """
+    Operations completed by a scenario, how long they took end to end, and the latency of each one.
+    """
+
+    def __init__(self, name: str, unit: str, latencies: List[float], elapsed: float, http: FakeHTTPClient,
+                 notes: Optional[Dict[str, object]] = None):
+        self.name = name
+        self.unit = unit
+        self.latencies = latencies
+        self.elapsed = elapsed
+        self.http = http
+        self.notes = notes or {}
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        rest_seconds = [seconds for route in self.http.request_seconds.values() for seconds in route]
+        lines = [f"{self.name}",
+                 f"  {len(self.latencies)} {self.unit} in {self.elapsed:.2f}s ({self.throughput:.1f} {self.unit}/s)",
+                 f"  latency p50 {percentile(self.latencies, 0.5) * 1000:.1f} ms, "
+                 f"p99 {percentile(self.latencies, 0.99) * 1000:.1f} ms",
+                 f"  REST: {len(rest_seconds)} requests, {sum(self.http.rate_limited.values())} rate limited, "
+                 f"p50 {percentile(rest_seconds, 0.5) * 1000:.1f} ms, p99 {percentile(rest_seconds, 0.99) * 1000:.1f} ms"]
+        lines += [f"  {name}: {value}" for name, value in self.notes.items()]
+        if self.http.discord.unhandled:
+            lines.append(f"  unhandled routes: {dict(self.http.discord.unhandled)}")
+        return "\n".join(lines)
+
+
+class BenchGuild:
+    """
+    A fake guild set up the way the scheduled events cog expects it, with an events channel and metroplex roles.
+    """
+
+    def __init__(self, members: int, seed: int = 0, guild_id: Optional[int] = None):
+        self.discord = FakeDiscord(seed, guild_id)
+        self.owner_id = self.discord.add_user("owner")
+        self.member_ids = [self.discord.add_user() for _ in range(members)]
+        self.events_channel_id = self.discord.add_text_channel("irl-events")
+        self.metroplex_roles = {metroplex: self.discord.add_role(metroplex) for metroplex in METROPLEXES}
+
+    def add_tracked_event(self, name: str, creator_id: int, subscriber_ids: List[int],
+                          role_holder_ids: List[int]) -> Tuple[int, int, int, int]:
+        """
+        Adds an event as it looks after the bot announced it: an announcement message with a thread and an event role.
+        """
+        event_id = self.discord.add_scheduled_event(name, creator_id, subscriber_ids)
+        message_id = self.discord.add_message(self.events_channel_id, f"New event: {name}")
+        thread_id = self.discord.add_thread(self.events_channel_id, name, thread_id=message_id)
+        role_id = self.discord.add_role(name, role_holder_ids)
+        return event_id, thread_id, message_id, role_id
+
+
+async def start_bot(guild: BenchGuild, directory: str, time_scale: float, **http_options
+                    ) -> Tuple[SATXBot, ScheduledEventCog]:
+    keys = Keys(BOT_TOKEN="bench", BOT_ID=guild.discord.bot_user_id, BOT_OWNER_ID=guild.owner_id,
+                BOT_NAME="Bench Bot", BOT_PREFIX="!", TEST_SERVER_ID=guild.discord.guild_id,
+                TEST_SERVER_MOD_ID=guild.owner_id)
+    bot = create_bot(guild.discord, keys, time_scale=time_scale, **http_options)
+    if bot.rest_scheduler.bulk_rate:
+        bot.rest_scheduler.bulk_rate /= time_scale
+    cog: ScheduledEventCog = bot.get_cog("ScheduledEventCog")
+    cog.event_config_path = os.path.join(directory, "event_config.yaml")
+    cog.event_records_path = os.path.join(directory, "event_records.db")
+    cog.legacy_event_records_path = os.path.join(directory, "event_records.yaml")
+    with open(cog.event_config_path, "w") as f:
+        yaml.safe_dump({"irl_events_channel_id": guild.events_channel_id,
+                        "metroplex_roles": guild.metroplex_roles,
+                        "rsvp_dms_per_second": BENCH_RSVP_DMS_PER_SECOND / time_scale,
+                        "rsvp_fan_out_concurrency": DEFAULT_RSVP_FAN_OUT_CONCURRENCY,
+                        "rsvp_list_edit_window": DEFAULT_RSVP_LIST_EDIT_WINDOW * time_scale,
+                        "event_rename_window": DEFAULT_EVENT_RENAME_WINDOW * time_scale,
+                        "rsvp_digest_interval": DEFAULT_RSVP_DIGEST_INTERVAL * time_scale}, f)
+    return bot, cog
+
+
+async def stop_bot(bot: SATXBot, cog: ScheduledEventCog):
+    for rsvp_list_editor in cog.rsvp_list_editors.values():
+        await rsvp_list_editor.flush()
+    for event_renamer in cog.event_renamers.values():
+        await event_renamer.flush()
+    if cog.event_records:
+        await cog.send_rsvp_digests()
+    if cog.event_records:
+        await cog.event_records.backend.close()
+    for name in list(bot.cogs):
+        bot.remove_cog(name)
+    await bot.close()
+
+
+async def send_rsvp_scenario(directory: str, time_scale: float, subscribers: int = 2000, **http_options
+                             ) -> ScenarioResult:
+    """
+    The host of an event with `subscribers` interested users runs /send_rsvp. Latency is how long each subscriber
+    waited for their RSVP DM after the command was used.
+    """
+    guild = BenchGuild(subscribers + 1)
+    host_id, subscriber_ids = guild.member_ids[0], guild.member_ids[1:]
+    event_id, thread_id, message_id, role_id = guild.add_tracked_event("[SATX] Bench Meetup", host_id, subscriber_ids,
+                                                                        subscriber_ids)
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+    await cog.event_records.add_event(event_id, guild.discord.guild_id, thread_id, message_id, role_id)
+
+    delivered: List[float] = []
+    send_rsvp_message = cog.send_rsvp_message
+
+    async def timed_send_rsvp_message(event, subscriber, **kwargs):
+        message = await send_rsvp_message(event, subscriber, **kwargs)
+        delivered.append(time.perf_counter() - start)
+        return message
+    cog.send_rsvp_message = timed_send_rsvp_message
+
+    discord_guild = bot.get_guild(guild.discord.guild_id)
+    inter = FakeInteraction(bot.http, discord_guild.get_member(host_id), discord_guild, thread_id)
+    start = time.perf_counter()
+    await cog.send_rsvp.callback(cog, inter)
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    return ScenarioResult(f"send_rsvp to {subscribers} subscribers", "DMs", delivered, elapsed, bot.http,
+                          {"reply": inter.replies[-1]})
+
+
+async def startup_scenario(directory: str, time_scale: float, events: int = 500, **http_options) -> ScenarioResult:
+    """
+    The bot starts with `events` tracked events. A few subscribers are missing their event role, a few role holders
+    have unsubscribed, some tracked events were deleted while the bot was offline and some events were never
+    announced. Latency is per REST request made during startup.
+    """
+    guild = BenchGuild(members=max(100, events * 2))
+    random = guild.discord.random
+    records = []
+    for i in range(events):
+        subscriber_ids = random.sample(guild.member_ids, 10)
+        role_holder_ids = subscriber_ids[2:] + random.sample(guild.member_ids, 1)
+        creator_id = subscriber_ids[0]
+        records.append(guild.add_tracked_event(f"[{METROPLEXES[i % len(METROPLEXES)]}] Event {i}", creator_id,
+                                               subscriber_ids, role_holder_ids))
+    deleted = [guild.add_tracked_event(f"[ATX] Deleted {i}", guild.owner_id, [], []) for i in range(events // 25)]
+    for event_id, *_ in deleted:
+        del guild.discord.events[event_id]
+    for i in range(events // 100):
+        guild.discord.add_scheduled_event(f"[DTX] Unannounced {i}", guild.owner_id)
+
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    # Write the records the previous run of the bot would have left behind.
+    await cog.read_from_event_records()
+    for event_id, *record in records + deleted:
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, *record)
+    await cog.event_records.backend.close()
+    cog.event_records = None
+
+    start = time.perf_counter()
+    await cog.on_ready()
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    rest_seconds = [seconds for route in bot.http.request_seconds.values() for seconds in route]
+    return ScenarioResult(f"startup with {events} tracked events", "requests", rest_seconds, elapsed, bot.http,
+                          {"events purged": sum(event_id not in cog.event_records for event_id, *_ in deleted),
+                           "roles added": bot.http.calls["PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}"],
+                           "roles removed":
+                               bot.http.calls["DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}"]})
+
+
+async def rsvp_clicks_scenario(directory: str, time_scale: float, clicks: int = 300, **http_options
+                               ) -> ScenarioResult:
+    """
+    `clicks` RSVP button clicks arrive at once, a sixth of them from users changing an earlier answer.
+    Latency is how long the bot took to handle each click.
+    """
+    guild = BenchGuild(members=clicks)
+    random = guild.discord.random
+    host_id = guild.owner_id
+    event_id, thread_id, message_id, role_id = guild.add_tracked_event("[HTX] Bench Party", host_id,
+                                                                        guild.member_ids, guild.member_ids)
+    list_channel_id = guild.discord.snowflake()
+    guild.discord.dm_channels[host_id] = list_channel_id
+    list_message_id = guild.discord.add_message(list_channel_id)
+
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+    await cog.event_records.add_event(event_id, guild.discord.guild_id, thread_id, message_id, role_id)
+    cog.rsvp_states[event_id] = RsvpState(event_id, "[HTX] Bench Party", host_id, list_channel_id, list_message_id)
+    cog.rsvp_states[event_id].attach(cog.rsvp_totals)
+    await cog.event_records.backend.upsert_rsvp_list(event_id, "[HTX] Bench Party", host_id, list_channel_id,
+                                                     list_message_id)
+
+    discord_guild = bot.get_guild(guild.discord.guild_id)
+    clickers = guild.member_ids[:clicks - clicks // 6] + random.sample(guild.member_ids, clicks // 6)
+    latencies: List[float] = []
+
+    async def click(user_id: int):
+        inter = FakeInteraction(bot.http, discord_guild.get_member(user_id),
+                                custom_id=rsvp_custom_id(event_id, random.choice(list(RsvpStatus))))
+        click_start = time.perf_counter()
+        await cog.on_button_click(inter)
+        latencies.append(time.perf_counter() - click_start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[click(user_id) for user_id in clickers])
+    elapsed = time.perf_counter() - start
+    rsvp_list_editor = cog.rsvp_list_editors[event_id]
+    immediate_notifications = bot.http.calls["POST /channels/{channel_id}/messages"]
+    await stop_bot(bot, cog)
+    digests = bot.http.calls["POST /channels/{channel_id}/messages"] - immediate_notifications
+    return ScenarioResult(f"burst of {clicks} RSVP clicks", "clicks", latencies, elapsed, bot.http,
+                          {"RSVP list edits": f"{rsvp_list_editor.flushed} for {rsvp_list_editor.requested} changes",
+                           "host notifications": f"{immediate_notifications} immediate, {digests} digests"})
+
+
+async def renames_scenario(directory: str, time_scale: float, events: int = 50, renames: int = 5, **http_options
+                           ) -> ScenarioResult:
+    """
+    The hosts of `events` events each fix their event's name `renames` times in a row. Latency is how long after the
+    last rename each event's role, thread, and announcement were given the final name.
+    """
+    guild = BenchGuild(members=10)
+    tracked = [guild.add_tracked_event(f"[ATX] Event {i}", guild.owner_id, [], []) for i in range(events)]
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+    discord_guild = bot.get_guild(guild.discord.guild_id)
+    for event_id, *record in tracked:
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, *record)
+        # Fill the artifact cache the way announcing the event would have.
+        await cog.resolve_event_artifacts(discord_guild.get_scheduled_event(event_id))
+    fetches_before = bot.http.calls["GET /channels/{channel_id}/messages/{message_id}"]
+
+    renamed: List[float] = []
+    rename_event_role_and_thread = cog.rename_event_role_and_thread
+
+    async def timed_rename(event_id: int):
+        await rename_event_role_and_thread(event_id)
+        renamed.append(time.perf_counter() - last_renamed)
+    cog.rename_event_role_and_thread = timed_rename
+
+    start = time.perf_counter()
+    for n in range(renames):
+        for event_id, *_ in tracked:
+            payload = {**guild.discord.events[event_id], "name": f"[ATX] Event {event_id} v{n + 1}"}
+            guild.discord.update_world("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+            guild.discord.dispatch("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+        await asyncio.sleep(0)
+    last_renamed = time.perf_counter()
+    while len(renamed) < events and time.perf_counter() - last_renamed < 60 * time_scale + cog.event_rename_window:
+        await asyncio.sleep(cog.event_rename_window / 10)
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    final_names = {f"[ATX] Event {event_id} v{renames}" for event_id, *_ in tracked}
+    return ScenarioResult(f"{renames} renames of each of {events} events", "events", renamed, elapsed, bot.http,
+                          {"roles with the final name":
+                               sum(role["name"] in final_names for role in guild.discord.roles.values()),
+                           "role edits": bot.http.calls["PATCH /guilds/{guild_id}/roles/{role_id}"],
+                           "message fetches":
+                               bot.http.calls["GET /channels/{channel_id}/messages/{message_id}"] - fetches_before})
+
+
+async def clicks_during_startup_scenario(directory: str, time_scale: float, events: int = 300, clicks: int = 20,
+                                        **http_options) -> ScenarioResult:
+    """
+    A few users keep changing their RSVP to a small event while startup reconciliation adds thousands of event roles.
+    Latency is how long the bot took to handle each click, including notifying the host.
+    """
+    guild = BenchGuild(members=max(100, events * 2))
+    random = guild.discord.random
+    records = [guild.add_tracked_event(f"[ATX] Event {i}", guild.owner_id, random.sample(guild.member_ids, 10), [])
+               for i in range(events)]
+    host_id, clicker_ids = guild.member_ids[0], guild.member_ids[1:6]
+    small_event_id, *small_record = guild.add_tracked_event("[HTX] Small Meetup", host_id, clicker_ids, clicker_ids)
+    list_channel_id = guild.discord.snowflake()
+    guild.discord.dm_channels[host_id] = list_channel_id
+    list_message_id = guild.discord.add_message(list_channel_id)
+
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    for event_id, *record in records + [(small_event_id, *small_record)]:
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, *record)
+    cog.rsvp_states[small_event_id] = RsvpState(small_event_id, "[HTX] Small Meetup", host_id, list_channel_id,
+                                                list_message_id)
+    cog.rsvp_states[small_event_id].attach(cog.rsvp_totals)
+    for key in [key for key in metrics.histograms if key[0] == "rest_queue_seconds"]:
+        del metrics.histograms[key]
+
+    discord_guild = bot.get_guild(guild.discord.guild_id)
+    latencies: List[float] = []
+
+    async def click(user_id: int):
+        inter = FakeInteraction(bot.http, discord_guild.get_member(user_id),
+                                custom_id=rsvp_custom_id(small_event_id, random.choice(list(RsvpStatus))))
+        click_start = time.perf_counter()
+        # Interactions that arrive over the gateway get this priority from prioritize_interactions.
+        with rest_priority(INTERACTIVE):
+            await cog.on_button_click(inter)
+        latencies.append(time.perf_counter() - click_start)
+
+    start = time.perf_counter()
+    startup = asyncio.create_task(cog.on_ready())
+    click_tasks = []
+    for i in range(clicks):
+        await asyncio.sleep(2.0 * time_scale)
+        click_tasks.append(asyncio.create_task(click(clicker_ids[i % len(clicker_ids)])))
+    await asyncio.gather(startup, *click_tasks)
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    queue_seconds = metrics.histograms_named("rest_queue_seconds")
+    return ScenarioResult(f"{clicks} RSVP clicks during startup with {events} tracked events", "clicks", latencies,
+                          elapsed, bot.http,
+                          {f"{PRIORITY_NAMES[priority]} queue p99":
+                               f"{queue_seconds[(('priority', name),)].quantile(0.99) * 1000:.0f} ms "
+                               f"({queue_seconds[(('priority', name),)].count} requests)"
+                           for priority, name in PRIORITY_NAMES.items() if (('priority', name),) in queue_seconds})
+
+
+async def resume_send_rsvp_scenario(directory: str, time_scale: float, subscribers: int = 1000, **http_options
+                                    ) -> ScenarioResult:
+    """
+    The bot stops halfway through /send_rsvp for an event with `subscribers` interested users and is started again.
+    Latency is how long each remaining subscriber waited for their RSVP DM after the restart.
+    """
+    guild = BenchGuild(subscribers + 1)
+    host_id, subscriber_ids = guild.member_ids[0], guild.member_ids[1:]
+    event_id, thread_id, message_id, role_id = guild.add_tracked_event("[DTX] Bench Meetup", host_id, subscriber_ids,
+                                                                        subscriber_ids)
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+    await cog.event_records.add_event(event_id, guild.discord.guild_id, thread_id, message_id, role_id)
+    discord_guild = bot.get_guild(guild.discord.guild_id)
+    inter = FakeInteraction(bot.http, discord_guild.get_member(host_id), discord_guild, thread_id)
+    send_rsvp = asyncio.create_task(cog.send_rsvp.callback(cog, inter))
+    while not cog.job_queue.jobs:
+        await asyncio.sleep(time_scale)
+    job = next(iter(cog.job_queue.jobs.values()))
+    while job.done < subscribers // 2:
+        await asyncio.sleep(time_scale)
+    send_rsvp.cancel()
+    await asyncio.gather(send_rsvp, return_exceptions=True)
+    sent_before_restart = job.done
+    await stop_bot(bot, cog)
+
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    delivered: List[float] = []
+    send_rsvp_message = cog.send_rsvp_message
+
+    async def timed_send_rsvp_message(event, subscriber, **kwargs):
+        message = await send_rsvp_message(event, subscriber, **kwargs)
+        delivered.append(time.perf_counter() - start)
+        return message
+    cog.send_rsvp_message = timed_send_rsvp_message
+
+    start = time.perf_counter()
+    await cog.on_ready()
+    await asyncio.gather(*cog.job_queue.running())
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    dms = Counter(user_id for user_id in subscriber_ids
+                  for _ in guild.discord.messages[guild.discord.dm_channels.get(user_id)].values())
+    return ScenarioResult(f"send_rsvp to {subscribers} subscribers resumed after a restart", "DMs", delivered, elapsed,
+                          bot.http, {"sent before the restart": sent_before_restart,
+                                     "subscribers DMed": f"{len(dms)}/{len(subscriber_ids)}",
+                                     "subscribers DMed twice": sum(count > 1 for count in dms.values()),
+                                     "unfinished jobs": len(cog.job_queue)})
+
+
+async def reminders_scenario(directory: str, time_scale: float, events: int = 100, subscribers: int = 10,
+                             offsets: Tuple[float, ...] = (30.0, 10.0), **http_options) -> ScenarioResult:
+    """
+    `events` events with RSVPs start 90 to 150 seconds from now and half of each event's `subscribers` have not
+    RSVPed. A tenth of the events are moved 20 seconds later after startup. Latency is how late each reminder started
+    after it was due.
+    """
+    guild = BenchGuild(members=max(100, events * 2))
+    random = guild.discord.random
+    now = time.time()
+    tracked = []
+    for i in range(events):
+        subscriber_ids = random.sample(guild.member_ids, subscribers)
+        event_id, *record = guild.add_tracked_event(f"[SATX] Event {i}", guild.owner_id, subscriber_ids, subscriber_ids)
+        start_time = now + (90 + 60 * i / events) * time_scale
+        guild.discord.events[event_id]["scheduled_start_time"] = iso_timestamp(start_time)
+        tracked.append((event_id, record, subscriber_ids))
+
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    with open(cog.event_config_path) as f:
+        config = yaml.safe_load(f)
+    with open(cog.event_config_path, "w") as f:
+        yaml.safe_dump({**config, "rsvp_reminder_offsets": [offset * time_scale for offset in offsets]}, f)
+    await cog.read_from_event_records()
+    rsvped = set()
+    for event_id, record, subscriber_ids in tracked:
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, *record)
+        rsvp_state = RsvpState(event_id, f"Event {event_id}", guild.owner_id, guild.discord.snowflake(),
+                               guild.discord.snowflake())
+        for user_id in subscriber_ids[:subscribers // 2]:
+            rsvp_state.set_status(user_id, RsvpStatus.GOING)
+            rsvped.add((event_id, user_id))
+        cog.rsvp_states[event_id] = rsvp_state
+        rsvp_state.attach(cog.rsvp_totals)
+
+    unrsvped = subscribers - subscribers // 2
+    lateness: List[float] = []
+    remind_to_rsvp = cog.remind_to_rsvp
+
+    async def timed_remind_to_rsvp(event_id: int, offset: float, start_time: float):
+        lateness.append(time.time() - (start_time - offset))
+        await remind_to_rsvp(event_id, offset, start_time)
+    cog.remind_to_rsvp = timed_remind_to_rsvp
+    reminded: List[Tuple[int, int]] = []
+    send_rsvp_message = cog.send_rsvp_message
+
+    async def record_reminder(event, subscriber, **kwargs):
+        reminded.append((event.id, subscriber.id))
+        return await send_rsvp_message(event, subscriber, **kwargs)
+    cog.send_rsvp_message = record_reminder
+
+    start = time.perf_counter()
+    await cog.on_ready()
+    requests_after_startup = sum(bot.http.calls.values())
+    for i in range(0, events, 10):
+        event_id = tracked[i][0]
+        payload = {**guild.discord.events[event_id],
+                   "scheduled_start_time": iso_timestamp(now + (110 + 60 * i / events) * time_scale)}
+        guild.discord.update_world("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+        guild.discord.dispatch("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+    while time.time() < now + 170 * time_scale or cog.job_queue.running():
+        await asyncio.gather(asyncio.sleep(time_scale), *cog.job_queue.running())
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    return ScenarioResult(f"RSVP reminders at {len(offsets)} offsets for {events} events", "reminders", lateness,
+                          elapsed, bot.http,
+                          {"reminder DMs": f"{len(reminded)} of {len(offsets) * events * unrsvped} expected",
+                           "reminders to users who RSVPed": sum(reminder in rsvped for reminder in reminded),
+                           "REST requests after startup": sum(bot.http.calls.values()) - requests_after_startup,
+                           "subscriber page fetches":
+                               bot.http.calls["GET /guilds/{guild_id}/scheduled-events/{event_id}/users"]})
+
+
+async def event_races_scenario(directory: str, time_scale: float, events: int = 50, updates: int = 3,
+                               subscribers: int = 5, **http_options) -> ScenarioResult:
+    """
+    `events` events are created at once and each is edited `updates` times right away, while `subscribers` users
+    subscribe to it and each subscription is delivered twice. Latency is how long each event took to settle.
+    """
+    guild = BenchGuild(members=max(100, subscribers * 2))
+    random = guild.discord.random
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    await cog.read_event_config()
+
+    async def settle(event_id: int, listeners: set, dispatched_at: float):
+        await asyncio.gather(*listeners, return_exceptions=True)
+        settled[event_id] = time.perf_counter() - dispatched_at
+
+    def dispatch(event: str, payload: dict) -> set:
+        before = asyncio.all_tasks()
+        guild.discord.update_world(event, payload)
+        guild.discord.dispatch(event, payload)
+        return asyncio.all_tasks() - before
+
+    settled: Dict[int, float] = {}
+    settling = []
+    start = time.perf_counter()
+    for i in range(events):
+        dispatched_at = time.perf_counter()
+        event_id = guild.discord.add_scheduled_event(f"[{METROPLEXES[i % len(METROPLEXES)]}] Race {i}", guild.owner_id)
+        payload = guild.discord.events[event_id]
+        listeners = dispatch("GUILD_SCHEDULED_EVENT_CREATE", payload)
+        for n in range(updates):
+            payload = {**payload, "description": f"Edit {n + 1}"}
+            listeners |= dispatch("GUILD_SCHEDULED_EVENT_UPDATE", payload)
+        for user_id in random.sample(guild.member_ids, subscribers):
+            for _ in range(2):
+                listeners |= dispatch("GUILD_SCHEDULED_EVENT_USER_ADD", {"guild_scheduled_event_id": str(event_id),
+                                                                         "user_id": str(user_id),
+                                                                         "guild_id": str(guild.discord.guild_id)})
+        settling.append(asyncio.create_task(settle(event_id, listeners, dispatched_at)))
+    await asyncio.gather(*settling)
+    elapsed = time.perf_counter() - start
+    await stop_bot(bot, cog)
+    role_names = Counter(role["name"] for role in guild.discord.roles.values())
+    thread_names = Counter(channel["name"] for channel in guild.discord.channels.values() if channel["type"] == 11)
+    race_names = [event["name"] for event in guild.discord.events.values()]
+    return ScenarioResult(f"{events} events created with {updates} quick edits and duplicate subscriptions", "events",
+                          list(settled.values()), elapsed, bot.http,
+                          {"duplicate roles": sum(max(role_names[name] - 1, 0) for name in race_names),
+                           "duplicate threads": sum(max(thread_names[name] - 1, 0) for name in race_names),
+                           "role pings": bot.http.calls["PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}"],
+                           "gateway events coalesced": cog.event_dispatcher.coalesced})
+
+
+async def restarts_scenario(directory: str, time_scale: float, restarts: int = 5, events: int = 50, **http_options
+                            ) -> ScenarioResult:
+    """
+    The bot is deployed and then restarted `restarts` times without changing its commands. Latency is how long each
+    restart took from connecting to the gateway until commands were synced and startup reconciliation was done.
+    """
+    guild = BenchGuild(members=max(100, events * 2))
+    random = guild.discord.random
+    records = []
+    for i in range(events):
+        subscriber_ids = random.sample(guild.member_ids, 10)
+        records.append(guild.add_tracked_event(f"[{METROPLEXES[i % len(METROPLEXES)]}] Event {i}", subscriber_ids[0],
+                                               subscriber_ids, subscriber_ids))
+    bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+    await cog.read_from_event_records()
+    for event_id, *record in records:
+        await cog.event_records.add_event(event_id, guild.discord.guild_id, *record)
+    await stop_bot(bot, cog)
+
+    async def start() -> Tuple[float, float, FakeHTTPClient]:
+        before = asyncio.all_tasks()
+        bot, cog = await start_bot(guild, directory, time_scale, **http_options)
+        preparation = next(task for task in asyncio.all_tasks() - before
+                           if task.get_name() == "disnake: app_command_preparation")
+        bot._sync_commands = True
+        bot.command_sync_cache.path = os.path.join(directory, "command_sync.json")
+        started_at = time.perf_counter()
+        bot._first_connect.set()
+        await asyncio.gather(preparation, cog.on_ready())
+        seconds = time.perf_counter() - started_at
+        await stop_bot(bot, cog)
+        sync_seconds = sum(seconds for name, _, seconds in bot.startup.phases if name == "command sync")
+        return seconds, sync_seconds, bot.http
+
+    def command_requests(http: FakeHTTPClient) -> int:
+        return sum(calls for route, calls in http.calls.items() if "/commands" in route)
+
+    deploy_seconds, deploy_sync_seconds, deploy_http = await start()
+    restart_seconds, sync_seconds = [], []
+    start_time = time.perf_counter()
+    for _ in range(restarts):
+        seconds, sync, http = await start()
+        restart_seconds.append(seconds)
+        sync_seconds.append(sync)
+    elapsed = time.perf_counter() - start_time
+    return ScenarioResult(f"{restarts} restarts with {events} tracked events and unchanged commands", "restarts",
+                          restart_seconds, elapsed, http,
+                          {"first start": f"{deploy_seconds * 1000:.1f} ms, command sync "
+                                          f"{deploy_sync_seconds * 1000:.1f} ms with {command_requests(deploy_http)} "
+                                          f"requests",
+                           "command sync per restart": f"p50 {percentile(sync_seconds, 0.5) * 1000:.1f} ms with "
+                                                       f"{command_requests(http)} requests"})
+
+
+def iso_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[ScenarioResult]]] = {
+    "send_rsvp": send_rsvp_scenario,
+    "startup": startup_scenario,
+    "rsvp_clicks": rsvp_clicks_scenario,
+    "renames": renames_scenario,
+    "clicks_during_startup": clicks_during_startup_scenario,
+    "resume_send_rsvp": resume_send_rsvp_scenario,
+    "reminders": reminders_scenario,
+    "event_races": event_races_scenario,
+    "restarts": restarts_scenario,
+}
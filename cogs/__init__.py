@@ -1,4 +1,5 @@
 cogs_to_include = [
     "scheduled_events.scheduled_events",
+    "bot_info.bot_info",
     # "test_cog.test_cog"
 ]
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import disnake
+from disnake import ApplicationCommandInteraction as AppCmdInter
+from disnake.ext import commands, tasks
+from typing import Dict, List
+from main import SATXBot
+from util import botinfo, logger
+from util.metrics import Histogram, Labels, metrics, sample_event_loop
+
+EMBED_FIELD_LIMIT = 1024
+
+
+class BotInfoCog(commands.Cog):
+    def __init__(self, bot: SATXBot):
+        self.bot = bot
+        self.sample_metrics.start()
+        if self.bot.keys.METRICS_FILE:
+            self.write_metrics_file.start()
+
+    def cog_unload(self):
+        self.sample_metrics.cancel()
+        self.write_metrics_file.cancel()
+
+    @tasks.loop(seconds=5)
+    async def sample_metrics(self):
+        await sample_event_loop()
+        for name, value in self.bot.stats.snapshot().items():
+            metrics.set_gauge("bot_stats", value, stat=name)
+
+    @tasks.loop(seconds=60)
+    async def write_metrics_file(self):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, metrics.write_prometheus,
+                                                             self.bot.keys.METRICS_FILE)
+        except OSError as e:
+            logger.warning(f"Could not write the metrics file {self.bot.keys.METRICS_FILE}: {e!r}")
+
+    @commands.slash_command(name="bot_metrics", description="Show the bot's latency and performance metrics.")
+    async def command_bot_metrics(self, inter: AppCmdInter):
+        if inter.author.id != self.bot.keys.BOT_OWNER_ID:
+            await inter.response.send_message("Only the bot owner can use this command.", ephemeral=True)
+            return
+
+        embed = disnake.Embed(title=f"{self.bot.keys.BOT_NAME} Metrics")
+        embed.add_field(name="Bot", inline=False, value=", ".join(
+            [f"Ping: {botinfo.get_bot_ping(self.bot)} ms"] +
+            [f"{name}: {value}" for name, value in self.bot.stats.snapshot().items()]))
+        embed.add_field(name="Commands (p50 / p99)", inline=False,
+                        value=format_histograms(metrics.histograms_named("command_seconds"), "command"))
+        embed.add_field(name="Listeners (p50 / p99)", inline=False,
+                        value=format_histograms(metrics.histograms_named("listener_seconds"), "listener"))
+
+        requests = metrics.counters_named("rest_requests_total")
+        rate_limits = metrics.counters_named("rest_rate_limits_total")
+        busiest_routes = sorted(requests.items(), key=lambda item: item[1], reverse=True)[:10]
+        embed.add_field(name="REST", inline=False, value=truncate_lines(
+            [f"{int(sum(requests.values()))} requests, {int(sum(rate_limits.values()))} rate limited"] +
+            [f"`{dict(labels)['route']}`: {int(count)}" for labels, count in busiest_routes]))
+        embed.add_field(name="REST Queue (p50 / p99)", inline=False,
+                        value=format_histograms(metrics.histograms_named("rest_queue_seconds"), "priority"))
+
+        queue_depths = metrics.gauges_named("dispatch_queue_depth")
+        deepest_queues = sorted(queue_depths.items(), key=lambda item: item[1], reverse=True)[:10]
+        coalesced = metrics.counters_named("dispatch_coalesced_total")
+        embed.add_field(name="Event Queues", inline=False, value=truncate_lines(
+            [f"{len(queue_depths)} busy, {int(sum(coalesced.values()))} duplicates coalesced"] +
+            [f"`{dict(labels)['key']}`: {int(depth)} queued" for labels, depth in deepest_queues]))
+        embed.add_field(name="Event Queue Wait (p50 / p99)", inline=False,
+                        value=format_histograms(metrics.histograms_named("dispatch_wait_seconds"), "dispatcher"))
+
+        lag = metrics.histograms_named("event_loop_lag_seconds").get(())
+        ready_callbacks = metrics.gauges.get(("event_loop_ready_callbacks", ()), 0)
+        embed.add_field(name="Event Loop", inline=False, value=(
+            f"Queued callbacks: {int(ready_callbacks)}, "
+            f"lag p99: {format_seconds(lag.quantile(0.99) if lag else 0)}"))
+
+        resolver_stats = self.bot.resolver.stats()
+        embed.add_field(name="Resolver", inline=False, value=(
+            f"Hit rate: {resolver_stats['hit_rate']:.0%} ({resolver_stats['gateway_hits']} gateway, "
+            f"{resolver_stats['cache_hits']} cached, {resolver_stats['rest_calls']} REST)"))
+        await inter.response.send_message(embed=embed, ephemeral=True)
+
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+
+def format_histograms(histograms: Dict[Labels, Histogram], label: str) -> str:
+    slowest = sorted(histograms.items(), key=lambda item: item[1].quantile(0.99), reverse=True)
+    return truncate_lines([f"`{dict(labels)[label]}`: {format_seconds(histogram.quantile(0.5))} / "
+                           f"{format_seconds(histogram.quantile(0.99))} ({histogram.count} calls)"
+                           for labels, histogram in slowest])
+
+
+def truncate_lines(lines: List[str]) -> str:
+    value = ""
+    for line in lines:
+        if len(value) + len(line) + 1 > EMBED_FIELD_LIMIT:
+            break
+        value += line + "\n"
+    return value or "* *"
+
+
+def setup(bot: SATXBot):
+    bot.add_cog(BotInfoCog(bot))
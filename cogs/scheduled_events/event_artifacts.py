@@ -0,0 +1,58 @@
+from typing import Dict, Optional
+import disnake
+
+
+class EventArtifacts:
+    """
+    The thread, announcement message, and role of one event as the bot last saw them, and the name they were given.
+    """
+    __slots__ = ("name", "thread", "message", "role")
+
+    def __init__(self, name: str, thread: disnake.Thread, message: disnake.Message, role: disnake.Role):
+        self.name = name
+        self.thread = thread
+        self.message = message
+        self.role = role
+
+    def __repr__(self):
+        return (f"EventArtifacts(name={self.name!r}, thread_id={self.thread.id}, message_id={self.message.id}, "
+                f"role_id={self.role.id})")
+
+
+class EventArtifactCache:
+    """
+    Keeps the objects needed to edit an event's thread, announcement, and role so that a rename only sends the edits.
+    Entries are added when an event is announced or first resolved, and the cog keeps them up to date from the
+    gateway. An entry is dropped when any of its objects is deleted, so a stale object is never edited.
+    """
+
+    def __init__(self):
+        self._artifacts: Dict[int, EventArtifacts] = {}
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._artifacts
+
+    def __len__(self) -> int:
+        return len(self._artifacts)
+
+    def get(self, event_id: int) -> Optional[EventArtifacts]:
+        return self._artifacts.get(event_id)
+
+    def add(self, event_id: int, name: str, thread: disnake.Thread, message: disnake.Message,
+            role: disnake.Role) -> EventArtifacts:
+        artifacts = EventArtifacts(name, thread, message, role)
+        self._artifacts[event_id] = artifacts
+        return artifacts
+
+    def pop(self, event_id: int) -> Optional[EventArtifacts]:
+        return self._artifacts.pop(event_id, None)
+
+    def update_thread(self, event_id: int, thread: disnake.Thread):
+        artifacts = self._artifacts.get(event_id)
+        if artifacts:
+            artifacts.thread = thread
+
+    def update_role(self, event_id: int, role: disnake.Role):
+        artifacts = self._artifacts.get(event_id)
+        if artifacts:
+            artifacts.role = role
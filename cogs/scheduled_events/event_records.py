@@ -0,0 +1,589 @@
+import asyncio
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import yaml
+from util import logger
+
+EVENT_RECORDS_DB = "./cogs/scheduled_events/event_records.db"
+LEGACY_EVENT_RECORDS_YAML = "./cogs/scheduled_events/event_records.yaml"
+
+# Each entry upgrades the schema by one version, tracked with PRAGMA user_version.
+_SCHEMA_MIGRATIONS: List[str] = [
+    """
+    CREATE TABLE events (
+        event_id   INTEGER PRIMARY KEY,
+        thread_id  INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        role_id    INTEGER NOT NULL
+    );
+    CREATE UNIQUE INDEX events_thread ON events (thread_id);
+    CREATE UNIQUE INDEX events_message ON events (message_id);
+    CREATE UNIQUE INDEX events_role ON events (role_id);
+    """,
+    """
+    CREATE TABLE rsvp_lists (
+        event_id   INTEGER PRIMARY KEY,
+        event_name TEXT NOT NULL,
+        creator_id INTEGER NOT NULL,
+        channel_id INTEGER NOT NULL,
+        message_id INTEGER NOT NULL
+    );
+    CREATE TABLE rsvp_statuses (
+        event_id INTEGER NOT NULL,
+        user_id  INTEGER NOT NULL,
+        status   INTEGER NOT NULL,
+        PRIMARY KEY (event_id, user_id)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE rsvp_messages (
+        event_id   INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        channel_id INTEGER NOT NULL,
+        failures   INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (event_id, message_id)
+    ) WITHOUT ROWID;
+    """,
+    # Events recorded before the bot ran in several guilds have no guild until assign_guild() claims them.
+    """
+    ALTER TABLE events ADD COLUMN guild_id INTEGER;
+    CREATE INDEX events_guild ON events (guild_id);
+    """,
+    # RSVP changes that have not been sent to the event creator in a digest yet.
+    """
+    CREATE TABLE rsvp_notifications (
+        event_id INTEGER NOT NULL,
+        user_id  INTEGER NOT NULL,
+        status   INTEGER NOT NULL,
+        PRIMARY KEY (event_id, user_id)
+    ) WITHOUT ROWID;
+    """,
+    # Bulk operations that resume after a restart. Items are JSON and their state is pending, done, or failed.
+    """
+    CREATE TABLE jobs (
+        job_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind       TEXT NOT NULL,
+        guild_id   INTEGER NOT NULL,
+        params     TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE job_items (
+        job_id INTEGER NOT NULL,
+        item   TEXT NOT NULL,
+        state  INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (job_id, item)
+    ) WITHOUT ROWID;
+    """,
+    # The last RSVP reminder sent for each event, so a restart only sends the reminders it missed.
+    """
+    CREATE TABLE rsvp_reminders (
+        event_id        INTEGER PRIMARY KEY,
+        start_time      REAL NOT NULL,
+        reminder_offset REAL NOT NULL
+    );
+    """,
+    # Orders RSVP changes waiting for a digest, so sending a digest only forgets the changes it included.
+    """
+    ALTER TABLE rsvp_notifications ADD COLUMN seq INTEGER NOT NULL DEFAULT 0;
+    """,
+]
+
+
+class RecordsBackend(ABC):
+    """
+    Persistent storage for the event records. Every write touches only the row that changed.
+    """
+
+    @abstractmethod
+    async def load(self) -> Dict[int, Tuple[Optional[int], int, int, int]]:
+        """Returns {event ID: (guild ID, thread ID, message ID, role ID)} for every stored event."""
+
+    @abstractmethod
+    async def upsert_event(self, event_id: int, guild_id: int, thread_id: int, message_id: int, role_id: int):
+        ...
+
+    @abstractmethod
+    async def assign_guild(self, guild_id: int) -> int:
+        """Moves every event that has no guild yet into the guild and returns how many there were."""
+
+    @abstractmethod
+    async def delete_event(self, event_id: int):
+        ...
+
+    @abstractmethod
+    async def load_rsvp_lists(self) -> List[Tuple[int, str, int, int, int]]:
+        """Returns (event ID, event name, creator ID, list channel ID, list message ID) for every RSVP list."""
+
+    @abstractmethod
+    async def load_rsvp_statuses(self) -> List[Tuple[int, int, int]]:
+        """Returns (event ID, user ID, status) for every recorded RSVP."""
+
+    @abstractmethod
+    async def upsert_rsvp_list(self, event_id: int, event_name: str, creator_id: int, channel_id: int,
+                               message_id: int):
+        ...
+
+    @abstractmethod
+    async def set_rsvp_status(self, event_id: int, user_id: int, status: int,
+                              notify_in_digest: bool = False) -> Optional[int]:
+        """
+        Records the RSVP and, with notify_in_digest, keeps it for the creator's next digest in the same write. Returns
+        the sequence number of the digest change, which is higher than that of every change stored before it.
+        """
+
+    @abstractmethod
+    async def load_rsvp_notifications(self) -> List[Tuple[int, int, int, int]]:
+        """Returns (event ID, user ID, status, sequence number) for every RSVP change waiting for a digest."""
+
+    @abstractmethod
+    async def delete_rsvp_notifications(self, notifications: List[Tuple[int, int]], up_to_seq: int):
+        """
+        Forgets the sent (event ID, user ID) changes, keeping any that changed again after the sequence number.
+        """
+
+    @abstractmethod
+    async def delete_rsvps(self, event_id: int):
+        ...
+
+    @abstractmethod
+    async def load_sent_reminders(self) -> List[Tuple[int, float, float]]:
+        """Returns (event ID, start time, offset) of the last RSVP reminder sent for each event."""
+
+    @abstractmethod
+    async def set_reminder_sent(self, event_id: int, start_time: float, offset: float):
+        ...
+
+    @abstractmethod
+    async def add_rsvp_message(self, event_id: int, channel_id: int, message_id: int):
+        ...
+
+    @abstractmethod
+    async def load_rsvp_messages(self, event_id: int) -> List[Tuple[int, int]]:
+        """Returns (DM channel ID, message ID) for every RSVP message sent for the event."""
+
+    @abstractmethod
+    async def load_rsvp_message_event_ids(self) -> List[int]:
+        """Returns every event that still has RSVP messages waiting to be deleted."""
+
+    @abstractmethod
+    async def delete_rsvp_messages(self, event_id: int, message_ids: List[int]):
+        ...
+
+    @abstractmethod
+    async def record_rsvp_message_failures(self, event_id: int, message_ids: List[int], max_failures: int):
+        """Counts a failed deletion for each message and forgets any message that has failed max_failures times."""
+
+    @abstractmethod
+    async def create_job(self, kind: str, guild_id: int, params: str, created_at: float, items: List[str]) -> int:
+        """Stores the job with all of its items pending and returns its ID."""
+
+    @abstractmethod
+    async def load_jobs(self) -> List[Tuple[int, str, int, str, float, int, int, int]]:
+        """Returns (job ID, kind, guild ID, params, created at, pending, done, failed) for every stored job."""
+
+    @abstractmethod
+    async def load_job_items(self, job_id: int, state: int) -> List[str]:
+        ...
+
+    @abstractmethod
+    async def set_job_items_state(self, job_id: int, items: List[str], state: int):
+        ...
+
+    @abstractmethod
+    async def set_job_params(self, job_id: int, params: str):
+        """Replaces the job's params, which runners use to checkpoint steps that are not items."""
+
+    @abstractmethod
+    async def delete_job(self, job_id: int):
+        ...
+
+    async def close(self):
+        pass
+
+
+class SqliteRecordsBackend(RecordsBackend):
+    """
+    Stores the event records in a SQLite database in WAL mode.
+
+    All queries run on a single background thread so that disk I/O never blocks the event loop and writes are applied
+    in the order they were issued.
+    """
+
+    def __init__(self, path: str = EVENT_RECORDS_DB):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-records")
+        self._connection: sqlite3.Connection = None
+        self._notification_seq: Optional[int] = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._migrate_schema(self._connection)
+        return self._connection
+
+    @staticmethod
+    def _migrate_schema(connection: sqlite3.Connection):
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        for new_version, script in enumerate(_SCHEMA_MIGRATIONS[version:], start=version + 1):
+            connection.executescript(f"BEGIN; {script} PRAGMA user_version = {new_version}; COMMIT;")
+
+    def _execute(self, query: str, *params):
+        connection = self._connect()
+        with connection:
+            return connection.execute(query, params).fetchall()
+
+    def _executemany(self, query: str, rows: List[tuple]):
+        connection = self._connect()
+        with connection:
+            connection.executemany(query, rows)
+
+    async def load(self) -> Dict[int, Tuple[Optional[int], int, int, int]]:
+        rows = await self._run(self._execute,
+                               "SELECT event_id, guild_id, thread_id, message_id, role_id FROM events")
+        return {event_id: (guild_id, thread_id, message_id, role_id)
+                for event_id, guild_id, thread_id, message_id, role_id in rows}
+
+    async def upsert_event(self, event_id: int, guild_id: int, thread_id: int, message_id: int, role_id: int):
+        await self._run(self._execute,
+                        "INSERT INTO events (event_id, guild_id, thread_id, message_id, role_id) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (event_id) DO UPDATE SET guild_id = excluded.guild_id, "
+                        "thread_id = excluded.thread_id, message_id = excluded.message_id, role_id = excluded.role_id",
+                        event_id, guild_id, thread_id, message_id, role_id)
+
+    async def assign_guild(self, guild_id: int) -> int:
+        def assign():
+            connection = self._connect()
+            with connection:
+                return connection.execute("UPDATE events SET guild_id = ? WHERE guild_id IS NULL",
+                                          (guild_id,)).rowcount
+        return await self._run(assign)
+
+    async def delete_event(self, event_id: int):
+        await self._run(self._execute, "DELETE FROM events WHERE event_id = ?", event_id)
+
+    async def load_rsvp_lists(self) -> List[Tuple[int, str, int, int, int]]:
+        return await self._run(self._execute,
+                               "SELECT event_id, event_name, creator_id, channel_id, message_id FROM rsvp_lists")
+
+    async def load_rsvp_statuses(self) -> List[Tuple[int, int, int]]:
+        return await self._run(self._execute, "SELECT event_id, user_id, status FROM rsvp_statuses")
+
+    async def upsert_rsvp_list(self, event_id: int, event_name: str, creator_id: int, channel_id: int,
+                               message_id: int):
+        await self._run(self._execute,
+                        "INSERT OR REPLACE INTO rsvp_lists (event_id, event_name, creator_id, channel_id, message_id) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        event_id, event_name, creator_id, channel_id, message_id)
+
+    async def set_rsvp_status(self, event_id: int, user_id: int, status: int,
+                              notify_in_digest: bool = False) -> Optional[int]:
+        def set_status() -> Optional[int]:
+            connection = self._connect()
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO rsvp_statuses (event_id, user_id, status) VALUES (?, ?, ?)",
+                                   (event_id, user_id, status))
+                if not notify_in_digest:
+                    return None
+                # Writes run one at a time on the executor thread, so the counter only needs reading once.
+                if self._notification_seq is None:
+                    self._notification_seq = connection.execute(
+                        "SELECT COALESCE(MAX(seq), 0) FROM rsvp_notifications").fetchone()[0]
+                self._notification_seq += 1
+                connection.execute("INSERT OR REPLACE INTO rsvp_notifications (event_id, user_id, status, seq) "
+                                   "VALUES (?, ?, ?, ?)", (event_id, user_id, status, self._notification_seq))
+                return self._notification_seq
+        return await self._run(set_status)
+
+    async def load_rsvp_notifications(self) -> List[Tuple[int, int, int, int]]:
+        return await self._run(self._execute, "SELECT event_id, user_id, status, seq FROM rsvp_notifications")
+
+    async def delete_rsvp_notifications(self, notifications: List[Tuple[int, int]], up_to_seq: int):
+        await self._run(self._executemany,
+                        "DELETE FROM rsvp_notifications WHERE event_id = ? AND user_id = ? AND seq <= ?",
+                        [(event_id, user_id, up_to_seq) for event_id, user_id in notifications])
+
+    async def delete_rsvps(self, event_id: int):
+        def delete():
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM rsvp_statuses WHERE event_id = ?", (event_id,))
+                connection.execute("DELETE FROM rsvp_notifications WHERE event_id = ?", (event_id,))
+                connection.execute("DELETE FROM rsvp_lists WHERE event_id = ?", (event_id,))
+                connection.execute("DELETE FROM rsvp_reminders WHERE event_id = ?", (event_id,))
+        await self._run(delete)
+
+    async def load_sent_reminders(self) -> List[Tuple[int, float, float]]:
+        return await self._run(self._execute, "SELECT event_id, start_time, reminder_offset FROM rsvp_reminders")
+
+    async def set_reminder_sent(self, event_id: int, start_time: float, offset: float):
+        await self._run(self._execute,
+                        "INSERT OR REPLACE INTO rsvp_reminders (event_id, start_time, reminder_offset) "
+                        "VALUES (?, ?, ?)",
+                        event_id, start_time, offset)
+
+    async def add_rsvp_message(self, event_id: int, channel_id: int, message_id: int):
+        await self._run(self._execute,
+                        "INSERT OR REPLACE INTO rsvp_messages (event_id, message_id, channel_id) VALUES (?, ?, ?)",
+                        event_id, message_id, channel_id)
+
+    async def load_rsvp_messages(self, event_id: int) -> List[Tuple[int, int]]:
+        return await self._run(self._execute,
+                               "SELECT channel_id, message_id FROM rsvp_messages WHERE event_id = ?", event_id)
+
+    async def load_rsvp_message_event_ids(self) -> List[int]:
+        rows = await self._run(self._execute, "SELECT DISTINCT event_id FROM rsvp_messages")
+        return [event_id for event_id, in rows]
+
+    async def delete_rsvp_messages(self, event_id: int, message_ids: List[int]):
+        await self._run(self._executemany, "DELETE FROM rsvp_messages WHERE event_id = ? AND message_id = ?",
+                        [(event_id, message_id) for message_id in message_ids])
+
+    async def record_rsvp_message_failures(self, event_id: int, message_ids: List[int], max_failures: int):
+        def record():
+            connection = self._connect()
+            with connection:
+                connection.executemany("UPDATE rsvp_messages SET failures = failures + 1 "
+                                       "WHERE event_id = ? AND message_id = ?",
+                                       [(event_id, message_id) for message_id in message_ids])
+                connection.execute("DELETE FROM rsvp_messages WHERE event_id = ? AND failures >= ?",
+                                   (event_id, max_failures))
+        await self._run(record)
+
+    async def create_job(self, kind: str, guild_id: int, params: str, created_at: float, items: List[str]) -> int:
+        def create():
+            connection = self._connect()
+            with connection:
+                job_id = connection.execute("INSERT INTO jobs (kind, guild_id, params, created_at) VALUES (?, ?, ?, ?)",
+                                            (kind, guild_id, params, created_at)).lastrowid
+                connection.executemany("INSERT OR IGNORE INTO job_items (job_id, item) VALUES (?, ?)",
+                                       [(job_id, item) for item in items])
+            return job_id
+        return await self._run(create)
+
+    async def load_jobs(self) -> List[Tuple[int, str, int, str, float, int, int, int]]:
+        return await self._run(self._execute,
+                               "SELECT jobs.job_id, kind, guild_id, params, created_at, "
+                               "COUNT(CASE state WHEN 0 THEN 1 END), COUNT(CASE state WHEN 1 THEN 1 END), "
+                               "COUNT(CASE state WHEN 2 THEN 1 END) "
+                               "FROM jobs LEFT JOIN job_items ON job_items.job_id = jobs.job_id "
+                               "GROUP BY jobs.job_id ORDER BY jobs.job_id")
+
+    async def load_job_items(self, job_id: int, state: int) -> List[str]:
+        rows = await self._run(self._execute, "SELECT item FROM job_items WHERE job_id = ? AND state = ?",
+                               job_id, state)
+        return [item for item, in rows]
+
+    async def set_job_items_state(self, job_id: int, items: List[str], state: int):
+        await self._run(self._executemany, "UPDATE job_items SET state = ? WHERE job_id = ? AND item = ?",
+                        [(state, job_id, item) for item in items])
+
+    async def set_job_params(self, job_id: int, params: str):
+        await self._run(self._execute, "UPDATE jobs SET params = ? WHERE job_id = ?", params, job_id)
+
+    async def delete_job(self, job_id: int):
+        def delete():
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        await self._run(delete)
+
+    async def migrate_from_yaml(self, yaml_path: str = LEGACY_EVENT_RECORDS_YAML) -> int:
+        """
+        One-time import of the records from the old event_records.yaml file. The file is renamed afterwards so the
+        import is never repeated. An event whose thread, message, or role is already recorded for another event is
+        skipped and reported instead of replacing that event. Returns the number of events imported.
+        """
+        if not os.path.exists(yaml_path):
+            return 0
+        with open(yaml_path, "r") as f:
+            legacy = yaml.safe_load(f) or {}
+        event_to_thread = legacy.get("event_to_thread") or {}
+        event_to_message = legacy.get("event_to_message") or {}
+        event_to_role = legacy.get("event_to_role") or {}
+        rows = [(event_id, thread_id, event_to_message[event_id], event_to_role[event_id])
+                for event_id, thread_id in event_to_thread.items()
+                if event_id in event_to_message and event_id in event_to_role]
+
+        def migrate() -> List[Tuple[int, str]]:
+            conflicts = []
+            connection = self._connect()
+            with connection:
+                for row in rows:
+                    try:
+                        connection.execute("INSERT INTO events (event_id, thread_id, message_id, role_id) "
+                                           "VALUES (?, ?, ?, ?) "
+                                           "ON CONFLICT (event_id) DO UPDATE SET thread_id = excluded.thread_id, "
+                                           "message_id = excluded.message_id, role_id = excluded.role_id", row)
+                    except sqlite3.IntegrityError as e:
+                        conflicts.append((row[0], str(e)))
+            return conflicts
+        conflicts = await self._run(migrate)
+        os.replace(yaml_path, yaml_path + ".migrated")
+        for event_id, error in conflicts:
+            logger.warning(f"Skipped the event {event_id} from {yaml_path} because another event has its records: "
+                           f"{error}")
+        migrated = len(rows) - len(conflicts)
+        logger.info(f"Migrated {migrated} events from {yaml_path} into {self.path} and skipped {len(conflicts)}.")
+        return migrated
+
+    async def close(self):
+        def close_connection():
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        await self._run(close_connection)
+        self._executor.shutdown(wait=False)
+
+
+class EventRecord:
+    """
+    The guild, thread, announcement message, and role that belong to one event.
+    """
+    __slots__ = ("event_id", "guild_id", "thread_id", "message_id", "role_id")
+
+    def __init__(self, event_id: int, guild_id: Optional[int], thread_id: int, message_id: int, role_id: int):
+        self.event_id = event_id
+        self.guild_id = guild_id
+        self.thread_id = thread_id
+        self.message_id = message_id
+        self.role_id = role_id
+
+    def __repr__(self):
+        return (f"EventRecord(event_id={self.event_id}, guild_id={self.guild_id}, thread_id={self.thread_id}, "
+                f"message_id={self.message_id}, role_id={self.role_id})")
+
+
+class EventRecords:
+    """
+    Holds the record of every managed event with reverse indexes from thread, message, and role IDs back to the event
+    so that every lookup is O(1), and the records partitioned by guild. Changes are written through to the records
+    backend.
+    """
+
+    def __init__(self, backend: RecordsBackend, records: Iterable[EventRecord] = ()):
+        self.backend = backend
+        self._records: Dict[int, EventRecord] = {}
+        self._by_thread: Dict[int, EventRecord] = {}
+        self._by_message: Dict[int, EventRecord] = {}
+        self._by_role: Dict[int, EventRecord] = {}
+        self._by_guild: Dict[Optional[int], Dict[int, EventRecord]] = {}
+        for record in records:
+            self._index(record)
+
+    @classmethod
+    async def load(cls, backend: RecordsBackend) -> "EventRecords":
+        rows = await backend.load()
+        event_records = cls(backend, (EventRecord(event_id, *row) for event_id, row in rows.items()))
+        problems = event_records.check_consistency()
+        for problem in problems:
+            logger.warning(f"Event records are inconsistent: {problem}")
+        if problems:
+            print(f"{len(problems)} inconsistencies were found in the event records. Check the logs.")
+        return event_records
+
+    def _index(self, record: EventRecord):
+        self._records[record.event_id] = record
+        self._by_thread[record.thread_id] = record
+        self._by_message[record.message_id] = record
+        self._by_role[record.role_id] = record
+        self._by_guild.setdefault(record.guild_id, {})[record.event_id] = record
+
+    def _unindex(self, record: EventRecord):
+        self._records.pop(record.event_id, None)
+        for index, key in ((self._by_thread, record.thread_id),
+                           (self._by_message, record.message_id),
+                           (self._by_role, record.role_id)):
+            if index.get(key) is record:
+                index.pop(key)
+        guild_records = self._by_guild.get(record.guild_id, {})
+        if guild_records.get(record.event_id) is record:
+            guild_records.pop(record.event_id)
+
+    def check_consistency(self) -> List[str]:
+        """
+        Verifies that the forward and reverse indexes agree and returns a description of every mismatch.
+        """
+        problems = []
+        for name, index, attribute in (("thread", self._by_thread, "thread_id"),
+                                       ("message", self._by_message, "message_id"),
+                                       ("role", self._by_role, "role_id")):
+            if len(index) != len(self._records):
+                problems.append(f"{len(self._records)} events but {len(index)} {name} IDs, "
+                                f"so some events share a {name}")
+            for key, record in index.items():
+                if self._records.get(record.event_id) is not record or getattr(record, attribute) != key:
+                    problems.append(f"{name} {key} points at event {record.event_id}, which does not own it")
+        return problems
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[EventRecord]:
+        return iter(list(self._records.values()))
+
+    def role_count(self) -> int:
+        return len(self._by_role)
+
+    def event_ids(self, guild_id: Optional[int] = None) -> List[int]:
+        """Every recorded event ID, or only those in the guild if one is given."""
+        if guild_id is None:
+            return list(self._records)
+        return list(self._by_guild.get(guild_id, ()))
+
+    def guild_ids(self) -> List[int]:
+        return [guild_id for guild_id, records in self._by_guild.items() if records and guild_id is not None]
+
+    def get(self, event_id: int) -> Optional[EventRecord]:
+        return self._records.get(event_id)
+
+    def by_thread(self, thread_id: int) -> Optional[EventRecord]:
+        return self._by_thread.get(thread_id)
+
+    def by_message(self, message_id: int) -> Optional[EventRecord]:
+        return self._by_message.get(message_id)
+
+    def by_role(self, role_id: int) -> Optional[EventRecord]:
+        return self._by_role.get(role_id)
+
+    def thread_id(self, event_id: int) -> Optional[int]:
+        record = self._records.get(event_id)
+        return record.thread_id if record else None
+
+    def message_id(self, event_id: int) -> Optional[int]:
+        record = self._records.get(event_id)
+        return record.message_id if record else None
+
+    def role_id(self, event_id: int) -> Optional[int]:
+        record = self._records.get(event_id)
+        return record.role_id if record else None
+
+    async def add_event(self, event_id: int, guild_id: int, event_thread_id: int, event_message_id: int,
+                        event_role_id: int):
+        old_record = self._records.get(event_id)
+        if old_record:
+            self._unindex(old_record)
+        self._index(EventRecord(event_id, guild_id, event_thread_id, event_message_id, event_role_id))
+        logger.info(f"Event records has recorded {event_id} in guild {guild_id}: "
+                    f"[{event_thread_id}, {event_message_id}, {event_role_id}]")
+        await self.backend.upsert_event(event_id, guild_id, event_thread_id, event_message_id, event_role_id)
+
+    async def remove_event(self, event_id):
+        record = self._records.get(event_id)
+        if record is None:
+            return
+        self._unindex(record)
+        logger.info(f"Event records has removed {event_id}.")
+        await self.backend.delete_event(event_id)
@@ -0,0 +1,41 @@
+from typing import Dict
+from .metro_routing import DEFAULT_METROPLEX_ALIASES, MetroRouting
+
+
+class GuildConfig:
+    """
+    The events channel, metroplex routing and event moderator of one guild. Like the routing table it holds, it is
+    never modified after it is built.
+    """
+    __slots__ = ("guild_id", "irl_events_channel_id", "metro_routing", "moderator_id")
+
+    def __init__(self, guild_id: int, irl_events_channel_id: int, metro_routing: MetroRouting, moderator_id: int):
+        self.guild_id = guild_id
+        self.irl_events_channel_id = irl_events_channel_id
+        self.metro_routing = metro_routing
+        # Can use the admin commands in the guild and is alerted about its events that need fixing.
+        self.moderator_id = moderator_id
+
+    def __repr__(self):
+        return (f"GuildConfig(guild_id={self.guild_id}, irl_events_channel_id={self.irl_events_channel_id}, "
+                f"routes={list(self.metro_routing.routes)}, moderator_id={self.moderator_id})")
+
+
+def parse_guild_configs(config: dict, default_guild_id: int, default_moderator_id: int) -> Dict[int, GuildConfig]:
+    """
+    Returns the config of every guild in event_config.yaml. The top level configures the default guild and each entry
+    under `guilds` configures another guild by its ID. Guilds without their own metroplex aliases or moderator use the
+    top level's, and the top level's moderator defaults to TEST_SERVER_MOD_ID.
+    """
+    aliases = config.get("metroplex_aliases", DEFAULT_METROPLEX_ALIASES)
+    moderator_id = int(config.get("moderator_id") or default_moderator_id)
+    guild_configs = {}
+    if "irl_events_channel_id" in config:
+        guild_configs[default_guild_id] = GuildConfig(default_guild_id, config["irl_events_channel_id"],
+                                                      MetroRouting.from_config(config), moderator_id)
+    for guild_id, guild_config in (config.get("guilds") or {}).items():
+        guild_configs[int(guild_id)] = GuildConfig(
+            int(guild_id), guild_config["irl_events_channel_id"],
+            MetroRouting.from_config({"metroplex_aliases": aliases, **guild_config}),
+            int(guild_config.get("moderator_id") or moderator_id))
+    return guild_configs
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from util import logger
+from util.fanout import FanOut, FanOutResult
+from .event_records import RecordsBackend
+
+PENDING = 0
+DONE = 1
+FAILED = 2
+
+job_logger = logger.getChild("jobs")
+
+
+class Job:
+    """
+    A bulk operation split into work items, such as "DM user X the RSVP for event Y". Each item is checkpointed in
+    the records database as soon as it is done, so a job interrupted by a crash or restart resumes where it stopped.
+    """
+    __slots__ = ("job_id", "kind", "guild_id", "params", "created_at", "pending", "done", "failed")
+
+    def __init__(self, job_id: int, kind: str, guild_id: int, params: Dict[str, Any], created_at: float,
+                 pending: int = 0, done: int = 0, failed: int = 0):
+        self.job_id = job_id
+        self.kind = kind
+        self.guild_id = guild_id
+        self.params = params
+        self.created_at = created_at
+        self.pending = pending
+        self.done = done
+        self.failed = failed
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.done + self.failed
+
+    def __repr__(self):
+        return (f"Job(job_id={self.job_id}, kind={self.kind!r}, guild_id={self.guild_id}, params={self.params}, "
+                f"done={self.done}/{self.total}, failed={self.failed})")
+
+
+class _Checkpoints:
+    """
+    Marks items done as a group commit. Items that finish while one write is in flight are written together by the
+    next, so a fast fan-out does not wait on a write per item, and every item is on disk before its worker returns.
+    """
+
+    def __init__(self, backend: RecordsBackend, job_id: int):
+        self.backend = backend
+        self.job_id = job_id
+        self._batch: List[str] = []
+        self._writing = asyncio.Lock()
+
+    async def done(self, item: str):
+        batch = self._batch
+        batch.append(item)
+        async with self._writing:
+            if batch is self._batch:
+                self._batch = []
+                await self.backend.set_job_items_state(self.job_id, batch, DONE)
+
+
+class JobQueue:
+    """
+    Keeps every unfinished job and runs each one at most once at a time. Items are stored as JSON, and an item is only
+    marked done after its worker returns, so workers have to be safe to run again for an item that was in flight when
+    the bot stopped.
+    """
+
+    def __init__(self, backend: RecordsBackend):
+        self.backend = backend
+        self.jobs: Dict[int, Job] = {}
+        self._tasks: Dict[int, Tuple[Job, asyncio.Task]] = {}
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    async def load(self) -> List[Job]:
+        """Reads every job that was not finished when the bot last stopped."""
+        for job_id, kind, guild_id, params, created_at, pending, done, failed in await self.backend.load_jobs():
+            self.jobs[job_id] = Job(job_id, kind, guild_id, json.loads(params), created_at, pending, done, failed)
+        return list(self.jobs.values())
+
+    async def submit(self, kind: str, guild_id: int, params: Dict[str, Any], items: Iterable[Any]) -> Job:
+        """Records a new job and all of its items in one write, before any of the work starts."""
+        items = list(dict.fromkeys(json.dumps(item) for item in items))
+        created_at = time.time()
+        job_id = await self.backend.create_job(kind, guild_id, json.dumps(params), created_at, items)
+        job = Job(job_id, kind, guild_id, params, created_at, pending=len(items))
+        self.jobs[job_id] = job
+        job_logger.info("Queued job %d (%s) with %d items.", job_id, kind, len(items), extra={"guild_id": guild_id})
+        return job
+
+    async def items(self, job: Job, state: int) -> List[Any]:
+        return [json.loads(item) for item in await self.backend.load_job_items(job.job_id, state)]
+
+    async def run(self, job: Job, worker: Callable[[Any], Awaitable[Any]], **fan_out_options) -> FanOutResult:
+        """
+        Runs the worker over the items that are not done yet, checkpointing each one as it completes. Items that still
+        fail after the fan-out's retries are marked failed so that a resumed job does not try them again.
+        """
+        items = await self.backend.load_job_items(job.job_id, PENDING)
+        checkpoints = _Checkpoints(self.backend, job.job_id)
+
+        async def run_item(item: str):
+            result = await worker(json.loads(item))
+            await checkpoints.done(item)
+            job.pending -= 1
+            job.done += 1
+            return result
+
+        result = await FanOut(run_item, **fan_out_options).run(items)
+        if result.failed:
+            await self.backend.set_job_items_state(job.job_id, [item for item, _ in result.failed], FAILED)
+            job.pending -= len(result.failed)
+            job.failed += len(result.failed)
+            result.failed = [(json.loads(item), error) for item, error in result.failed]
+        job_logger.info("Job %d (%s) ran %d items in %.1fs: %d/%d done, %d failed.", job.job_id, job.kind,
+                        len(items), result.elapsed, job.done, job.total, job.failed, extra={"guild_id": job.guild_id})
+        return result
+
+    async def save_params(self, job: Job):
+        """Writes the job's params, so a step recorded in them is not repeated when the job resumes."""
+        await self.backend.set_job_params(job.job_id, json.dumps(job.params))
+
+    async def finish(self, job: Job):
+        """Forgets the job once everything that depends on its items is done."""
+        self.jobs.pop(job.job_id, None)
+        await self.backend.delete_job(job.job_id)
+
+    def start(self, job: Job, runner: Callable[[Job], Awaitable[None]]) -> asyncio.Task:
+        """Runs the job in the background unless it is already running, and returns the task running it."""
+        if job.job_id in self._tasks:
+            return self._tasks[job.job_id][1]
+        task = asyncio.create_task(runner(job))
+        self._tasks[job.job_id] = job, task
+        task.add_done_callback(lambda _: self._tasks.pop(job.job_id, None))
+        return task
+
+    def is_running(self, job: Job) -> bool:
+        return job.job_id in self._tasks
+
+    def running(self, guild_id: Optional[int] = None, kinds: Iterable[str] = ()) -> List[asyncio.Task]:
+        """The tasks of the running jobs, optionally only those in the guild or of the given kinds."""
+        kinds = set(kinds)
+        return [task for job, task in self._tasks.values()
+                if (guild_id is None or job.guild_id == guild_id) and (not kinds or job.kind in kinds)]
@@ -0,0 +1,61 @@
+import re
+from typing import Dict, Optional, Union
+
+# Statewide events are tagged [TX]. They ping every metroplex role and their event role is based on the DTX role.
+DEFAULT_METROPLEX_ALIASES = {"TX": {"metroplex": "DTX", "ping_all": True}}
+
+
+class MetroRoute:
+    """
+    Where an event tagged with [tag] is routed: the metroplex role its event role is based on and the role mentions
+    that announce it.
+    """
+    __slots__ = ("tag", "metroplex", "role_id", "mention")
+
+    def __init__(self, tag: str, metroplex: str, role_id: int, mention: str):
+        self.tag = tag
+        self.metroplex = metroplex
+        self.role_id = role_id
+        self.mention = mention
+
+    def __repr__(self):
+        return f"MetroRoute(tag={self.tag!r}, metroplex={self.metroplex!r}, role_id={self.role_id})"
+
+
+class MetroRouting:
+    """
+    Routing table compiled once from event_config.yaml. It is never modified after it is built, so a reload swaps in a
+    new table while handlers that already looked up a route keep using the old one.
+    """
+
+    def __init__(self, metroplex_roles: Dict[str, int],
+                 aliases: Optional[Dict[str, Union[str, Dict[str, object]]]] = None):
+        routes = {metroplex: MetroRoute(metroplex, metroplex, role_id, f"<@&{role_id}>")
+                  for metroplex, role_id in metroplex_roles.items()}
+        every_mention = "".join(route.mention for route in routes.values())
+        for tag, alias in (aliases or {}).items():
+            if isinstance(alias, str):
+                alias = {"metroplex": alias}
+            target = routes.get(alias["metroplex"])
+            if target is None:
+                raise ValueError(f"The metroplex alias {tag} points to the unknown metroplex {alias['metroplex']}.")
+            routes[tag] = MetroRoute(tag, target.metroplex, target.role_id,
+                                     every_mention if alias.get("ping_all") else target.mention)
+        self.routes = routes
+        self.metroplex_roles = dict(metroplex_roles)
+        # Longest tags first so that a tag which is a prefix of another never shadows it.
+        tags = sorted(routes, key=len, reverse=True)
+        self._matcher = re.compile(r"\[(" + "|".join(map(re.escape, tags)) + r")\]") if tags else None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "MetroRouting":
+        return cls(config["metroplex_roles"], config.get("metroplex_aliases", DEFAULT_METROPLEX_ALIASES))
+
+    def route(self, event_name: str) -> Optional[MetroRoute]:
+        """
+        Returns the route of the first metroplex tag in the event name, or None if it has no known tag.
+        """
+        if self._matcher is None:
+            return None
+        match = self._matcher.search(event_name)
+        return self.routes[match[1]] if match else None
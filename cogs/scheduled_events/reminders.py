@@ -0,0 +1,102 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ReminderSchedule:
+    """
+    The upcoming RSVP reminders of every event as a min-heap of (due time, event ID, offset, start time), so the next
+    reminder is found in O(1) and an event is added or moved in O(log n). Rescheduling or removing an event leaves its
+    old entries in the heap, and they are skipped when they reach the top because their start time no longer matches.
+    Times are Unix timestamps and offsets are seconds before the event starts.
+    """
+
+    def __init__(self, offsets: Iterable[float] = ()):
+        self.offsets = self.parse_offsets(offsets)
+        self._start_times: Dict[int, float] = {}
+        self._heap: List[Tuple[float, int, float, float]] = []
+        # The (start time, offset) of the last reminder sent for each event, which is only valid for that start time.
+        self._sent: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._start_times)
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._start_times
+
+    def schedule(self, event_id: int, start_time: float, now: float):
+        """
+        Adds or moves the reminders of the event. Reminders that came due without being sent, e.g. while the bot was
+        down, are merged into one that is due now, as long as the event has not started. Reminders that were already
+        sent for this start time are skipped.
+        """
+        if self._start_times.get(event_id) == start_time:
+            return
+        self._start_times[event_id] = start_time
+        sent_start_time, sent_offset = self._sent.get(event_id, (None, None))
+        overdue = None
+        for offset in self.offsets:
+            if sent_start_time == start_time and offset >= sent_offset:
+                continue
+            if start_time - offset > now:
+                heapq.heappush(self._heap, (start_time - offset, event_id, offset, start_time))
+            elif start_time > now:
+                overdue = offset
+        if overdue is not None:
+            heapq.heappush(self._heap, (now, event_id, overdue, start_time))
+        if len(self._heap) > 4 * (len(self._start_times) * len(self.offsets) + 1):
+            self._compact()
+
+    def unschedule(self, event_id: int):
+        self._start_times.pop(event_id, None)
+        self._sent.pop(event_id, None)
+
+    def mark_sent(self, event_id: int, start_time: float, offset: float):
+        """Records a reminder that was sent before, so scheduling the event does not send it again."""
+        self._sent[event_id] = start_time, offset
+
+    @staticmethod
+    def parse_offsets(offsets: Iterable[float]) -> List[float]:
+        """
+        Converts configured offsets to seconds, largest first. Raises ValueError or TypeError for anything that is not
+        a number of seconds that is zero or more.
+        """
+        parsed = sorted({float(offset) for offset in offsets}, reverse=True)
+        if parsed and parsed[-1] < 0:
+            raise ValueError(f"RSVP reminder offsets cannot be negative: {parsed[-1]}")
+        return parsed
+
+    def set_offsets(self, offsets: Iterable[float], now: float):
+        """
+        Replaces the offsets and reschedules every event with them. The new schedule is built before it replaces the
+        old one, so offsets that cannot be parsed leave every pending reminder in place.
+        """
+        offsets = self.parse_offsets(offsets)
+        if offsets == self.offsets:
+            return
+        rescheduled = ReminderSchedule(offsets)
+        rescheduled._sent = self._sent
+        for event_id, start_time in self._start_times.items():
+            rescheduled.schedule(event_id, start_time, now)
+        self.offsets, self._start_times, self._heap = rescheduled.offsets, rescheduled._start_times, rescheduled._heap
+
+    def next_due(self) -> Optional[float]:
+        """The due time of the next reminder, or None if there are none."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[int, float, float]]:
+        """Removes the reminders that are due, marks them sent, and returns their (event ID, offset, start time)."""
+        due = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            _, event_id, offset, start_time = heapq.heappop(self._heap)
+            self.mark_sent(event_id, start_time, offset)
+            due.append((event_id, offset, start_time))
+        return due
+
+    def _drop_stale(self):
+        while self._heap and self._start_times.get(self._heap[0][1]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._start_times.get(entry[1]) == entry[3]]
+        heapq.heapify(self._heap)
@@ -0,0 +1,96 @@
+import disnake
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Set, Tuple, Union
+from util import logger
+from util.fanout import FanOutResult
+from util.rest_scheduler import BULK, rest_priority
+from .job_queue import Job, JobQueue
+
+ADD = "add"
+REMOVE = "remove"
+
+# (event ID, role ID, action, user ID)
+RoleChange = Tuple[int, int, str, int]
+
+role_logger = logger.getChild("roles")
+
+
+class RoleDiff:
+    """
+    The role changes needed for the holders of an event role to match the event's subscribers.
+    """
+    __slots__ = ("event_id", "role_id", "to_add", "to_remove")
+
+    def __init__(self, event_id: int, role_id: int, to_add: Set[int], to_remove: Set[int]):
+        self.event_id = event_id
+        self.role_id = role_id
+        self.to_add = to_add
+        self.to_remove = to_remove
+
+    def __len__(self) -> int:
+        return len(self.to_add) + len(self.to_remove)
+
+    def __repr__(self):
+        return f"RoleDiff(event_id={self.event_id}, +{len(self.to_add)}, -{len(self.to_remove)})"
+
+
+class RoleReconciler:
+    """
+    Computes which users are missing an event role or hold it without being subscribed, then applies only those
+    changes through a bounded pool of workers.
+    """
+
+    def __init__(self, http: disnake.http.HTTPClient, concurrency: int = 8, retries: int = 3):
+        self.http = http
+        self.concurrency = concurrency
+        self.retries = retries
+
+    @staticmethod
+    async def diff(event_id: int, role: disnake.Role,
+                   subscribers: AsyncIterator[Union[disnake.Member, disnake.User]],
+                   exempt_ids: Iterable[int] = ()) -> RoleDiff:
+        """
+        Builds the diff in a single pass over the subscriber pages. Role holders come from the gateway member cache.
+        """
+        holders = {member.id for member in role.members}
+        to_add = set()
+        async for subscriber in subscribers:
+            if subscriber.id in holders:
+                holders.discard(subscriber.id)
+            else:
+                to_add.add(subscriber.id)
+        exempt_ids = set(exempt_ids)
+        return RoleDiff(event_id, role.id, to_add - exempt_ids, holders - exempt_ids)
+
+    @staticmethod
+    def changes(diffs: List[RoleDiff]) -> List[RoleChange]:
+        """Splits the diffs into one (event ID, role ID, action, user ID) change per user."""
+        changes = [(diff.event_id, diff.role_id, ADD, user_id) for diff in diffs for user_id in diff.to_add]
+        changes += [(diff.event_id, diff.role_id, REMOVE, user_id) for diff in diffs for user_id in diff.to_remove]
+        return changes
+
+    async def apply(self, job_queue: JobQueue, job: Job,
+                    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> FanOutResult:
+        """
+        Applies the changes of the job that are not done yet using one worker pool, retrying rate limited and failed
+        requests with backoff. Adding or removing a role twice has no effect, so a change that was in flight when the
+        bot stopped is safe to send again.
+        """
+        guild_id = job.guild_id
+
+        async def change_role(change: RoleChange):
+            event_id, role_id, action, user_id = change
+            if action == ADD:
+                await self.http.add_role(guild_id, user_id, role_id, reason="Subscribed to the event")
+            else:
+                await self.http.remove_role(guild_id, user_id, role_id, reason="Not subscribed to the event")
+            return change
+
+        with rest_priority(BULK, job=f"roles:{guild_id}"):
+            result = await job_queue.run(job, change_role, concurrency=self.concurrency, retries=self.retries,
+                                         on_progress=on_progress)
+        for (event_id, role_id, action, user_id), error in result.failed:
+            role_logger.warning("Could not %s the role: %r", action, error,
+                                extra={"event_id": event_id, "role_id": role_id, "user_id": user_id})
+        role_logger.info("Reconciled event roles with %d/%d changes in %.1fs after %d retries.",
+                         job.done, job.total, result.elapsed, result.retried, extra={"guild_id": guild_id})
+        return result
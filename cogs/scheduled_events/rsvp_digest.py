@@ -0,0 +1,71 @@
+from typing import Dict, Iterable, List, Tuple
+from .rsvp_state import RsvpState, RsvpStatus
+
+MESSAGE_LIMIT = 2000
+
+# {event ID: {user ID: latest status}}
+RsvpChanges = Dict[int, Dict[int, RsvpStatus]]
+
+
+class RsvpDigest:
+    """
+    RSVP changes waiting to be sent to event creators as one digest per interval. Only the latest status of each user
+    is kept, so a user who changes their mind several times within an interval counts once.
+    """
+
+    def __init__(self, notifications: Iterable[Tuple[int, int, int, int]] = ()):
+        self._pending: RsvpChanges = {}
+        # The highest sequence number of any change added, as stored with the change by the records backend.
+        self.last_seq = 0
+        for event_id, user_id, status, seq in notifications:
+            self.add(event_id, user_id, RsvpStatus(status), seq)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._pending.values()))
+
+    def add(self, event_id: int, user_id: int, status: RsvpStatus, seq: int = 0):
+        self._pending.setdefault(event_id, {})[user_id] = status
+        self.last_seq = max(self.last_seq, seq)
+
+    def discard(self, event_id: int):
+        self._pending.pop(event_id, None)
+
+    def take(self) -> Tuple[RsvpChanges, int]:
+        """
+        Returns every pending change and starts collecting the next digest, together with the highest sequence number
+        among them. A stored change with a higher one was made after the digest was taken.
+        """
+        pending, self._pending = self._pending, {}
+        return pending, self.last_seq
+
+    def restore(self, changes: RsvpChanges):
+        """Puts back changes whose digest could not be sent, unless the user has changed their RSVP again since."""
+        for event_id, statuses in changes.items():
+            pending = self._pending.setdefault(event_id, {})
+            for user_id, status in statuses.items():
+                pending.setdefault(user_id, status)
+
+
+def render_digest(changes: List[Tuple[RsvpState, Dict[int, RsvpStatus]]]) -> List[str]:
+    """
+    Renders the changes to one creator's events as a line per event, e.g.
+    "**Event**: 5 going, 2 maybe, 1 not going since last update", split into as few messages as fit.
+    """
+    lines = []
+    for rsvp_state, statuses in changes:
+        counts = {status: 0 for status in RsvpStatus}
+        for status in statuses.values():
+            counts[status] += 1
+        summary = ", ".join(f"{count} {status.label.lower()}" for status, count in counts.items() if count)
+        lines.append(f"**{rsvp_state.event_name}**: {summary} since last update")
+
+    messages = []
+    current = ""
+    for line in lines:
+        if current and len(current) + len(line) + 1 > MESSAGE_LIMIT:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
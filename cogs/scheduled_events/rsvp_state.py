@@ -0,0 +1,118 @@
+import disnake
+from collections import Counter
+from enum import IntEnum
+from typing import Dict, List, Optional
+from .event_records import RecordsBackend
+
+EMBED_FIELD_LIMIT = 1024
+EMPTY_FIELD = "* *"
+
+
+class RsvpStatus(IntEnum):
+    GOING = 0
+    MAYBE = 1
+    NOT_GOING = 2
+
+    @property
+    def label(self) -> str:
+        return {RsvpStatus.GOING: "Going", RsvpStatus.MAYBE: "Maybe", RsvpStatus.NOT_GOING: "Not Going"}[self]
+
+
+class RsvpState:
+    """
+    The RSVP status of every user for one event. Changing a user's status is O(1) and the RSVP list embed is rendered
+    from this state instead of being edited as text.
+    """
+
+    def __init__(self, event_id: int, event_name: str, creator_id: int, list_channel_id: int, list_message_id: int):
+        self.event_id = event_id
+        self.event_name = event_name
+        self.creator_id = creator_id
+        # Location of the RSVP list message in the creator's DMs
+        self.list_channel_id = list_channel_id
+        self.list_message_id = list_message_id
+        self._statuses: Dict[int, RsvpStatus] = {}
+        # Dicts keep the order in which users RSVPed and allow O(1) removal.
+        self._users_by_status: Dict[RsvpStatus, Dict[int, None]] = {status: {} for status in RsvpStatus}
+        self._totals: Optional[Counter] = None
+        self.set_status(creator_id, RsvpStatus.GOING)
+
+    def attach(self, totals: Counter):
+        """Adds this event's RSVPs to the totals by status of every event and keeps them up to date from now on."""
+        self.detach()
+        self._totals = totals
+        totals.update(self.counts())
+
+    def detach(self):
+        """Takes this event's RSVPs out of the totals, once its RSVPs are deleted."""
+        if self._totals is not None:
+            self._totals.subtract(self.counts())
+            self._totals = None
+
+    def set_status(self, user_id: int, status: RsvpStatus) -> Optional[RsvpStatus]:
+        """
+        Records the user's RSVP and returns their previous status, if any.
+        """
+        previous = self._statuses.get(user_id)
+        if previous == status:
+            return previous
+        if previous is not None:
+            self._users_by_status[previous].pop(user_id)
+        self._statuses[user_id] = status
+        self._users_by_status[status][user_id] = None
+        if self._totals is not None:
+            if previous is not None:
+                self._totals[previous] -= 1
+            self._totals[status] += 1
+        return previous
+
+    def status_of(self, user_id: int) -> Optional[RsvpStatus]:
+        return self._statuses.get(user_id)
+
+    def users_with(self, status: RsvpStatus) -> List[int]:
+        return list(self._users_by_status[status])
+
+    def counts(self) -> Dict[RsvpStatus, int]:
+        return {status: len(users) for status, users in self._users_by_status.items()}
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._statuses
+
+    def response_count(self) -> int:
+        return len(self._statuses)
+
+    def render_embed(self) -> disnake.Embed:
+        rsvp_embed = disnake.Embed(title=f"RSVP List for {self.event_name}")
+        for status in RsvpStatus:
+            rsvp_embed.add_field(name=status.label, value=render_mentions(self.users_with(status)))
+        return rsvp_embed
+
+
+async def load_rsvp_states(backend: RecordsBackend, totals: Optional[Counter] = None) -> Dict[int, RsvpState]:
+    rsvp_states = {}
+    for event_id, event_name, creator_id, list_channel_id, list_message_id in await backend.load_rsvp_lists():
+        rsvp_states[event_id] = RsvpState(event_id, event_name, creator_id, list_channel_id, list_message_id)
+    for event_id, user_id, status in await backend.load_rsvp_statuses():
+        if event_id in rsvp_states:
+            rsvp_states[event_id].set_status(user_id, RsvpStatus(status))
+    if totals is not None:
+        for rsvp_state in rsvp_states.values():
+            rsvp_state.attach(totals)
+    return rsvp_states
+
+
+def render_mentions(user_ids: List[int]) -> str:
+    """
+    Joins the user mentions for an embed field, summarizing whatever does not fit in the field.
+    """
+    if not user_ids:
+        return EMPTY_FIELD
+    value = ""
+    for shown, user_id in enumerate(user_ids):
+        mention = f"<@{user_id}>"
+        remaining = f" and {len(user_ids) - shown} more"
+        is_last = shown == len(user_ids) - 1
+        if len(value) + len(mention) + (0 if is_last else len(remaining)) > EMBED_FIELD_LIMIT:
+            return value + remaining
+        value += mention
+    return value
@@ -1,81 +1,61 @@
 import disnake
-import re
-from typing import Union
-from util import logger
+from typing import List, Optional, Tuple
+from .rsvp_state import RsvpStatus
 
-async def updated_rsvp_embed(original_embed: disnake.Embed, subscriber: disnake.User, category: int):
-    embed = original_embed.to_dict()
-    for i, field in enumerate(embed['fields']):
-        new_field_value = re.sub(f"<@{subscriber.id}>", "", field['value'])
-        if new_field_value == "":
-            new_field_value = "* *"
-        embed['fields'][i]['value'] = new_field_value
-    if embed['fields'][category]['value'] == "* *":
-        embed['fields'][category]['value'] = f"<@{subscriber.id}>"
-    else:
-        embed['fields'][category]['value'] = embed['fields'][category]['value'] + f"<@{subscriber.id}>"
-    return disnake.Embed.from_dict(embed)
+RSVP_CUSTOM_ID_PREFIX = "rsvp"
 
+RSVP_CONFIRMATIONS = {
+    RsvpStatus.GOING: "You have RSVPed that you are **going**.",
+    RsvpStatus.MAYBE: "You have RSVPed that you are **maybe going**.",
+    RsvpStatus.NOT_GOING: "You have RSVPed that you are **not going**.",
+}
 
-class RsvpView(disnake.ui.View):
-    def __init__(self,
-                 event: disnake.GuildScheduledEvent,
-                 event_thread: disnake.Thread,
-                 rsvp_list_message: Union[disnake.Message, disnake.PartialMessage],
-                 subscriber: Union[disnake.Member, disnake.User],
-                 event_creator: disnake.User):
-        super().__init__(timeout=None)
-        self.event = event
-        self.event_thread = event_thread
-        self.rsvp_list_message = rsvp_list_message
-        self.subscriber = subscriber
-        self.event_creator = event_creator
-        self.dm_embed = disnake.Embed(title=f"RSVP to the event: {self.event.name}", description=self.event.description)
+RSVP_NOTIFICATIONS = {
+    RsvpStatus.GOING: "<@{user_id}> is going to {event_name}!",
+    RsvpStatus.MAYBE: "<@{user_id}> might be going to {event_name}.",
+    RsvpStatus.NOT_GOING: "<@{user_id}> is not going to {event_name} :(",
+}
 
-    def enable_all_buttons(self):
-        self.going.disabled = False
-        self.maybe.disabled = False
-        self.not_going.disabled = False
+RSVP_BUTTON_STYLES = {
+    RsvpStatus.GOING: disnake.ButtonStyle.green,
+    RsvpStatus.MAYBE: disnake.ButtonStyle.grey,
+    RsvpStatus.NOT_GOING: disnake.ButtonStyle.red,
+}
 
-    @disnake.ui.button(label="Going", style=disnake.ButtonStyle.green)
-    async def going(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
-        self.enable_all_buttons()
-        self.going.disabled = True
+# The RSVP buttons carry everything needed to handle a click in their custom_id ("rsvp:<event ID>:<status>"), so no view
+# has to be kept in memory for each RSVP message and the buttons keep working after the bot restarts.
 
-        rsvp_embed = await updated_rsvp_embed(self.rsvp_list_message.embeds[0], self.subscriber, category=0)
-        await self.rsvp_list_message.edit(content=self.rsvp_list_message.content, embed=rsvp_embed)
 
-        await inter.response.edit_message(content="You have RSVPed that you are **going**.",
-                                          embed=self.dm_embed, view=self)
-        if self.event.creator_id != inter.author.id:
-            await self.event_creator.send(f"<@{inter.author.id}> is going to {self.event.name}!")
-            logger.info(f"<@{inter.author.id}> is going to {self.event.name}!")
+def rsvp_custom_id(event_id: int, status: RsvpStatus) -> str:
+    return f"{RSVP_CUSTOM_ID_PREFIX}:{event_id}:{status.value}"
 
-    @disnake.ui.button(label="Maybe", style=disnake.ButtonStyle.grey)
-    async def maybe(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
-        self.enable_all_buttons()
-        self.maybe.disabled = True
 
-        rsvp_embed = await updated_rsvp_embed(self.rsvp_list_message.embeds[0], self.subscriber, category=1)
-        await self.rsvp_list_message.edit(content=self.rsvp_list_message.content, embed=rsvp_embed)
+def parse_rsvp_custom_id(custom_id: str) -> Optional[Tuple[int, RsvpStatus]]:
+    """
+    Returns the event ID and status of an RSVP button, or None if the custom_id does not belong to an RSVP button.
+    """
+    prefix, _, rest = custom_id.partition(":")
+    if prefix != RSVP_CUSTOM_ID_PREFIX:
+        return None
+    event_id, _, status = rest.partition(":")
+    try:
+        return int(event_id), RsvpStatus(int(status))
+    except ValueError:
+        return None
 
-        await inter.response.edit_message(content="You have RSVPed that you are **maybe going**.",
-                                          embed=self.dm_embed, view=self)
-        if self.event.creator_id != inter.author.id:
-            await self.event_creator.send(f"<@{inter.author.id}> might be going to {self.event.name}.")
-            logger.info(f"<@{inter.author.id}> might be going to {self.event.name}.")
 
-    @disnake.ui.button(label="Not Going", style=disnake.ButtonStyle.red)
-    async def not_going(self, button: disnake.ui.Button, inter: disnake.MessageInteraction):
-        self.enable_all_buttons()
-        self.not_going.disabled = True
+def rsvp_buttons(event_id: int, selected: Optional[RsvpStatus] = None) -> List[disnake.ui.Button]:
+    return [disnake.ui.Button(label=status.label,
+                              style=RSVP_BUTTON_STYLES[status],
+                              custom_id=rsvp_custom_id(event_id, status),
+                              disabled=status == selected)
+            for status in RsvpStatus]
 
-        rsvp_embed = await updated_rsvp_embed(self.rsvp_list_message.embeds[0], self.subscriber, category=2)
-        await self.rsvp_list_message.edit(content=self.rsvp_list_message.content, embed=rsvp_embed)
 
-        await inter.response.edit_message(content="You have RSVPed that you are **not going**.",
-                                          embed=self.dm_embed, view=self)
-        if self.event.creator_id != inter.author.id:
-            await self.event_creator.send(f"<@{inter.author.id}> is not going to {self.event.name} :(")
-            logger.info(f"<@{inter.author.id}> is not going to {self.event.name} :(")
+def rsvp_dm_embed(event: disnake.GuildScheduledEvent) -> disnake.Embed:
+    return disnake.Embed(title=f"RSVP to the event: {event.name}", description=event.description)
 
+
+def rsvp_reminder_content(event: disnake.GuildScheduledEvent) -> str:
+    return (f"**{event.name}** starts <t:{int(event.scheduled_start_time.timestamp())}:R> and you have not RSVPed yet. "
+            f"Let the host know if you are going!")
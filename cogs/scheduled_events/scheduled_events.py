@@ -1,114 +1,219 @@
+import asyncio
+import functools
+import os
+import time
 import disnake
 from disnake import ApplicationCommandInteraction as AppCmdInter
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 import re
 import yaml
+from collections import Counter
 from main import SATXBot
-from typing import Dict, List
-from .rsvp_view import RsvpView
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from .event_artifacts import EventArtifactCache, EventArtifacts
+from .event_records import EVENT_RECORDS_DB, LEGACY_EVENT_RECORDS_YAML, EventRecords, SqliteRecordsBackend
+from .guild_config import GuildConfig, parse_guild_configs
+from .job_queue import DONE, FAILED, Job, JobQueue
+from .metro_routing import MetroRoute
+from .reminders import ReminderSchedule
+from .roles import ADD, RoleChange, RoleDiff, RoleReconciler
+from .rsvp_digest import RsvpDigest, render_digest
+from .rsvp_state import RsvpState, RsvpStatus, load_rsvp_states
+from .rsvp_view import (RSVP_CONFIRMATIONS, RSVP_NOTIFICATIONS, parse_rsvp_custom_id, rsvp_buttons, rsvp_dm_embed,
+                        rsvp_reminder_content)
 from util import logger
-
-
-class EventRecords:
-    """
-    Dataclass to hold the thread, message, and role for each event and handles updating the YAML file.
-    """
-
-    def __init__(self, event_to_thread: Dict[int, int], event_to_message: Dict[int, int],
-                 event_to_role: Dict[int, int]):
-        self.event_to_thread = event_to_thread
-        self.event_to_message = event_to_message
-        self.event_to_role = event_to_role
-
-    async def rewrite_to_yaml(self):
-        with open("./cogs/scheduled_events/event_records.yaml", "w") as records:
-            yaml.dump({"event_to_thread": self.event_to_thread,
-                       "event_to_message": self.event_to_message,
-                       "event_to_role": self.event_to_role},
-                      records)
-
-    async def add_event(self, event_id: int, event_thread_id: int, event_message_id: int, event_role_id: int):
-        self.event_to_thread[event_id] = event_thread_id
-        self.event_to_message[event_id] = event_message_id
-        self.event_to_role[event_id] = event_role_id
-        logger.info(f"Event records has recorded {event_id}: [{event_thread_id}, {event_message_id}, {event_role_id}]")
-        await self.rewrite_to_yaml()
-
-    async def remove_event(self, event_id):
-        self.event_to_thread.pop(event_id)
-        self.event_to_message.pop(event_id)
-        self.event_to_role.pop(event_id)
-        logger.info(f"Event records has removed {event_id}.")
-        await self.rewrite_to_yaml()
+from util.coalescer import EditCoalescer
+from util.fanout import FanOut
+from util.gateway_trace import GatewayTraceRecorder
+from util.keyed_dispatcher import KeyedDispatcher
+from util.metrics import metrics, timed_listener
+from util.rest_scheduler import BULK, rest_priority
+
+EVENT_CONFIG_PATH = "./cogs/scheduled_events/event_config.yaml"
+EVENT_CONFIG_POLL_SECONDS = 10
+DEFAULT_RSVP_DMS_PER_SECOND = 5
+DEFAULT_RSVP_FAN_OUT_CONCURRENCY = 8
+DEFAULT_RSVP_LIST_EDIT_WINDOW = 2.0
+DEFAULT_EVENT_RENAME_WINDOW = 5.0
+DEFAULT_RSVP_DIGEST_INTERVAL = 300.0
+DEFAULT_RSVP_DIGEST_MIN_RSVPS = 10
+DEFAULT_RSVP_REMINDER_OFFSETS = (24 * 60 * 60,)
+MAX_RSVP_CLEANUP_ATTEMPTS = 5
+# Kinds of jobs in the job queue.
+RSVP_JOB = "rsvp"
+REMINDER_JOB = "rsvp reminder"
+ROLES_JOB = "roles"
+PURGE_JOB = "purge"
+
+rsvp_logger = logger.getChild("rsvp")
+role_logger = logger.getChild("roles")
 
 
 class ScheduledEventCog(commands.Cog):
     def __init__(self, bot: SATXBot):
         self.bot = bot
+        self.event_config_path = EVENT_CONFIG_PATH
+        self.event_records_path = EVENT_RECORDS_DB
+        self.legacy_event_records_path = LEGACY_EVENT_RECORDS_YAML
         self.event_records: EventRecords = None
-        self.irl_events_channel: disnake.TextChannel = None
-        self.metroplex_roles = {}
-        self.rsvp_messages = {}
-        self.rsvp_list_messages = {}
+        self.guild_configs: Dict[int, GuildConfig] = {}
+        self.event_config_mtime: Optional[int] = None
+        self.rsvp_states: Dict[int, RsvpState] = {}
+        # RSVPs of every event by status, kept up to date by the RSVP states.
+        self.rsvp_totals: Counter = Counter()
+        self.rsvp_list_editors: Dict[int, EditCoalescer] = {}
+        self.rsvp_dms_per_second = DEFAULT_RSVP_DMS_PER_SECOND
+        self.rsvp_fan_out_concurrency = DEFAULT_RSVP_FAN_OUT_CONCURRENCY
+        self.rsvp_list_edit_window = DEFAULT_RSVP_LIST_EDIT_WINDOW
+        self.event_artifacts = EventArtifactCache()
+        self.renamed_events: Dict[int, disnake.GuildScheduledEvent] = {}
+        self.event_renamers: Dict[int, EditCoalescer] = {}
+        self.event_rename_window = DEFAULT_EVENT_RENAME_WINDOW
+        self.rsvp_digest = RsvpDigest()
+        self.rsvp_digest_interval = DEFAULT_RSVP_DIGEST_INTERVAL
+        self.rsvp_digest_min_rsvps = DEFAULT_RSVP_DIGEST_MIN_RSVPS
+        self.reminder_schedule = ReminderSchedule(DEFAULT_RSVP_REMINDER_OFFSETS)
+        self._reminder_timer: Optional[asyncio.TimerHandle] = None
+        self._reminder_timer_due: Optional[float] = None
+        self._reminder_tasks: Set[asyncio.Task] = set()
+        self._reconciling = asyncio.Lock()
+        self._reconciling_guilds: Dict[int, asyncio.Lock] = {}
+        self._reconcile_tasks: Set[asyncio.Task] = set()
+        self.role_reconciler = RoleReconciler(bot.http)
+        self.job_queue: Optional[JobQueue] = None
+        # Everything that changes one event's records, thread, role, or RSVPs runs through its queue in order.
+        self.event_dispatcher = KeyedDispatcher("scheduled_events")
+        self._command_started: Dict[int, float] = {}
+        self.trace_recorder: Optional[GatewayTraceRecorder] = None
+        for name, source in self.stat_sources().items():
+            bot.stats.add_source(name, source)
+
+    def stat_sources(self) -> Dict[str, Callable[[], int]]:
+        """The counts this cog adds to the bot's statistics."""
+        sources = {"tracked events": lambda: len(self.event_records) if self.event_records else 0,
+                   "event roles": lambda: self.event_records.role_count() if self.event_records else 0}
+        for status in RsvpStatus:
+            sources[f"RSVPs {status.label.lower()}"] = functools.partial(self.rsvp_totals.get, status, 0)
+        return sources
+
+    def cog_unload(self):
+        for name in self.stat_sources():
+            self.bot.stats.remove_source(name)
+        self.watch_event_config.cancel()
+        self.send_rsvp_digests.cancel()
+        if self._reminder_timer:
+            self._reminder_timer.cancel()
+        if self.trace_recorder:
+            self.trace_recorder.detach(self.bot)
+            self.trace_recorder.close()
+
+    async def cog_before_slash_command_invoke(self, inter: AppCmdInter):
+        self._command_started[inter.id] = time.perf_counter()
+
+    async def cog_after_slash_command_invoke(self, inter: AppCmdInter):
+        started = self._command_started.pop(inter.id, None)
+        if started is not None:
+            metrics.observe("command_seconds", time.perf_counter() - started,
+                            command=inter.application_command.qualified_name,
+                            failed=str(getattr(inter, "command_failed", False)))
+
+    cog_before_message_command_invoke = cog_before_slash_command_invoke
+    cog_after_message_command_invoke = cog_after_slash_command_invoke
 
     @commands.Cog.listener()
+    @timed_listener
     async def on_ready(self):
-        await self.read_from_event_records()
-        await self.read_event_config()
-
-        guild = await self.bot.fetch_guild(self.bot.keys.TEST_SERVER_ID)
-        events = await guild.fetch_scheduled_events()
-        roles = await guild.fetch_roles()
-
-        await self.add_all_late_roles(guild, events)
-        await self.remind_of_events(events)
-        await self.purge_old_events(guild)
+        # on_ready fires again after the gateway reconnects, so never run two reconciliations at once.
+        if self._reconciling.locked():
+            logger.info("Skipping startup reconciliation since one is already running.")
+            return
+        async with self._reconciling:
+            with self.bot.startup.phase("reconcile"):
+                if self.event_records is None:
+                    await self.read_from_event_records()
+                if self.bot.keys.GATEWAY_TRACE_FILE and self.trace_recorder is None:
+                    self.start_trace_recorder()
+                await self.read_event_config()
+                if not self.watch_event_config.is_running():
+                    self.watch_event_config.start()
+                if not self.send_rsvp_digests.is_running():
+                    self.send_rsvp_digests.start()
+                self.resume_jobs()
+                # Every guild is reconciled on its own, so a large or slow guild does not hold up the others.
+                guild_ids = set(self.guild_configs) | set(self.event_records.guild_ids())
+                await asyncio.gather(
+                    *[self.timed_phase(f"reconcile guild {guild_id}", self.reconcile_guild(guild_id))
+                      for guild_id in guild_ids],
+                    self.timed_phase("RSVP message cleanup", self.retry_rsvp_cleanup()))
 
     @commands.Cog.listener()
+    @timed_listener
     async def on_guild_scheduled_event_create(self, event: disnake.GuildScheduledEvent):
-        await self.announce_event_and_create_thread(event)
+        await self.event_dispatcher.submit(event.id, lambda: self.announce_event_and_create_thread(event),
+                                           coalesce="create")
 
     @commands.Cog.listener()
+    @timed_listener
     async def on_guild_scheduled_event_update(self, event_before: disnake.GuildScheduledEvent,
                                               event_after: disnake.GuildScheduledEvent):
+        # event_after is the cached event, which later updates change in place, so an update that others were
+        # coalesced into still sees the latest state and compares it with the oldest one.
+        await self.event_dispatcher.submit(event_after.id, lambda: self.update_event(event_before, event_after),
+                                           coalesce="update")
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_guild_scheduled_event_subscribe(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
+        await self.event_dispatcher.submit(event.id, lambda: self.subscribe_to_event(event, subscriber),
+                                           coalesce=("subscribe", subscriber.id))
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_guild_scheduled_event_unsubscribe(self, event: disnake.GuildScheduledEvent,
+                                                   subscriber: disnake.Member):
+        await self.event_dispatcher.submit(event.id, lambda: self.unsubscribe_from_event(event, subscriber),
+                                           coalesce=("unsubscribe", subscriber.id))
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_guild_scheduled_event_delete(self, event: disnake.GuildScheduledEvent):
+        await self.event_dispatcher.submit(event.id, lambda: self.delete_event(event.guild_id, event.id),
+                                           coalesce="delete")
+
+    async def update_event(self, event_before: disnake.GuildScheduledEvent, event_after: disnake.GuildScheduledEvent):
         if (event_after.status == disnake.GuildScheduledEventStatus.completed or
             event_after.status == disnake.GuildScheduledEventStatus.canceled)\
-                and self.event_records.event_to_thread.get(event_before.id):
+                and event_before.id in self.event_records:
             await self.delete_event(event_after.guild_id, event_after.id)
             return
-        if (not self.event_records.event_to_thread) or (event_after.id not in self.event_records.event_to_thread):
+        if event_after.id not in self.event_records:
             await self.announce_event_and_create_thread(event_after)
         if event_before.name != event_after.name:
-            await self.rename_event_role_and_thread(event_before, event_after)
+            self.request_rename(event_after)
+        if (event_before.scheduled_start_time != event_after.scheduled_start_time
+                or event_before.status != event_after.status):
+            self.schedule_reminders([event_after])
 
-    @commands.Cog.listener()
-    async def on_guild_scheduled_event_subscribe(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
-        event_thread = self.bot.get_channel(self.event_records.event_to_thread.get(event.id))
+    async def subscribe_to_event(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
+        event_thread = self.bot.get_channel(self.event_records.thread_id(event.id))
         if event_thread:
             await self.add_role_and_ping_in_thread(event, subscriber)
-            if self.rsvp_messages.get(event.id) is not None:
+            if event.id in self.rsvp_states:
                 await self.send_late_rsvp(event, subscriber)
 
-    @commands.Cog.listener()
-    async def on_guild_scheduled_event_unsubscribe(self, event: disnake.GuildScheduledEvent,
-                                                   subscriber: disnake.Member):
-        event_thread = self.bot.get_channel(self.event_records.event_to_thread.get(event.id))
+    async def unsubscribe_from_event(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
+        event_thread = self.bot.get_channel(self.event_records.thread_id(event.id))
         if event_thread:
             await self.unsubscribe_event_role(event, subscriber)
 
-    @commands.Cog.listener()
-    async def on_guild_scheduled_event_delete(self, event: disnake.GuildScheduledEvent):
-        event_thread = self.bot.get_channel(self.event_records.event_to_thread.get(event.id))
-        if event_thread:
-            await self.delete_event(event.guild_id, event.id)
-
     """ Announcement and Thread Creation """
 
     @commands.message_command(name="Start Event Management")
     async def event_management(self, inter: AppCmdInter, event_msg: disnake.Message):
         await inter.response.defer(ephemeral=True)
-        if inter.author.id not in [self.bot.keys.BOT_OWNER_ID, self.bot.keys.TEST_SERVER_MOD_ID]:
-            await inter.followup.send("Only the bot owner can use this command.", ephemeral=True)
+        if not self.is_event_admin(inter):
+            await inter.followup.send("Only the bot owner or the server's event moderator can use this command.",
+                                      ephemeral=True)
             return
 
         event_id = await find_event_id(event_msg.content)
@@ -122,63 +227,89 @@ class ScheduledEventCog(commands.Cog):
             await inter.followup.send("There is not a valid event thread connected to this message.",
                                       ephemeral=True)
             return
-        event_thread = await inter.guild.fetch_channel(event_thread_id)
+        event_thread = await self.bot.resolver.channel(event_thread_id)
 
         metro_role_id = await find_metro_role_id(event_msg.content)
         if not metro_role_id:
             await inter.followup.send("No metro events role was found in this message.", ephemeral=True)
             return
 
-        if self.event_records.event_to_thread.get(event_id):
+        if event_id in self.event_records:
             await inter.followup.send("This event already is being managed by the bot.", ephemeral=True)
             return
 
         event_role = await create_event_role(event.name, event_msg.guild, metro_role_id)
-        event_role = await add_event_role_to_users(event_role, event, metro_role_id)
+        job, failed = await self.assign_event_role(event, event_role,
+                                                   on_progress=interaction_progress(inter, "Adding the event role"))
         await self.send_help_message(event_msg, event, event_thread, event_role)
-        await inter.followup.send("Event management successful.", ephemeral=True)
-
-    async def get_event_message(self, event: disnake.GuildScheduledEvent):
+        await inter.followup.send(f"Event management successful. The event role was added to "
+                                  f"{job.done} of {job.total} subscribers.", ephemeral=True)
+        if failed:
+            for content in chunk_mentions([user_id for *_, user_id in failed],
+                                          suffix="could not be given the event role."):
+                await inter.followup.send(content, ephemeral=True)
+
+    def moderator_id(self, guild_id: Optional[int]) -> int:
+        """The event moderator of the guild, or TEST_SERVER_MOD_ID for a guild without an event config."""
+        guild_config = self.guild_configs.get(guild_id)
+        return guild_config.moderator_id if guild_config else self.bot.keys.TEST_SERVER_MOD_ID
+
+    def is_event_admin(self, inter: AppCmdInter) -> bool:
+        return inter.author.id in (self.bot.keys.BOT_OWNER_ID, self.moderator_id(inter.guild_id))
+
+    def route_event(self, event: disnake.GuildScheduledEvent) -> Optional[MetroRoute]:
+        guild_config = self.guild_configs.get(event.guild_id)
+        return guild_config.metro_routing.route(event.name) if guild_config else None
+
+    async def get_event_message(self, event: disnake.GuildScheduledEvent, metro_route: Optional[MetroRoute] = None):
         """
         Get the event announcement message.
         """
+        metro_route = metro_route or self.route_event(event)
         event_link = await get_event_link(event.guild_id, event.id)
-        event_metroplex = await get_metroplex_listed(event.name)
-        if event_metroplex == "TX":
-            metro_role_ids = [f"<@&{metroplex_role_id}>" for metroplex_role_id in self.metroplex_roles.values()]
-            return "".join(metro_role_ids) + "\n" + f"New event: {event.name}\n" + event_link
-        else:
-            metro_role_id = self.metroplex_roles.get(event_metroplex)
-            return f"<@&{metro_role_id}>\n" + f"New event: {event.name}\n" + event_link
+        mention = metro_route.mention if metro_route else ""
+        return f"{mention}\nNew event: {event.name}\n{event_link}"
 
     async def announce_event_and_create_thread(self, event: disnake.GuildScheduledEvent):
         """
         Creates the announcement message and creates the corresponding thread.
         """
+        guild_config = self.guild_configs.get(event.guild_id)
+        if not guild_config:
+            logger.info(f"{event.name} ({event.id}) is in guild {event.guild_id}, which has no event config.")
+            return
         event_link = await get_event_link(event.guild_id, event.id)
-        event_metroplex = await get_metroplex_listed(event.name)
+        metro_route = guild_config.metro_routing.route(event.name)
 
-        # Hacky solution to let statewide events default to DTX
-        if event_metroplex == "TX":
-            event_metroplex = "DTX"
-
-        # Event does not have the correct tag so alert the bot owner
-        if not event_metroplex:
-            await self.alert_invalid_event_name(event_link)
-            logger.info(f"{event.name} ({event_link}) has no metro and the bot owner has been notified.")
+        # Event does not have the correct tag so alert the guild's event moderator
+        if not metro_route:
+            await self.alert_invalid_event_name(event.guild_id, event_link)
+            logger.info(f"{event.name} ({event_link}) has no metro and the event moderator has been notified.")
             return
 
         # Announce event and create thread
-        announce_msg = await self.irl_events_channel.send(await self.get_event_message(event))
+        irl_events_channel = self.bot.get_channel(guild_config.irl_events_channel_id)
+        announce_msg = await irl_events_channel.send(await self.get_event_message(event, metro_route))
         event_thread = await announce_msg.create_thread(name=event.name)
         logger.info(f"**{event.name}** has been announced ({announce_msg.jump_url}).")
 
         # Start event role management
-        metro_role_id = self.metroplex_roles.get(event_metroplex)
-        event_role = await create_event_role(event.name, event.guild, metro_role_id)
-        event_role = await add_event_role_to_users(event_role, event, metro_role_id)
+        event_role = await create_event_role(event.name, event.guild, metro_route.role_id)
+        await self.assign_event_role(event, event_role)
         await self.send_help_message(announce_msg, event, event_thread, event_role)
 
+    async def assign_event_role(self, event: disnake.GuildScheduledEvent, event_role: disnake.Role,
+                                on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+                                ) -> Tuple[Job, List[RoleChange]]:
+        """
+        Adds the event role to all event subscribers in parallel and returns the job along with the changes that failed.
+        """
+        diff = await self.role_reconciler.diff(event.id, event_role, iter_event_subscribers(event))
+        diff.to_remove.clear()
+        job = await self.job_queue.submit(ROLES_JOB, event.guild_id, {"event_names": {}},
+                                          self.role_reconciler.changes([diff]))
+        return job, await self.job_queue.start(job, lambda job: self.run_roles_job(job, on_progress))
+
     async def send_help_message(self,
                                 announce_msg: disnake.Message,
                                 event: disnake.GuildScheduledEvent,
@@ -189,63 +320,125 @@ class ScheduledEventCog(commands.Cog):
         await event_thread.send(f"You can ping <@&{event_role.id}> to talk to all interested users.")
         await event_thread.send(f"The host can use the `/send_rsvp` command for an RSVP message to be DMed "
                                 f"to all interested users. The updated RSVP list will be sent to you.")
-        await self.event_records.add_event(event.id, event_thread.id, announce_msg.id, event_role.id)
+        await self.event_records.add_event(event.id, event.guild_id, event_thread.id, announce_msg.id, event_role.id)
+        self.event_artifacts.add(event.id, event.name, event_thread, announce_msg, event_role)
+        self.schedule_reminders([event])
 
-    async def alert_invalid_event_name(self, event_link):
+    async def alert_invalid_event_name(self, guild_id: int, event_link: str):
         """
-        Notify bot owner to fix the event so that the proper role can be pinged.
+        Notify the guild's event moderator to fix the event so that the proper role can be pinged.
         """
-        bot_owner = self.bot.fetch_user(self.bot.keys.TEST_SERVER_MOD_ID)
-        await bot_owner.send(f"The following event does not list the metroplex tag. "
+        moderator = await self.bot.get_or_fetch_user(self.moderator_id(guild_id))
+        await moderator.send(f"The following event does not list the metroplex tag. "
                              f"Please edit and fix the event for the thread to be created. \n"
                              f"{event_link}")
 
     """ Event Role """
 
-    async def rename_event_role_and_thread(self, event_before: disnake.GuildScheduledEvent,
-                                           event_after: disnake.GuildScheduledEvent):
-        if event_before.name == event_after.name:
-            raise RuntimeError("Event name is the same so the event cannot be renamed.")
-        if event_after.id not in self.event_records.event_to_thread.keys():
-            raise ReferenceError("Event records does not have this event in it.")
+    def request_rename(self, event: disnake.GuildScheduledEvent):
+        """
+        Renames the event's role, thread, and announcement once its name has stopped changing for the rename window,
+        so a burst of renames only edits them once with the final name.
+        """
+        self.renamed_events[event.id] = event
+        event_renamer = self.event_renamers.get(event.id)
+        if event_renamer is None:
+            event_renamer = EditCoalescer(lambda: self.rename_event_role_and_thread(event.id),
+                                          window=self.event_rename_window)
+            self.event_renamers[event.id] = event_renamer
+        event_renamer.request()
+
+    async def rename_event_role_and_thread(self, event_id: int):
+        event = self.renamed_events.pop(event_id, None)
+        if event is None or event_id not in self.event_records:
+            return
+        try:
+            artifacts = self.event_artifacts.get(event_id) or await self.resolve_event_artifacts(event)
+            if artifacts.name == event.name:
+                return
+            edits = [artifacts.role.edit(name=event.name), artifacts.thread.edit(name=event.name)]
+            if artifacts.message.author.id == self.bot.keys.BOT_ID:
+                edits.append(artifacts.message.edit(content=(await self.get_event_message(event))))
+            edited = await asyncio.gather(*edits)
+        except Exception as e:
+            await self.bot.notify_bot_owner(e)
+            return
+
+        logger.info(f"Event ({event_id}) has changed from **{artifacts.name}** to {event.name}")
+        artifacts.name = event.name
+        artifacts.role, artifacts.thread = edited[0], edited[1]
+        if len(edited) > 2:
+            artifacts.message = edited[2]
+
+    async def resolve_event_artifacts(self, event: disnake.GuildScheduledEvent) -> EventArtifacts:
+        """
+        Looks up the thread, announcement, and role of an event that is not in the artifact cache yet and caches them.
+        """
+        event_role = await self.fetch_event_role(event.guild_id, event.id)
+        event_thread = await self.bot.resolver.channel(self.event_records.thread_id(event.id))
+        # The announcement is the thread's starter message, so the thread's parent is the channel it was sent in.
+        event_message = await self.bot.resolver.message(event_thread.parent, self.event_records.message_id(event.id))
+        # The thread is named after the event, so it shows the name the artifacts were last given.
+        return self.event_artifacts.add(event.id, event_thread.name, event_thread, event_message, event_role)
 
-        event_role = await self.fetch_event_role(event_after.guild_id, event_after.id)
-        event_guild = await self.bot.fetch_guild(event_after.guild_id)
-        event_thread = await event_guild.fetch_channel(self.event_records.event_to_thread.get(event_after.id))
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_thread_update(self, before: disnake.Thread, after: disnake.Thread):
+        event_record = self.event_records.by_thread(after.id) if self.event_records is not None else None
+        if event_record:
+            self.event_artifacts.update_thread(event_record.event_id, after)
 
-        await event_role.edit(name=event_after.name)
-        await event_thread.edit(name=event_after.name)
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_guild_role_update(self, before: disnake.Role, after: disnake.Role):
+        event_record = self.event_records.by_role(after.id) if self.event_records is not None else None
+        if event_record:
+            self.event_artifacts.update_role(event_record.event_id, after)
 
-        event_message = await self.irl_events_channel.fetch_message(
-            self.event_records.event_to_message.get(event_after.id))
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_thread_delete(self, thread: disnake.Thread):
+        event_record = self.event_records.by_thread(thread.id) if self.event_records is not None else None
+        if event_record:
+            self.event_artifacts.pop(event_record.event_id)
 
-        if event_message.author.id == self.bot.keys.BOT_ID:
-            await event_message.edit(content=(await self.get_event_message(event_after)))
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_guild_role_delete(self, role: disnake.Role):
+        event_record = self.event_records.by_role(role.id) if self.event_records is not None else None
+        if event_record:
+            self.event_artifacts.pop(event_record.event_id)
 
-        logger.info(f"Event ({event_after.id}) has changed from **{event_before.name}** to {event_after.name}")
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_raw_message_delete(self, payload: disnake.RawMessageDeleteEvent):
+        event_record = self.event_records.by_message(payload.message_id) if self.event_records is not None else None
+        if event_record:
+            self.event_artifacts.pop(event_record.event_id)
 
     async def add_role_and_ping_in_thread(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
         if subscriber.id == event.creator_id:
             return
-        event_thread = self.bot.get_channel(self.event_records.event_to_thread.get(event.id))
+        event_thread = self.bot.get_channel(self.event_records.thread_id(event.id))
         if not event_thread:
             return
         event_role = await self.fetch_event_role(event.guild_id, event.id)
         await subscriber.add_roles(event_role)
-        logger.info(f"{subscriber.name} ({subscriber.id}) has added the role {event_role.name} ({event_role.id})")
+        role_logger.info("%s has added the role %s", subscriber.name, event_role.name,
+                         extra={"event_id": event.id, "user_id": subscriber.id, "role_id": event_role.id})
         await event_thread.send(f"<@{subscriber.id}> is interested in **{event.name}**!")
 
     async def unsubscribe_event_role(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
-        if not self.event_records.event_to_thread.get(event.id):
+        if event.id not in self.event_records:
             return
         event_role = await self.fetch_event_role(event.guild_id, event.id)
         await subscriber.remove_roles(event_role)
-        logger.info(f"{subscriber.name} ({subscriber.id}) has removed the role {event_role.name} ({event_role.id})")
+        role_logger.info("%s has removed the role %s", subscriber.name, event_role.name,
+                         extra={"event_id": event.id, "user_id": subscriber.id, "role_id": event_role.id})
 
     async def fetch_event_role(self, guild_id: int, event_id: int) -> disnake.Role:
-        event_role_id = self.event_records.event_to_role.get(event_id)
-        guild = await self.bot.fetch_guild(guild_id)
-        event_role = guild.get_role(event_role_id)
+        event_role_id = self.event_records.role_id(event_id)
+        event_role = await self.bot.resolver.role(guild_id, event_role_id)
         if not event_role:
             raise LookupError(f"Fetched event role for {event_role_id}, but it does not exist.")
         return event_role
@@ -253,98 +446,351 @@ class ScheduledEventCog(commands.Cog):
     """ RSVP Message """
 
     async def send_rsvp_message(self, event: disnake.GuildScheduledEvent,
-                                subscriber: disnake.Member, rsvp_list_message: disnake.Message) -> disnake.Message:
-        event_thread = self.bot.get_channel(self.event_records.event_to_thread.get(event.id))
-        if not event_thread:
-            raise LookupError(f"Event thread {event.id} not found.")
-        event_creator = await self.bot.fetch_user(event.creator_id)
-
-        rsvp_view = RsvpView(event, event_thread, rsvp_list_message, subscriber, event_creator)
-        rsvp_message = await subscriber.send(embed=rsvp_view.dm_embed, view=rsvp_view)
-        logger.info(f"{subscriber.name} ({subscriber.id}) has been sent an RSVP for {event.name} ({event.id})")
+                                subscriber: Union[disnake.Member, disnake.User],
+                                content: Optional[str] = None) -> disnake.Message:
+        rsvp_message = await subscriber.send(content, embed=rsvp_dm_embed(event), components=rsvp_buttons(event.id))
+        await self.event_records.backend.add_rsvp_message(event.id, rsvp_message.channel.id, rsvp_message.id)
+        rsvp_logger.info("%s has been sent an RSVP for %s", subscriber.name, event.name,
+                         extra={"event_id": event.id, "user_id": subscriber.id})
         return rsvp_message
 
+    def creator_dms(self, rsvp_state: RsvpState) -> disnake.PartialMessageable:
+        """
+        The RSVP list lives in the creator's DMs, so its channel can be used to message them without a fetch.
+        """
+        return self.bot.get_partial_messageable(rsvp_state.list_channel_id)
+
     @commands.slash_command(description="Send slash commands for this event to all interested users.")
     async def send_rsvp(self, inter: AppCmdInter):
         await inter.response.defer(ephemeral=True)
-        event_id_of_thread = get_key(self.event_records.event_to_thread, inter.channel_id)
-        if not event_id_of_thread:
+        event_record = self.event_records.by_thread(inter.channel_id)
+        if not event_record:
             await inter.followup.send("This command can only be used in a valid event thread.", ephemeral=True)
             return
-        event = await inter.guild.fetch_scheduled_event(event_id_of_thread)
+        event = await inter.guild.fetch_scheduled_event(event_record.event_id)
         if inter.author.id != event.creator_id:
             await inter.followup.send("This command can only be used by the event creator.", ephemeral=True)
             return
-        if self.rsvp_list_messages.get(event.id):
+        if event.id in self.rsvp_states:
             await inter.followup.send("You have already sent out the RSVP messages.", ephemeral=True)
+            return
 
         # Create and send the RSVP list to the event creator
-        event_creator = await self.bot.fetch_user(event.creator_id)
-        rsvp_embed = await get_empty_rsvp_embed(event.creator_id, event.name)
+        event_creator = inter.author
+        rsvp_state = RsvpState(event.id, event.name, event.creator_id, list_channel_id=None, list_message_id=None)
         try:
-            rsvp_list_message = await event_creator.send(embed=rsvp_embed)
+            rsvp_list_message = await event_creator.send(embed=rsvp_state.render_embed())
         except:
             await inter.followup.send("I was unable to DM you.", ephemeral=True)
             return
-        self.rsvp_list_messages[event.id] = rsvp_list_message.id
+        rsvp_state.list_channel_id = rsvp_list_message.channel.id
+        rsvp_state.list_message_id = rsvp_list_message.id
+        self.rsvp_states[event.id] = rsvp_state
+        rsvp_state.attach(self.rsvp_totals)
+        await self.event_records.backend.upsert_rsvp_list(event.id, event.name, event.creator_id,
+                                                          rsvp_state.list_channel_id, rsvp_state.list_message_id)
 
         # Create and send the RSVP messages
-        self.rsvp_messages[event.id] = []
-        event_subscribers = await event.fetch_users()
-        for subscriber in event_subscribers:
-            if subscriber.id == event.creator_id:
-                continue
+        event_subscribers = {subscriber.id: subscriber async for subscriber in iter_event_subscribers(event)
+                             if subscriber.id != event.creator_id}
+        job = await self.job_queue.submit(RSVP_JOB, event.guild_id, {"event_id": event.id}, event_subscribers)
+        await self.job_queue.start(job, lambda job: self.run_rsvp_job(
+            job, event, event_subscribers, on_progress=interaction_progress(inter, "Sending RSVP messages")))
+        summary = f"RSVP messages have been sent to {job.done} of {job.total} interested users!"
+        try:
+            await inter.followup.send(summary)
+        except disnake.HTTPException:
+            # Sending to a large event can outlast the 15 minute interaction token, so tell the creator by DM instead.
+            await rsvp_list_message.channel.send(summary)
+
+    async def run_rsvp_job(self, job: Job, event: Optional[disnake.GuildScheduledEvent] = None,
+                           subscribers: Optional[Dict[int, Union[disnake.Member, disnake.User]]] = None,
+                           on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None):
+        """
+        DMs the RSVP message to every subscriber in the job who has not been sent one yet, then tells the event creator
+        who could not be DMed. A resumed job looks up the event and the subscribers it still has to DM. Reminder jobs
+        send the RSVP message again with a reminder.
+        """
+        event_id = job.params["event_id"]
+        rsvp_state = self.rsvp_states.get(event_id)
+        if event is None and rsvp_state is not None:
             try:
-                rsvp_msg = await self.send_rsvp_message(event, subscriber, rsvp_list_message)
-                self.rsvp_messages[event.id].append(rsvp_msg.id)
-            except:
-                await event_creator.send(f"<@{subscriber.id}> was not able to be DMed.")
+                event = await (await self.bot.resolver.guild(job.guild_id)).fetch_scheduled_event(event_id)
+            except disnake.NotFound:
+                pass
+        if event is None or rsvp_state is None:
+            rsvp_logger.info("Dropping the RSVP job %d since the event is over.", job.job_id,
+                             extra={"event_id": event_id})
+            await self.job_queue.finish(job)
+            return
+        subscribers = subscribers or {}
+        content = rsvp_reminder_content(event) if job.kind == REMINDER_JOB else None
+
+        async def send_rsvp_to(user_id: int):
+            if event.id not in self.rsvp_states:
+                # The event ended while its RSVP messages were being sent.
+                return
+            subscriber = subscribers.get(user_id) or await self.bot.get_or_fetch_user(user_id)
+            await self.send_rsvp_message(event, subscriber, content=content)
+
+        with rest_priority(BULK, job=f"rsvp:{event.id}"):
+            result = await self.job_queue.run(job, send_rsvp_to, concurrency=self.rsvp_fan_out_concurrency,
+                                              rate=self.rsvp_dms_per_second, on_progress=on_progress)
+        rsvp_logger.info("Sent %d/%d RSVP messages for %s in %.1fs (%.1f DMs/s)", job.done, job.total, event.name,
+                         result.elapsed, result.throughput, extra={"event_id": event.id})
+
+        failed_user_ids = await self.job_queue.items(job, FAILED) if job.kind == RSVP_JOB else []
+        if failed_user_ids and event.id in self.rsvp_states:
+            creator_dms = self.creator_dms(rsvp_state)
+            for content in chunk_mentions(failed_user_ids, suffix="could not be DMed."):
+                await creator_dms.send(content)
+        await self.job_queue.finish(job)
+
+    """ RSVP Reminders """
+
+    def schedule_reminders(self, events: Iterable[disnake.GuildScheduledEvent]):
+        """
+        Keeps the RSVP reminders of the events in line with their start times. Only managed events that have not
+        started get reminders.
+        """
+        now = time.time()
+        for event in events:
+            if event.id in self.event_records and event.status == disnake.GuildScheduledEventStatus.scheduled:
+                self.reminder_schedule.schedule(event.id, event.scheduled_start_time.timestamp(), now)
+            else:
+                self.reminder_schedule.unschedule(event.id)
+        self.arm_reminder_timer()
 
-        await inter.followup.send("RSVP messages have been sent!")
+    def arm_reminder_timer(self):
+        """
+        Sets a single timer for the next reminder, so nothing runs between reminders no matter how many events there
+        are.
+        """
+        next_due = self.reminder_schedule.next_due()
+        if self._reminder_timer is not None:
+            if next_due == self._reminder_timer_due:
+                return
+            self._reminder_timer.cancel()
+            self._reminder_timer = None
+        if next_due is not None:
+            self._reminder_timer_due = next_due
+            self._reminder_timer = asyncio.get_running_loop().call_later(max(0.0, next_due - time.time()),
+                                                                         self.send_due_reminders)
+
+    def send_due_reminders(self):
+        self._reminder_timer = None
+        for event_id, offset, start_time in self.reminder_schedule.pop_due(time.time()):
+            if event_id in self.rsvp_states:
+                task = asyncio.create_task(self.remind_to_rsvp(event_id, offset, start_time))
+                self._reminder_tasks.add(task)
+                task.add_done_callback(self._reminder_tasks.discard)
+        self.arm_reminder_timer()
+
+    async def remind_to_rsvp(self, event_id: int, offset: float, start_time: float):
+        """
+        Sends the RSVP message again to every subscriber of the event who has not RSVPed yet. The reminder is recorded
+        as sent once its job is queued, and the job itself resumes after a restart.
+        """
+        try:
+            event_record = self.event_records.get(event_id)
+            rsvp_state = self.rsvp_states.get(event_id)
+            if not event_record or not rsvp_state:
+                return
+            guild = await self.bot.resolver.guild(event_record.guild_id)
+            event = guild.get_scheduled_event(event_id) or await guild.fetch_scheduled_event(event_id)
+            subscribers = {subscriber.id: subscriber async for subscriber in iter_event_subscribers(event)
+                           if subscriber.id not in rsvp_state}
+            rsvp_logger.info("Reminding %d subscribers of %s to RSVP.", len(subscribers), event.name,
+                             extra={"event_id": event_id})
+            if not subscribers:
+                await self.event_records.backend.set_reminder_sent(event_id, start_time, offset)
+                return
+            job = await self.job_queue.submit(REMINDER_JOB, event.guild_id, {"event_id": event_id}, subscribers)
+            await self.event_records.backend.set_reminder_sent(event_id, start_time, offset)
+            await self.job_queue.start(job, lambda job: self.run_rsvp_job(job, event, subscribers))
+        except Exception as e:
+            logger.warning(f"Could not send the RSVP reminders for {event_id}.")
+            await self.bot.notify_bot_owner(e)
 
     async def send_late_rsvp(self, event: disnake.GuildScheduledEvent, subscriber: disnake.Member):
-        if self.rsvp_messages.get(event.id) is None:
+        if event.id not in self.rsvp_states:
             # RSVP messages have not been sent out yet.
             return
-        event_thread = await event.guild.fetch_channel(self.event_records.event_to_thread.get(event.id))
-        if not event_thread:
+        await self.send_rsvp_message(event, subscriber)
+
+    @commands.Cog.listener()
+    @timed_listener
+    async def on_button_click(self, inter: disnake.MessageInteraction):
+        """
+        Handles the buttons of every RSVP message ever sent. All state is looked up from the button's custom_id.
+        """
+        rsvp_button = parse_rsvp_custom_id(inter.data.custom_id)
+        if not rsvp_button:
+            return
+        event_id, status = rsvp_button
+        rsvp_state = self.rsvp_states.get(event_id)
+        if not rsvp_state:
+            await inter.response.edit_message(content="This event is no longer taking RSVPs.", components=[])
             return
-        event_creator = await self.bot.fetch_user(event.creator_id)
 
-        rsvp_list_message_id = self.rsvp_list_messages.get(event.id)
-        if not rsvp_list_message_id:
+        notify_creator = rsvp_state.creator_id != inter.author.id
+        in_digest = notify_creator and self.uses_rsvp_digest(rsvp_state)
+        if rsvp_state.set_status(inter.author.id, status) != status:
+            seq = await self.event_records.backend.set_rsvp_status(event_id, inter.author.id, status,
+                                                                   notify_in_digest=in_digest)
+            if in_digest:
+                self.rsvp_digest.add(event_id, inter.author.id, status, seq)
+            self.rsvp_list_editor(rsvp_state).request()
+
+        await inter.response.edit_message(content=RSVP_CONFIRMATIONS[status],
+                                          components=rsvp_buttons(event_id, selected=status))
+        if notify_creator and not in_digest:
+            notification = RSVP_NOTIFICATIONS[status].format(user_id=inter.author.id,
+                                                             event_name=rsvp_state.event_name)
+            await self.creator_dms(rsvp_state).send(notification)
+            rsvp_logger.info(notification, extra={"event_id": event_id, "user_id": inter.author.id})
+
+    def uses_rsvp_digest(self, rsvp_state: RsvpState) -> bool:
+        """
+        Small events notify their creator of every RSVP right away. Larger ones send a digest every interval instead.
+        """
+        return self.rsvp_digest_interval > 0 and rsvp_state.response_count() > self.rsvp_digest_min_rsvps
+
+    @tasks.loop(seconds=DEFAULT_RSVP_DIGEST_INTERVAL)
+    async def send_rsvp_digests(self):
+        """
+        Sends each event creator one message with the RSVP changes to their events since the last digest.
+        Digests that could not be sent are kept for the next one.
+        """
+        changes_by_creator: Dict[int, List[Tuple[RsvpState, Dict[int, RsvpStatus]]]] = {}
+        pending, taken_seq = self.rsvp_digest.take()
+        for event_id, statuses in pending.items():
+            rsvp_state = self.rsvp_states.get(event_id)
+            if rsvp_state:
+                changes_by_creator.setdefault(rsvp_state.creator_id, []).append((rsvp_state, statuses))
+        if not changes_by_creator:
             return
 
-        rsvp_list_message = await event_creator.fetch_message(rsvp_list_message_id)
+        async def send_digest(changes: List[Tuple[RsvpState, Dict[int, RsvpStatus]]]):
+            creator_dm = self.creator_dms(changes[0][0])
+            for content in render_digest(changes):
+                await creator_dm.send(content)
+            return changes
 
-        rsvp_view = RsvpView(event, event_thread, rsvp_list_message, subscriber, event_creator)
-        rsvp_msg = await subscriber.send(embed=rsvp_view.dm_embed, view=rsvp_view)
-        self.rsvp_messages[event.id].append(rsvp_msg.id)
+        try:
+            with rest_priority(BULK, job="rsvp-digests"):
+                result = await FanOut(send_digest, concurrency=self.rsvp_fan_out_concurrency,
+                                      rate=self.rsvp_dms_per_second).run(changes_by_creator.values())
+            for changes, _ in result.failed:
+                self.rsvp_digest.restore({rsvp_state.event_id: statuses for rsvp_state, statuses in changes})
+            # A user who changed their RSVP again while the digest was sent has a newer change stored, which is kept.
+            await self.event_records.backend.delete_rsvp_notifications(
+                [(rsvp_state.event_id, user_id) for changes in result.results
+                 for rsvp_state, statuses in changes for user_id in statuses], taken_seq)
+        except Exception as e:
+            # An exception would stop the loop, so it is reported instead.
+            await self.bot.notify_bot_owner(e)
+            return
+        rsvp_logger.info("Sent RSVP digests to %d/%d event creators.", len(result.results), len(changes_by_creator))
+
+    def rsvp_list_editor(self, rsvp_state: RsvpState) -> EditCoalescer:
+        rsvp_list_editor = self.rsvp_list_editors.get(rsvp_state.event_id)
+        if rsvp_list_editor is None:
+            # A PartialMessageable cannot make partial messages, so the RSVP list is edited by its IDs directly.
+            rsvp_list_editor = EditCoalescer(
+                lambda: self.bot.http.edit_message(rsvp_state.list_channel_id, rsvp_state.list_message_id, files=None,
+                                                   embeds=[rsvp_state.render_embed().to_dict()]),
+                window=self.rsvp_list_edit_window)
+            self.rsvp_list_editors[rsvp_state.event_id] = rsvp_list_editor
+        return rsvp_list_editor
+
+    @commands.slash_command(description="Show how many users are going to this event.")
+    async def rsvp_counts(self, inter: AppCmdInter):
+        event_record = self.event_records.by_thread(inter.channel_id)
+        if not event_record:
+            await inter.response.send_message("This command can only be used in a valid event thread.",
+                                              ephemeral=True)
+            return
+        rsvp_state = self.rsvp_states.get(event_record.event_id)
+        if not rsvp_state:
+            await inter.response.send_message("RSVP messages have not been sent out for this event yet.",
+                                              ephemeral=True)
+            return
+        counts = rsvp_state.counts()
+        await inter.response.send_message(", ".join(f"{counts[status]} {status.label.lower()}"
+                                                    for status in RsvpStatus), ephemeral=True)
 
     async def delete_all_rsvp_messages(self, event_id):
-        if self.rsvp_messages.get(event_id) is None:
+        await self.clean_up_rsvp_messages(event_id)
+        self.rsvp_digest.discard(event_id)
+        rsvp_state = self.rsvp_states.pop(event_id, None)
+        if rsvp_state is None:
             # RSVP messages were not sent
             return
-        # Delete each individual list
-        for rsvp_msg_id in self.rsvp_messages.get(event_id):
-            msg = self.bot.get_message(rsvp_msg_id)
-            await msg.delete()
-        logger.info(f"Deleted {len(self.rsvp_messages.get(event_id))} messages for event {event_id}.")
-        self.rsvp_messages.pop(event_id)
-        self.rsvp_list_messages.pop(event_id)
+        rsvp_state.detach()
+        await self.event_records.backend.delete_rsvps(event_id)
+        rsvp_list_editor = self.rsvp_list_editors.pop(event_id, None)
+        if rsvp_list_editor:
+            await rsvp_list_editor.flush()
+            rsvp_logger.info("Coalescing saved %d of %d RSVP list edits, %d edits failed.", rsvp_list_editor.saved,
+                             rsvp_list_editor.requested, rsvp_list_editor.failed, extra={"event_id": event_id})
+
+    async def clean_up_rsvp_messages(self, event_id: int):
+        """
+        Deletes every RSVP DM sent for the event by its stored location, without fetching the messages first.
+        Messages that could not be deleted stay recorded so that the next cleanup retries them.
+        """
+        rsvp_message_locations = await self.event_records.backend.load_rsvp_messages(event_id)
+        if not rsvp_message_locations:
+            return
+
+        async def delete_rsvp_message(location: Tuple[int, int]) -> int:
+            channel_id, message_id = location
+            try:
+                await self.bot.http.delete_message(channel_id, message_id)
+            except disnake.NotFound:
+                pass
+            return message_id
+
+        with rest_priority(BULK, job=f"rsvp-cleanup:{event_id}"):
+            result = await FanOut(delete_rsvp_message, concurrency=self.rsvp_fan_out_concurrency,
+                                  retries=3).run(rsvp_message_locations)
+        await self.event_records.backend.delete_rsvp_messages(event_id, result.results)
+        if result.failed:
+            await self.event_records.backend.record_rsvp_message_failures(
+                event_id, [message_id for (_, message_id), _ in result.failed], MAX_RSVP_CLEANUP_ATTEMPTS)
+            rsvp_logger.warning("%d RSVP messages could not be deleted and will be retried.", len(result.failed),
+                                extra={"event_id": event_id})
+        rsvp_logger.info("Deleted %d/%d RSVP messages in %.1fs.", len(result.results), len(rsvp_message_locations),
+                         result.elapsed, extra={"event_id": event_id})
+
+    async def retry_rsvp_cleanup(self):
+        """
+        Retries deleting the RSVP messages of events that have ended but were not fully cleaned up.
+        """
+        for event_id in await self.event_records.backend.load_rsvp_message_event_ids():
+            if event_id not in self.event_records:
+                await self.clean_up_rsvp_messages(event_id)
 
     async def delete_event_role(self, guild_id, event_id):
-        event_guild = await self.bot.fetch_guild(guild_id)
-        event_role_id = self.event_records.event_to_role.get(event_id)
+        event_role_id = self.event_records.role_id(event_id)
         if not event_role_id:
             return
-        event_role = event_guild.get_role(event_role_id)
+        event_role = await self.bot.resolver.role(guild_id, event_role_id)
+        if not event_role:
+            return
         logger.info(f"The role {event_role.id} has been deleted for {event_id}.")
         await event_role.delete()
 
     async def delete_event(self, guild_id: int, event_id: int):
-        if not self.event_records.event_to_thread.get(event_id):
+        if event_id not in self.event_records:
             return
+        event_renamer = self.event_renamers.pop(event_id, None)
+        if event_renamer:
+            event_renamer.cancel()
+        self.renamed_events.pop(event_id, None)
+        self.event_artifacts.pop(event_id)
+        self.reminder_schedule.unschedule(event_id)
         await self.delete_all_rsvp_messages(event_id)
         await self.delete_event_role(guild_id, event_id)
         await self.event_records.remove_event(event_id)
@@ -353,58 +799,310 @@ class ScheduledEventCog(commands.Cog):
 
     async def read_from_event_records(self):
         """
-        Reads all the prior event records from the event_records.yaml file and adds them to the bot's event records
+        Reads all the prior event records from the records database and adds them to the bot's event records
         """
-        with open("./cogs/scheduled_events/event_records.yaml", "r") as f:
-            self.event_records = EventRecords(**yaml.safe_load(f))
-        if self.event_records.event_to_thread:
-            print(f"{len(self.event_records.event_to_thread)} events have been read from event_records.yaml")
+        backend = SqliteRecordsBackend(self.event_records_path)
+        migrated = await backend.migrate_from_yaml(self.legacy_event_records_path)
+        if migrated:
+            print(f"{migrated} events have been migrated from event_records.yaml")
+        # Events recorded before the bot served several guilds all belong to the test guild.
+        assigned = await backend.assign_guild(self.bot.keys.TEST_SERVER_ID)
+        if assigned:
+            print(f"{assigned} events without a guild have been assigned to guild {self.bot.keys.TEST_SERVER_ID}")
+        self.event_records = await EventRecords.load(backend)
+        self.rsvp_totals.clear()
+        self.rsvp_states = await load_rsvp_states(backend, self.rsvp_totals)
+        self.rsvp_digest = RsvpDigest(await backend.load_rsvp_notifications())
+        for event_id, start_time, offset in await backend.load_sent_reminders():
+            self.reminder_schedule.mark_sent(event_id, start_time, offset)
+        self.job_queue = JobQueue(backend)
+        await self.job_queue.load()
+        if self.event_records:
+            print(f"{len(self.event_records)} events have been read from {backend.path}")
+        if self.rsvp_states:
+            print(f"RSVPs for {len(self.rsvp_states)} events have been read from {backend.path}")
+        if len(self.rsvp_digest):
+            print(f"{len(self.rsvp_digest)} RSVP changes waiting for a digest have been read from {backend.path}")
+        if len(self.job_queue):
+            print(f"{len(self.job_queue)} unfinished jobs have been read from {backend.path}")
+
+    def start_trace_recorder(self):
+        """
+        Records the scheduled event and interaction payloads from now on, along with the event records and RSVP lists
+        that a replay needs to handle them the same way.
+        """
+        self.trace_recorder = GatewayTraceRecorder(self.bot.keys.GATEWAY_TRACE_FILE, header={
+            "guild_ids": sorted(self.guild_configs),
+            "event_records": [[record.event_id, record.guild_id, record.thread_id, record.message_id, record.role_id]
+                              for record in self.event_records],
+            "rsvp_lists": [[rsvp_state.event_id, rsvp_state.event_name, rsvp_state.creator_id,
+                            rsvp_state.list_channel_id, rsvp_state.list_message_id]
+                           for rsvp_state in self.rsvp_states.values()],
+        })
+        self.trace_recorder.attach(self.bot)
+        print(f"Recording a gateway trace to {self.trace_recorder.path}")
 
     async def read_event_config(self):
-        # Initialize the IRL events channel and metroplex roles from configs
-        with open("./cogs/scheduled_events/event_config.yaml", "r") as f:
+        """
+        Initialize each guild's IRL events channel and metroplex routing and the RSVP settings from configs.
+        Everything is parsed before any of it is applied, so a broken config leaves the previous settings in place.
+        """
+        config_mtime = os.stat(self.event_config_path).st_mtime_ns
+        with open(self.event_config_path, "r") as f:
             config = yaml.safe_load(f)
-            self.irl_events_channel = self.bot.get_channel(config["irl_events_channel_id"])
-            self.metroplex_roles = config["metroplex_roles"]
-        print(f"The IRL events channel ID was read as {config['irl_events_channel_id']} from event_config.yaml")
-        print(f"The metroplex roles from event_config.yaml were {config['metroplex_roles']}")
+        guild_configs = parse_guild_configs(config, self.bot.keys.TEST_SERVER_ID, self.bot.keys.TEST_SERVER_MOD_ID)
+        rsvp_dms_per_second = config_number(config, "rsvp_dms_per_second", DEFAULT_RSVP_DMS_PER_SECOND)
+        rsvp_fan_out_concurrency = config_number(config, "rsvp_fan_out_concurrency", DEFAULT_RSVP_FAN_OUT_CONCURRENCY,
+                                                 int)
+        rsvp_list_edit_window = config_number(config, "rsvp_list_edit_window", DEFAULT_RSVP_LIST_EDIT_WINDOW)
+        event_rename_window = config_number(config, "event_rename_window", DEFAULT_EVENT_RENAME_WINDOW)
+        rsvp_digest_interval = config_number(config, "rsvp_digest_interval", DEFAULT_RSVP_DIGEST_INTERVAL)
+        rsvp_digest_min_rsvps = config_number(config, "rsvp_digest_min_rsvps", DEFAULT_RSVP_DIGEST_MIN_RSVPS, int)
+        reminder_offsets = ReminderSchedule.parse_offsets(config.get("rsvp_reminder_offsets",
+                                                                     DEFAULT_RSVP_REMINDER_OFFSETS))
+
+        # Every value is valid by now and nothing below can fail or await, so the whole config is applied at once.
+        self.guild_configs = guild_configs
+        self.rsvp_dms_per_second = rsvp_dms_per_second
+        self.rsvp_fan_out_concurrency = rsvp_fan_out_concurrency
+        self.rsvp_list_edit_window = rsvp_list_edit_window
+        self.event_rename_window = event_rename_window
+        self.rsvp_digest_interval = rsvp_digest_interval
+        self.rsvp_digest_min_rsvps = rsvp_digest_min_rsvps
+        self.reminder_schedule.set_offsets(reminder_offsets, time.time())
+        self.arm_reminder_timer()
+        if rsvp_digest_interval > 0 and rsvp_digest_interval != self.send_rsvp_digests.seconds:
+            self.send_rsvp_digests.change_interval(seconds=rsvp_digest_interval)
+        self.event_config_mtime = config_mtime
+        for guild_config in guild_configs.values():
+            print(f"The IRL events channel ID of guild {guild_config.guild_id} was read as "
+                  f"{guild_config.irl_events_channel_id} from event_config.yaml")
+            print(f"The metroplex routes of guild {guild_config.guild_id} from event_config.yaml were "
+                  f"{list(guild_config.metro_routing.routes.values())}")
+
+    @tasks.loop(seconds=EVENT_CONFIG_POLL_SECONDS)
+    async def watch_event_config(self):
+        """
+        Reloads event_config.yaml whenever it changes, without restarting the bot.
+        """
+        try:
+            config_mtime = os.stat(self.event_config_path).st_mtime_ns
+            if config_mtime == self.event_config_mtime:
+                return
+            # Only try each version of the file once, even if it turns out to be broken.
+            self.event_config_mtime = config_mtime
+            previous_guild_ids = set(self.guild_configs)
+            await self.read_event_config()
+        except (OSError, yaml.YAMLError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Could not reload {self.event_config_path}, keeping the previous config: {e!r}")
+            return
+        # Guilds added to the config catch up in the background instead of delaying the next poll.
+        for guild_id in set(self.guild_configs) - previous_guild_ids:
+            task = asyncio.create_task(self.timed_phase(f"reconcile guild {guild_id}", self.reconcile_guild(guild_id)))
+            self._reconcile_tasks.add(task)
+            task.add_done_callback(self.forget_reconcile_task)
+
+    def forget_reconcile_task(self, task: asyncio.Task):
+        self._reconcile_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Reconciling a guild added to the config failed: {task.exception()!r}")
+
+    async def reconcile_guild(self, guild_id: int):
+        """
+        Brings the guild's event records in line with the guild using one snapshot of its scheduled events. The phases
+        do not depend on each other so they run concurrently, and the time taken by each one is reported.
+        """
+        reconciling = self._reconciling_guilds.setdefault(guild_id, asyncio.Lock())
+        if reconciling.locked():
+            logger.info(f"Skipping reconciliation of guild {guild_id} since one is already running.")
+            return
+        async with reconciling:
+            with rest_priority(BULK, job=f"reconcile:{guild_id}"):
+                await self._reconcile_guild(guild_id)
+
+    async def _reconcile_guild(self, guild_id: int):
+        start = time.perf_counter()
+        # Let resumed jobs finish first so that the snapshot already reflects their changes.
+        await asyncio.gather(*self.job_queue.running(guild_id, kinds=(ROLES_JOB, PURGE_JOB)), return_exceptions=True)
+        guild = await self.bot.resolver.guild(guild_id)
+        events = await guild.fetch_scheduled_events()
+        snapshot_time = time.perf_counter() - start
+        self.schedule_reminders(events)
+
+        phase_timings = await asyncio.gather(
+            self.timed_phase("late roles", self.add_all_late_roles(guild, events)),
+            self.timed_phase("unannounced reminders", self.remind_of_events(events)),
+            self.timed_phase("purge old events", self.purge_old_events(guild, events)),
+        )
+        report = ", ".join(f"{name} {elapsed:.2f}s" for name, elapsed in phase_timings)
+        print(f"Reconciled {len(events)} scheduled events for guild {guild_id} in {time.perf_counter() - start:.2f}s "
+              f"(snapshot {snapshot_time:.2f}s, {report})")
+
+    async def timed_phase(self, name: str, phase: Awaitable) -> Tuple[str, float]:
+        """
+        Runs one reconciliation phase, reporting failures to the bot owner without stopping the other phases.
+        """
+        start = time.perf_counter()
+        try:
+            await phase
+        except Exception as e:
+            logger.warning(f"Reconciliation phase '{name}' failed.")
+            await self.bot.notify_bot_owner(e)
+        return name, time.perf_counter() - start
 
     @commands.slash_command(name="refresh_event_roles",
                             description="Add any late event roles.")
-    async def command_refresh_event_roles(self, inter: AppCmdInter):
+    async def command_refresh_event_roles(self, inter: AppCmdInter, dry_run: bool = False):
+        await inter.response.defer(ephemeral=True)
         events = await inter.guild.fetch_scheduled_events()
-        await self.add_all_late_roles(inter.guild, events)
+        diffs = await self.add_all_late_roles(inter.guild, events, dry_run=dry_run)
+        summary = (f"{sum(len(diff.to_add) for diff in diffs)} roles to add and "
+                   f"{sum(len(diff.to_remove) for diff in diffs)} roles to remove across {len(diffs)} events.")
+        await inter.followup.send(("Dry run: " if dry_run else "Refreshed event roles: ") + summary, ephemeral=True)
 
-    async def add_all_late_roles(self, guild: disnake.Guild, events: List[disnake.GuildScheduledEvent]):
-        for event in events:
-            role_id = self.event_records.event_to_role.get(event.id)
-            if not role_id:
+    async def add_all_late_roles(self, guild: disnake.Guild, events: List[disnake.GuildScheduledEvent],
+                                 dry_run: bool = False) -> List[RoleDiff]:
+        """
+        Gives the event role to every subscriber missing it and takes it from anyone no longer subscribed.
+        """
+        managed_events = {event.id: event for event in events if event.id in self.event_records}
+        diffs = await asyncio.gather(*[self.diff_event_role(guild, event) for event in managed_events.values()])
+        diffs = [diff for diff in diffs if diff is not None]
+        if dry_run or not any(diffs):
+            return diffs
+
+        changes = self.role_reconciler.changes([diff for diff in diffs if diff])
+        event_names = {str(diff.event_id): managed_events[diff.event_id].name for diff in diffs if diff.to_add}
+        job = await self.job_queue.submit(ROLES_JOB, guild.id, {"event_names": event_names}, changes)
+        await self.job_queue.start(job, self.run_roles_job)
+        return diffs
+
+    async def run_roles_job(self, job: Job, on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+                            ) -> List[RoleChange]:
+        """
+        Applies the role changes in the job, then pings everyone who was given the role of a late event in the event's
+        thread. Each ping message sent is checkpointed in the job's params, so a resumed job does not ping anyone
+        twice. Returns the changes that failed.
+        """
+        await self.role_reconciler.apply(self.job_queue, job, on_progress=on_progress)
+        event_names = job.params["event_names"]
+        pinged: Dict[str, int] = job.params.setdefault("pinged", {})
+        added_by_event: Dict[int, List[int]] = {}
+        for event_id, role_id, action, user_id in await self.job_queue.items(job, DONE):
+            if action == ADD and str(event_id) in event_names:
+                added_by_event.setdefault(event_id, []).append(user_id)
+        for event_id, user_ids in sorted(added_by_event.items()):
+            event_thread = self.bot.get_channel(self.event_records.thread_id(event_id))
+            if not event_thread:
                 continue
-            event_role = guild.get_role(role_id)
-            users = await event.fetch_users()
-            for user in users:
-                if not user.get_role(role_id):
-                    await self.add_role_and_ping_in_thread(event, user)
+            verb = "is" if len(user_ids) == 1 else "are"
+            # Sorted so that the messages come out the same when the job resumes and the sent ones can be skipped.
+            suffix = f"{verb} interested in **{event_names[str(event_id)]}**!"
+            contents = chunk_mentions(sorted(user_ids), suffix=suffix)
+            for index in range(pinged.get(str(event_id), 0), len(contents)):
+                await event_thread.send(contents[index])
+                pinged[str(event_id)] = index + 1
+                await self.job_queue.save_params(job)
+        failed = await self.job_queue.items(job, FAILED)
+        await self.job_queue.finish(job)
+        return failed
+
+    async def diff_event_role(self, guild: disnake.Guild, event: disnake.GuildScheduledEvent) -> Optional[RoleDiff]:
+        event_role = await self.bot.resolver.role(guild.id, self.event_records.role_id(event.id))
+        if not event_role:
+            return None
+        return await self.role_reconciler.diff(event.id, event_role, iter_event_subscribers(event),
+                                               exempt_ids=[event.creator_id])
 
     async def remind_of_events(self, events: List[disnake.GuildScheduledEvent]):
-        bot_owner = self.bot.get_user(self.bot.keys.TEST_SERVER_MOD_ID)
-        for event in events:
-            if event.id not in self.event_records.event_to_thread.keys():
-                event_link = await get_event_link(event.guild_id, event.id)
-                await bot_owner.send(f"{event.name} hasn't been announced in the events channel!\n {event_link}")
+        unannounced = [event for event in events if event.id not in self.event_records]
+        if not unannounced:
+            return
+        moderators = {guild_id: await self.bot.get_or_fetch_user(self.moderator_id(guild_id))
+                      for guild_id in {event.guild_id for event in unannounced}}
+        await asyncio.gather(*[
+            moderators[event.guild_id].send(f"{event.name} hasn't been announced in the events channel!\n "
+                                            f"{await get_event_link(event.guild_id, event.id)}")
+            for event in unannounced])
 
     @commands.slash_command(name="purge_old_events",
                             description="Purge all the old events that have already been cancelled or deleted")
     async def command_purge_old_events(self, inter: AppCmdInter):
-        await self.purge_old_events(inter.guild)
+        await inter.response.defer(ephemeral=True)
+        if not self.is_event_admin(inter):
+            await inter.followup.send("Only the bot owner or the server's event moderator can use this command.",
+                                      ephemeral=True)
+            return
+        job = await self.purge_old_events(inter.guild)
+        if job is None:
+            await inter.followup.send("There are no old events to purge.", ephemeral=True)
+            return
+        await inter.followup.send(f"Purged {job.done} of {job.total} old events.", ephemeral=True)
+
+    async def purge_old_events(self, guild: disnake.Guild,
+                               events: List[disnake.GuildScheduledEvent] = None) -> Optional[Job]:
+        if events is None:
+            events = await guild.fetch_scheduled_events()
+        current_event_ids = {event.id for event in events}
+        old_event_ids = [event_id for event_id in self.event_records.event_ids(guild.id)
+                         if event_id not in current_event_ids]
+        if not old_event_ids:
+            return None
+        job = await self.job_queue.submit(PURGE_JOB, guild.id, {}, old_event_ids)
+        await self.job_queue.start(job, self.run_purge_job)
+        return job
+
+    async def run_purge_job(self, job: Job):
+        """
+        Deletes the events in the job one at a time, like the purge always has, since each deletion already fans out
+        over the event's RSVP messages. An event that could not be deleted keeps its record, so the next reconciliation
+        purges it again.
+        """
+        result = await self.job_queue.run(job, lambda event_id: self.event_dispatcher.submit(
+            event_id, lambda: self.delete_event(job.guild_id, event_id), coalesce="delete"), concurrency=1)
+        for event_id, error in result.failed:
+            logger.warning(f"Could not purge the event {event_id}: {error!r}")
+            await self.bot.notify_bot_owner(error)
+        await self.job_queue.finish(job)
 
-    async def purge_old_events(self, guild):
-        events = await guild.fetch_scheduled_events()
-        current_event_ids = [event.id for event in events]
-        event_record_ids = list(self.event_records.event_to_thread.keys())
-        for event_record_id in event_record_ids:
-            if event_record_id not in current_event_ids:
-                await self.delete_event(guild.id, event_record_id)
+    """ Job Queue """
+
+    def resume_jobs(self):
+        """
+        Resumes every job that was left unfinished when the bot stopped, skipping the items it had already done.
+        """
+        runners = {RSVP_JOB: self.run_rsvp_job, REMINDER_JOB: self.run_rsvp_job, ROLES_JOB: self.run_roles_job,
+                   PURGE_JOB: self.run_purge_job}
+
+        async def resume(job: Job):
+            print(f"Resuming {job.kind} job {job.job_id} in guild {job.guild_id} at {job.done}/{job.total} items")
+            try:
+                await runners[job.kind](job)
+            except Exception as e:
+                logger.warning(f"Job {job.job_id} ({job.kind}) failed and will be resumed on the next start.")
+                await self.bot.notify_bot_owner(e)
+
+        for job in list(self.job_queue.jobs.values()):
+            if not self.job_queue.is_running(job):
+                self.job_queue.start(job, resume)
+
+    @commands.slash_command(name="jobs", description="Show the queued bulk jobs and how far along each one is.")
+    async def command_jobs(self, inter: AppCmdInter):
+        if inter.author.id != self.bot.keys.BOT_OWNER_ID:
+            await inter.response.send_message("Only the bot owner can use this command.", ephemeral=True)
+            return
+        jobs = list(self.job_queue.jobs.values()) if self.job_queue else []
+        lines = [f"{len(jobs)} jobs queued with {sum(job.pending for job in jobs)} items left."]
+        for job in jobs:
+            state = "running" if self.job_queue.is_running(job) else "waiting"
+            lines.append(f"`{job.job_id}` **{job.kind}** in guild {job.guild_id}: {job.done}/{job.total} done, "
+                         f"{job.failed} failed, {state}, queued <t:{int(job.created_at)}:R>")
+        content = ""
+        for line in lines:
+            if len(content) + len(line) + 1 > 2000:
+                break
+            content += line + "\n"
+        await inter.response.send_message(content, ephemeral=True)
 
 
 async def get_event_link(guild_id: int, event_id: int) -> str:
@@ -436,38 +1134,57 @@ async def create_event_role(event_name: str, guild: disnake.Guild, metro_role_id
     return event_role
 
 
-async def add_event_role_to_users(event_role: disnake.Role,
-                                  event: disnake.GuildScheduledEvent,
-                                  metro_role_id: int):
+async def iter_event_subscribers(event: disnake.GuildScheduledEvent, page_size: int = 100):
     """
-    Create event role and add the role to all event subscribers. Then send the bot help message and add to record.
+    Yield every subscriber of the event, paging through the API since a single request returns at most 100 users.
     """
-    event_subscribers = await event.fetch_users()
-    for subscriber in event_subscribers:
-        await subscriber.add_roles(event_role)
-        logger.info(f"The role **{event_role.name}** has been added to {subscriber.display_name} ({subscriber.id})")
-    return event_role
+    after_id = None
+    while True:
+        page = await event.fetch_users(limit=page_size, after_id=after_id)
+        for subscriber in page:
+            yield subscriber
+        if len(page) < page_size:
+            return
+        after_id = max(subscriber.id for subscriber in page)
 
 
-async def get_empty_rsvp_embed(event_creator_id, event_name):
-    rsvp_embed = (disnake.Embed(title=f"RSVP List for {event_name}")
-                  .add_field(name="Going", value=f"<@{event_creator_id}>")
-                  .add_field(name="Maybe", value="* *")
-                  .add_field(name="Not Going", value="* *"))
-    return rsvp_embed
+def interaction_progress(inter: AppCmdInter, label: str) -> Callable[[int, int], Awaitable[None]]:
+    """
+    Progress callback that shows how far along a bulk operation is in the deferred interaction response.
+    """
+    async def report_progress(done: int, total: int):
+        try:
+            await inter.edit_original_message(content=f"{label}... ({done}/{total})")
+        except disnake.HTTPException:
+            pass
+    return report_progress
 
 
-async def get_metroplex_listed(input_string: str):
-    metroplex_regex = r"\[((?:DTX)|(?:SATX)|(?:ATX)|(?:HTX)|(?:FW)|(?:CSTAT)|(?:TX))\]"
-    metro_match = re.search(metroplex_regex, input_string)
-    if metro_match:
-        return metro_match[1]
+def config_number(config: dict, key: str, default: float, kind: type = float) -> float:
+    """
+    Reads a setting that has to be a number that is zero or more, raising ValueError or TypeError if it is not.
+    """
+    value = config.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{key} has to be a number that is zero or more, not {value!r}")
+    return kind(value)
 
 
-def get_key(my_dict, val):
-    for key, value in my_dict.items():
-        if val == value:
-            return key
+def chunk_mentions(user_ids: List[int], suffix: str = "", limit: int = 2000) -> List[str]:
+    """
+    Pack user mentions into as few messages as possible without going over the message length limit.
+    """
+    messages = []
+    current = ""
+    for user_id in user_ids:
+        mention = f"<@{user_id}> "
+        if len(current) + len(mention) + len(suffix) > limit:
+            messages.append(current + suffix)
+            current = ""
+        current += mention
+    if current:
+        messages.append(current + suffix)
+    return messages
 
 
 def setup(bot: SATXBot):
@@ -1,13 +1,24 @@
+import time
+# Taken before the other imports so that the startup report includes them.
+STARTED_AT = time.perf_counter()
+import asyncio
 import sys
-from typing import Any
+from typing import Any, Dict, List, Optional
 import disnake
 from disnake import ApplicationCommandInteraction
-from disnake.ext.commands import Bot, errors, Context
+from disnake.ext.commands import AutoShardedBot, Bot, errors, Context
 from cogs import cogs_to_include
 from datetime import datetime
 from dataclasses import dataclass
 import yaml
 from util import logger
+from util.botinfo import BotStats
+from util.command_sync import CommandSyncCache
+from util.my_logger import set_log_levels
+from util.metrics import instrument_http
+from util.resolver import Resolver
+from util.rest_scheduler import RestScheduler, prioritize_interactions, schedule_http
+from util.startup import StartupTimer
 import traceback
 
 
@@ -23,6 +34,16 @@ class Keys:
     BOT_PREFIX: str
     TEST_SERVER_ID: int
     TEST_SERVER_MOD_ID: int
+    METRICS_FILE: Optional[str] = None
+    GATEWAY_TRACE_FILE: Optional[str] = None
+    GUILD_IDS: Optional[List[int]] = None
+    SHARDED: bool = False
+    LOG_LEVELS: Optional[Dict[str, str]] = None
+
+    @property
+    def guild_ids(self) -> List[int]:
+        """Every guild the bot serves, which is only the test server unless GUILD_IDS is set."""
+        return self.GUILD_IDS or [self.TEST_SERVER_ID]
 
 def fancy_traceback(exc: Exception) -> str:
     """May not fit the message content limit"""
@@ -35,16 +56,63 @@ class SATXBot(Bot):
     """
 
     def __init__(self, bot_prefix: str, t_keys: Keys, **settings):
+        self.startup = StartupTimer(STARTED_AT)
+        self.startup.mark("imports")
         super(Bot, self).__init__(bot_prefix, **settings)
         self.keys = t_keys
+        self.command_sync_cache = CommandSyncCache()
+        self._command_preparation: Optional[asyncio.Task] = None
+        set_log_levels(t_keys.LOG_LEVELS)
+        self.resolver = Resolver(self)
+        instrument_http(self.http)
+        self.rest_scheduler = RestScheduler()
+        schedule_http(self.http, self.rest_scheduler)
+        prioritize_interactions(self)
+        self.stats = BotStats()
+        self.stats.attach(self)
         for cog in cogs_to_include:
             self.load_extension(f"cogs.{cog}")
+            self.startup.mark(f"load {cog}")
+
+    async def login(self, token: str):
+        await super().login(token)
+        self.startup.mark("login")
 
-        self.run(self.keys.BOT_TOKEN)
+    async def close(self):
+        # The command preparation waits for the first connect, which never comes if the bot closes before it.
+        if self._command_preparation and not self._command_preparation.done():
+            self._command_preparation.cancel()
+        await super().close()
+
+    async def on_connect(self):
+        if not self.startup.reported:
+            self.startup.mark("gateway connect")
 
     async def on_ready(self):
         print(f"{self.keys.BOT_NAME} is now ready at {datetime.now()}.\n"
-              f"{self.keys.BOT_NAME} is now active in test guild {self.keys.TEST_SERVER_ID}.")
+              f"{self.keys.BOT_NAME} is now active in guilds {self.keys.guild_ids}.")
+        self.startup.ready()
+
+    async def _prepare_application_commands(self):
+        """
+        Replaces disnake's startup sync, which fetches the commands of every scope and compares them with the code.
+        Commands only change with a deploy, so a restart with the same command tree reuses what the last sync left.
+        """
+        self._command_preparation = asyncio.current_task()
+        self._sync_queued = True
+        await self.wait_until_first_connect()
+        with self.startup.phase("command sync"):
+            fingerprint = self.command_sync_cache.fingerprint(self)
+            if self._sync_commands and self.command_sync_cache.restore(self, fingerprint):
+                logger.info("Skipped the command sync since the commands have not changed.")
+            else:
+                await self._cache_application_commands()
+                await self._sync_application_commands()
+                if self._sync_commands:
+                    self.command_sync_cache.save(self, fingerprint)
+            await self._cache_application_command_permissions()
+            await self._sync_application_command_permissions()
+        self._sync_queued = False
 
     async def notify_bot_owner(self, error):
         embed = disnake.Embed(
@@ -75,6 +143,12 @@ class SATXBot(Bot):
         await self.notify_bot_owner(sys.exc_info()[1])
 
 
+class ShardedSATXBot(SATXBot, AutoShardedBot):
+    """
+    Bot instance that splits its guilds across several gateway connections once it is in too many for one.
+    """
+
+
 if __name__ == '__main__':
     intents = disnake.Intents.default()
     intents.members = True  # turn on privileged members intent
@@ -86,8 +160,9 @@ if __name__ == '__main__':
         "case_insensitive": True,
         "owner_id": keys.BOT_OWNER_ID,
         "intents": intents,
-        "test_guilds": [keys.TEST_SERVER_ID],
-        "sync_commands_debug": True
+        "test_guilds": keys.guild_ids,
     }
 
-    bot = SATXBot(keys.BOT_PREFIX, keys, **options)
+    bot_class = ShardedSATXBot if keys.SHARDED else SATXBot
+    bot = bot_class(keys.BOT_PREFIX, keys, **options)
+    bot.run(keys.BOT_TOKEN)
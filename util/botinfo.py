@@ -1,4 +1,10 @@
-from main import Bot
+import functools
+from typing import Callable, Dict, Iterable, Optional
+import disnake
+from disnake.ext.commands import Bot
+from disnake.state import ConnectionState
+
+Parser = Callable[[dict], None]
 
 
 def get_bot_ping(bot: Bot) -> int:
@@ -13,21 +19,161 @@ def get_server_count(bot: Bot) -> int:
 
 def get_channel_count(bot: Bot) -> int:
     """Returns the channel count from all the guilds the bot is connected to."""
-    return sum([len(guild.channels) for guild in bot.guilds])
+    return bot.stats.totals.channels
 
 
 def get_text_channel_count(bot: Bot) -> int:
     """Returns the text channel count from all the guilds the bot is connected to."""
-    return sum([len(guild.text_channels) for guild in bot.guilds])
+    return bot.stats.totals.text_channels
 
 
 def get_voice_channel_count(bot: Bot) -> int:
     """Returns the voice channel count from all the guilds the bot is connected to."""
-    return sum([len(guild.voice_channels) for guild in bot.guilds])
+    return bot.stats.totals.voice_channels
 
 
 def get_user_count(bot: Bot) -> int:
     """Get the amount of users that the bot is watching over."""
-    member_count = sum([guild.member_count for guild in bot.guilds])
-    return member_count
+    return bot.stats.totals.members
+
+
+class GuildCounts:
+    """The channels and members of one guild, or of every guild together."""
+    __slots__ = ("channels", "text_channels", "voice_channels", "members")
+
+    def __init__(self, channels: int = 0, text_channels: int = 0, voice_channels: int = 0, members: int = 0):
+        self.channels = channels
+        self.text_channels = text_channels
+        self.voice_channels = voice_channels
+        self.members = members
+
+    @classmethod
+    def of(cls, guild: disnake.Guild) -> "GuildCounts":
+        counts = cls(members=guild.member_count or 0)
+        for channel in guild.channels:
+            counts.add_channel(channel, 1)
+        return counts
+
+    def add_channel(self, channel: disnake.abc.GuildChannel, amount: int):
+        self.channels += amount
+        if isinstance(channel, disnake.TextChannel):
+            self.text_channels += amount
+        elif isinstance(channel, disnake.VoiceChannel):
+            self.voice_channels += amount
+
+    def add(self, other: "GuildCounts", sign: int = 1):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + sign * getattr(other, name))
+
+
+class BotStats:
+    """
+    Bot-wide counts kept up to date from the gateway instead of walking every guild's cache, so reading any of them is
+    O(1). A guild is counted once from the cache when it is created, and then only the channel or member an event is
+    about is added or removed. Cogs add their own counts, like tracked events, as sources that are already O(1).
+    """
+
+    def __init__(self):
+        self.totals = GuildCounts()
+        self._guilds: Dict[int, GuildCounts] = {}
+        self._sources: Dict[str, Callable[[], int]] = {}
+        self._original_parsers: Dict[str, Parser] = {}
+
+    def rebuild(self, guilds: Iterable[disnake.Guild]):
+        """Counts every guild from scratch, which READY does because it starts a new session with an empty cache."""
+        self.totals = GuildCounts()
+        self._guilds.clear()
+        for guild in guilds:
+            self.set_guild(guild)
+
+    def set_guild(self, guild: disnake.Guild):
+        self.remove_guild(guild.id)
+        counts = self._guilds[guild.id] = GuildCounts.of(guild)
+        self.totals.add(counts)
+
+    def remove_guild(self, guild_id: int):
+        counts = self._guilds.pop(guild_id, None)
+        if counts:
+            self.totals.add(counts, -1)
+
+    def add_channel(self, channel: disnake.abc.GuildChannel, amount: int = 1):
+        counts = self._guilds.get(channel.guild.id)
+        if counts:
+            counts.add_channel(channel, amount)
+            self.totals.add_channel(channel, amount)
+
+    def set_member_count(self, guild: disnake.Guild):
+        counts = self._guilds.get(guild.id)
+        if counts and guild.member_count is not None:
+            self.totals.members += guild.member_count - counts.members
+            counts.members = guild.member_count
+
+    def add_source(self, name: str, source: Callable[[], int]):
+        """Adds a count that is kept elsewhere to the snapshot. The source has to be O(1) too."""
+        self._sources[name] = source
+
+    def remove_source(self, name: str):
+        self._sources.pop(name, None)
+
+    def snapshot(self) -> Dict[str, int]:
+        snapshot = {"servers": len(self._guilds), "channels": self.totals.channels,
+                    "text channels": self.totals.text_channels, "voice channels": self.totals.voice_channels,
+                    "users": self.totals.members}
+        snapshot.update((name, source()) for name, source in self._sources.items())
+        return snapshot
+
+    def attach(self, bot: Bot):
+        """Wraps the parsers of the gateway events that change the counts."""
+        state = bot._connection
+        parsers = state.parsers
+        for event, counter in (("READY", self._ready), ("GUILD_CREATE", self._guild_create),
+                               ("GUILD_DELETE", self._guild_delete), ("CHANNEL_CREATE", self._channel_create),
+                               ("CHANNEL_DELETE", self._channel_delete), ("GUILD_MEMBER_ADD", self._member_count),
+                               ("GUILD_MEMBER_REMOVE", self._member_count)):
+            self._original_parsers[event] = parsers[event]
+            parsers[event] = functools.partial(counter, state, parsers[event])
+
+    def detach(self, bot: Bot):
+        bot._connection.parsers.update(self._original_parsers)
+        self._original_parsers.clear()
+
+    def _ready(self, state: ConnectionState, parse: Parser, data: dict):
+        parse(data)
+        self.rebuild(state.guilds)
+
+    def _guild_create(self, state: ConnectionState, parse: Parser, data: dict):
+        parse(data)
+        guild = state._get_guild(int(data["id"]))
+        if guild:
+            self.set_guild(guild)
+
+    def _guild_delete(self, state: ConnectionState, parse: Parser, data: dict):
+        parse(data)
+        # A guild that only became unavailable stays in the cache, and its channels and members are still counted.
+        if state._get_guild(int(data["id"])) is None:
+            self.remove_guild(int(data["id"]))
+
+    def _channel_create(self, state: ConnectionState, parse: Parser, data: dict):
+        guild = state._get_guild(_optional_int(data.get("guild_id")))
+        existed = guild is not None and guild.get_channel(int(data["id"])) is not None
+        parse(data)
+        channel = guild.get_channel(int(data["id"])) if guild else None
+        if channel and not existed:
+            self.add_channel(channel)
+
+    def _channel_delete(self, state: ConnectionState, parse: Parser, data: dict):
+        guild = state._get_guild(_optional_int(data.get("guild_id")))
+        channel = guild.get_channel(int(data["id"])) if guild else None
+        parse(data)
+        if channel and guild.get_channel(channel.id) is None:
+            self.add_channel(channel, -1)
+
+    def _member_count(self, state: ConnectionState, parse: Parser, data: dict):
+        parse(data)
+        guild = state._get_guild(int(data["guild_id"]))
+        if guild:
+            self.set_member_count(guild)
+
 
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return None if value is None else int(value)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+from .my_logger import logger
+
+
+class EditCoalescer:
+    """
+    Merges bursts of edit requests for one message into a single edit per window.
+
+    The flush function is expected to render the latest state when it is called, so whatever changed during the window
+    is always included in the next edit and the last request is never dropped.
+    """
+
+    def __init__(self, flush: Callable[[], Awaitable[object]], window: float = 2.0, retries: int = 3):
+        self._flush = flush
+        self.window = window
+        self.retries = retries
+        self.requested = 0
+        self.flushed = 0
+        self.failed = 0
+        self.saved = 0
+        self._pending = 0
+        self._attempts = 0
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self):
+        self.requested += 1
+        self._pending += 1
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        while self._dirty:
+            await asyncio.sleep(self.window)
+            await self._flush_now()
+
+    async def _flush_now(self):
+        """
+        Sends one edit for every request since the last one that was sent. A failed edit is retried after the next
+        window, together with anything requested meanwhile, and only given up on after the coalescer's retries.
+        """
+        batch, self._pending = self._pending, 0
+        self._dirty = False
+        try:
+            await self._flush()
+        except asyncio.CancelledError:
+            self._pending += batch
+            self._dirty = True
+            raise
+        except Exception as e:
+            self.failed += 1
+            self._attempts += 1
+            if self._attempts <= self.retries:
+                logger.warning(f"Coalesced edit failed, retrying after {self.window}s: {e!r}")
+                self._pending += batch
+                self._dirty = True
+            else:
+                logger.warning(f"Coalesced edit failed {self._attempts} times, dropping it: {e!r}")
+                self._attempts = 0
+            return
+        self._attempts = 0
+        self.flushed += 1
+        # Only requests that made it into an edit that was sent count as merged.
+        self.saved += max(batch - 1, 0)
+
+    def cancel(self):
+        """Drops any pending edit, e.g. because the message it would edit is gone."""
+        self._dirty = False
+        self._pending = 0
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def flush(self):
+        """Sends any pending edit immediately instead of waiting for the window to end."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._dirty:
+            await self._flush_now()
+            if self._dirty:
+                self._task = asyncio.create_task(self._flush_after_window())
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+import disnake
+from disnake import ApplicationCommand
+from disnake.app_commands import application_command_factory
+from disnake.ext.commands import Bot
+from . import logger
+
+COMMAND_SYNC_CACHE = "./command_sync.json"
+# Commands edited by hand or by another copy of the bot are only noticed by a full sync, so do one at least this often.
+COMMAND_SYNC_MAX_AGE = 24 * 60 * 60
+
+sync_logger = logger.getChild("command_sync")
+
+
+class CommandSyncCache:
+    """
+    Remembers the commands Discord had after the last successful sync, together with a fingerprint of the command tree
+    that was synced. A restart with the same fingerprint loads those commands into disnake's cache instead of fetching
+    every scope and comparing it, so it makes no command requests at all.
+    """
+
+    def __init__(self, path: str = COMMAND_SYNC_CACHE, max_age: float = COMMAND_SYNC_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+
+    @staticmethod
+    def fingerprint(bot: Bot) -> str:
+        """Hash of every command body by scope, which changes whenever a sync could make requests."""
+        global_cmds, guild_cmds = bot._ordered_unsynced_commands(bot._test_guilds)
+        tree = {"disnake": disnake.__version__,
+                "application_id": bot._connection.application_id,
+                "global": _bodies(global_cmds),
+                "guilds": {str(guild_id): _bodies(cmds) for guild_id, cmds in guild_cmds.items()}}
+        return hashlib.sha256(json.dumps(tree, sort_keys=True).encode()).hexdigest()
+
+    def restore(self, bot: Bot, fingerprint: str) -> bool:
+        """Fills disnake's command cache from the file if it was written for the same fingerprint recently enough."""
+        try:
+            with open(self.path, "r") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            sync_logger.warning(f"Could not read the command sync cache {self.path}: {e!r}")
+            return False
+        if cache.get("fingerprint") != fingerprint or time.time() - cache.get("synced_at", 0) > self.max_age:
+            return False
+        state = bot._connection
+        state._global_application_commands = _commands(cache["global"])
+        for guild_id, commands in cache["guilds"].items():
+            state._guild_application_commands[int(guild_id)] = _commands(commands)
+        return True
+
+    def save(self, bot: Bot, fingerprint: str):
+        """
+        Writes the cached commands if every scope now matches the code. A sync that failed leaves them different, and
+        then the next start has to sync again.
+        """
+        state = bot._connection
+        global_cmds, guild_cmds = bot._ordered_unsynced_commands(bot._test_guilds)
+        scopes = [(global_cmds, state._global_application_commands)]
+        scopes += [(cmds, state._guild_application_commands.get(guild_id, {})) for guild_id, cmds in guild_cmds.items()]
+        if not all(_in_sync(cmds, synced) for cmds, synced in scopes):
+            sync_logger.warning("Commands are not in sync after syncing, so the command sync cache is not updated.")
+            return
+        cache = {"fingerprint": fingerprint,
+                 "synced_at": time.time(),
+                 "global": _payloads(state._global_application_commands),
+                 "guilds": {str(guild_id): _payloads(state._guild_application_commands.get(guild_id, {}))
+                            for guild_id in guild_cmds}}
+        try:
+            with open(f"{self.path}.tmp", "w") as f:
+                json.dump(cache, f)
+            os.replace(f"{self.path}.tmp", self.path)
+        except OSError as e:
+            sync_logger.warning(f"Could not write the command sync cache {self.path}: {e!r}")
+
+
+def _bodies(cmds: List[ApplicationCommand]) -> List[dict]:
+    return sorted((cmd.to_dict() for cmd in cmds), key=lambda body: (body["type"], body["name"]))
+
+
+def _in_sync(cmds: List[ApplicationCommand], synced: Dict[int, ApplicationCommand]) -> bool:
+    return len(cmds) == len(synced) and all(any(cmd == api_cmd for api_cmd in synced.values()) for cmd in cmds)
+
+
+def _payloads(commands: Dict[int, ApplicationCommand]) -> List[dict]:
+    return [{**cmd.to_dict(), "id": str(cmd.id), "application_id": str(cmd.application_id),
+             "guild_id": _optional_str(cmd.guild_id), "version": str(cmd.version)} for cmd in commands.values()]
+
+
+def _commands(payloads: List[dict]) -> Dict[int, ApplicationCommand]:
+    commands = [application_command_factory(payload) for payload in payloads]
+    return {cmd.id: cmd for cmd in commands}
+
+
+def _optional_str(value: Optional[int]) -> Optional[str]:
+    return None if value is None else str(value)
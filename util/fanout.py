@@ -0,0 +1,130 @@
+import asyncio
+import random
+import time
+import disnake
+from typing import Any, Awaitable, Callable, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RateLimiter:
+    """
+    Spaces out acquisitions so that no more than `rate` of them happen per second.
+    """
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def retry_delay(error: Exception, attempt: int, backoff: float) -> Optional[float]:
+    """
+    Returns how long to wait before retrying a failed request, or None if retrying would not help.
+    Rate limits (429) honor the Retry-After header and server errors back off exponentially with jitter.
+    """
+    if not isinstance(error, disnake.HTTPException):
+        return None
+    if error.status == 429:
+        retry_after = getattr(error.response, "headers", {}).get("Retry-After")
+        if retry_after:
+            return float(retry_after)
+    elif error.status < 500:
+        return None
+    return backoff * 2 ** attempt * (1 + random.random() / 2)
+
+
+class FanOutResult(Generic[T]):
+    """
+    Outcome of a fan-out: the worker results in completion order and the items that failed.
+    """
+
+    def __init__(self):
+        self.results: List[Any] = []
+        self.failed: List[Tuple[T, BaseException]] = []
+        self.retried: int = 0
+        self.elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return len(self.results) + len(self.failed)
+
+    @property
+    def throughput(self) -> float:
+        """Completed items per second."""
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+
+class FanOut(Generic[T]):
+    """
+    Runs a worker coroutine over many items with bounded concurrency and an optional throughput cap.
+
+    Discord's per-route buckets are enforced by the HTTP client itself, so the fan-out only has to keep enough
+    requests in flight to make use of them without flooding the global limit.
+    """
+
+    def __init__(self,
+                 worker: Callable[[T], Awaitable[Any]],
+                 *,
+                 concurrency: int = 8,
+                 rate: Optional[float] = None,
+                 on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+                 progress_every: int = 25,
+                 retries: int = 0,
+                 backoff: float = 1.0):
+        self.worker = worker
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(rate)
+        self.on_progress = on_progress
+        self.progress_every = max(1, progress_every)
+        self.retries = retries
+        self.backoff = backoff
+
+    async def run(self, items: Iterable[T]) -> FanOutResult[T]:
+        items = list(items)
+        result: FanOutResult[T] = FanOutResult()
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        start = time.monotonic()
+
+        async def consume():
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result.results.append(await self._attempt(item, result))
+                except Exception as e:
+                    result.failed.append((item, e))
+                if self.on_progress and result.done % self.progress_every == 0 and result.done < len(items):
+                    await self.on_progress(result.done, len(items))
+
+        await asyncio.gather(*(consume() for _ in range(min(self.concurrency, len(items)))))
+        result.elapsed = time.monotonic() - start
+        return result
+
+    async def _attempt(self, item: T, result: FanOutResult[T]) -> Any:
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                return await self.worker(item)
+            except Exception as e:
+                delay = retry_delay(e, attempt, self.backoff) if attempt < self.retries else None
+                if delay is None:
+                    raise
+            attempt += 1
+            result.retried += 1
+            await asyncio.sleep(delay)
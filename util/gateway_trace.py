@@ -0,0 +1,98 @@
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from disnake.ext.commands import Bot
+
+# Raw gateway events that are recorded. Replaying them through the bot's parsers reproduces the same dispatches.
+TRACED_EVENTS = (
+    "GUILD_SCHEDULED_EVENT_CREATE",
+    "GUILD_SCHEDULED_EVENT_UPDATE",
+    "GUILD_SCHEDULED_EVENT_DELETE",
+    "GUILD_SCHEDULED_EVENT_USER_ADD",
+    "GUILD_SCHEDULED_EVENT_USER_REMOVE",
+    "INTERACTION_CREATE",
+)
+
+TraceEntry = Tuple[float, str, dict]
+
+
+class GatewayTraceRecorder:
+    """
+    Writes the raw payloads of the traced gateway events to a JSONL file as they arrive. The first line is a header
+    describing the bot's state when recording started and every following line is {"t": seconds, "e": event, "d": data}.
+    The path is passed through strftime so that each run can write to a new file.
+
+    Like the log handler, the recorder only puts entries on a queue, and a writer thread serializes and writes them,
+    so the event loop never waits on the disk. Payloads are not copied, which is safe because parsers only read them.
+    """
+
+    def __init__(self, path: str, header: Optional[dict] = None, flush_every: int = 50):
+        self.path = datetime.now().strftime(path)
+        self.flush_every = flush_every
+        self.recorded = 0
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._started = time.monotonic()
+        self._original_parsers: Dict[str, Callable] = {}
+        self._queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+        self._queue.put({"trace": 1, "started": datetime.now().isoformat(), **(header or {})})
+        self._writer = threading.Thread(target=self._write_entries, name="gateway-trace", daemon=True)
+        self._writer.start()
+
+    def attach(self, bot: Bot):
+        parsers = bot._connection.parsers
+        for event in TRACED_EVENTS:
+            self._original_parsers[event] = parsers[event]
+            parsers[event] = self._recording(event, parsers[event])
+
+    def detach(self, bot: Bot):
+        bot._connection.parsers.update(self._original_parsers)
+        self._original_parsers.clear()
+
+    def _recording(self, event: str, parser: Callable[[dict], None]) -> Callable[[dict], None]:
+        def record_and_parse(data: dict):
+            self.record(event, data)
+            parser(data)
+        return record_and_parse
+
+    def record(self, event: str, data: dict):
+        if event == "INTERACTION_CREATE":
+            # The token can respond to the interaction for 15 minutes, so it is never written out.
+            data = {key: value for key, value in data.items() if key != "token"}
+        self._queue.put({"t": round(time.monotonic() - self._started, 3), "e": event, "d": data})
+        self.recorded += 1
+
+    def _write_entries(self):
+        """Runs on the writer thread until close() puts None on the queue."""
+        written = 0
+        for entry in iter(self._queue.get, None):
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            written += 1
+            if written % self.flush_every == 0 or self._queue.empty():
+                self._file.flush()
+
+    def close(self):
+        """Writes every entry that is still queued and closes the file."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_trace(path: str) -> Tuple[dict, List[TraceEntry]]:
+    """
+    Returns the header of a trace and its (seconds, event, data) entries in order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        return header, list(_entries(f))
+
+
+def _entries(lines: Iterator[str]) -> Iterator[TraceEntry]:
+    for line in lines:
+        if line.strip():
+            entry = json.loads(line)
+            yield entry["t"], entry["e"], entry["d"]
@@ -0,0 +1,95 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+from .metrics import metrics
+
+
+class _Work:
+    __slots__ = ("work", "coalesce", "future", "queued_at", "started")
+
+    def __init__(self, work: Callable[[], Awaitable[Any]], coalesce: Optional[Hashable]):
+        self.work = work
+        self.coalesce = coalesce
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.perf_counter()
+        self.started = False
+
+
+class KeyedDispatcher:
+    """
+    Runs work one item at a time per key, in the order it was submitted, while work for different keys runs
+    concurrently. A key only has a queue and a worker task while it has work, so idle keys cost nothing.
+
+    Work submitted with the same coalesce key as the last item still waiting for its key joins that item instead of
+    running again, so a duplicate gateway event is handled once. Work must never wait on other work for its own key.
+    The depth of every busy key is kept in the `dispatch_queue_depth` gauge.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.coalesced = 0
+        self._queues: Dict[Hashable, Deque[_Work]] = {}
+        # The worker task of every busy key, kept so that it is not garbage collected while it runs.
+        self._drainers: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        """Number of keys with work queued or running."""
+        return len(self._queues)
+
+    def depth(self, key: Hashable) -> int:
+        queue = self._queues.get(key)
+        return len(queue) if queue else 0
+
+    def depths(self) -> Dict[Hashable, int]:
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    def submit(self, key: Hashable, work: Callable[[], Awaitable[Any]],
+               coalesce: Optional[Hashable] = None) -> Awaitable[Any]:
+        """
+        Queues the work for the key and returns an awaitable of its result. Cancelling the awaitable does not cancel
+        the work, since other submissions may have been coalesced into it.
+        """
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            # The worker runs work from every later submitter too, so it starts from an empty context instead of
+            # inheriting the first submitter's, such as its REST priority.
+            self._drainers[key] = contextvars.Context().run(asyncio.create_task, self._drain(key, queue))
+        elif coalesce is not None and not queue[-1].started and queue[-1].coalesce == coalesce:
+            self.coalesced += 1
+            metrics.increment("dispatch_coalesced_total", dispatcher=self.name)
+            return asyncio.shield(queue[-1].future)
+        item = _Work(work, coalesce)
+        queue.append(item)
+        self._report_depth(key, len(queue))
+        return asyncio.shield(item.future)
+
+    async def _drain(self, key: Hashable, queue: Deque[_Work]):
+        try:
+            while queue:
+                item = queue[0]
+                item.started = True
+                metrics.observe("dispatch_wait_seconds", time.perf_counter() - item.queued_at, dispatcher=self.name)
+                try:
+                    item.future.set_result(await item.work())
+                except asyncio.CancelledError:
+                    item.future.cancel()
+                    raise
+                except Exception as e:
+                    item.future.set_exception(e)
+                finally:
+                    queue.popleft()
+                    self._report_depth(key, len(queue))
+        finally:
+            del self._queues[key]
+            del self._drainers[key]
+            for item in queue:
+                item.future.cancel()
+
+    def _report_depth(self, key: Hashable, depth: int):
+        if depth:
+            metrics.set_gauge("dispatch_queue_depth", depth, dispatcher=self.name, key=key)
+        else:
+            metrics.remove_gauge("dispatch_queue_depth", dispatcher=self.name, key=key)
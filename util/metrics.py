@@ -0,0 +1,196 @@
+import asyncio
+import bisect
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from disnake.http import HTTPClient, Route
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# The "METHOD /path" route of the REST request running in the current task, so rate limits get the same route label.
+_rest_route: ContextVar[Optional[str]] = ContextVar("rest_route", default=None)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Quantiles are estimated from the bucket bounds.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound if bound != float("inf") else self.buckets[-2]
+        return self.buckets[-2]
+
+
+class Metrics:
+    """
+    In-process registry of counters, gauges, and latency histograms keyed by metric name and labels.
+    """
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def increment(self, name: str, amount: float = 1, **labels: str):
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        self.gauges[(name, _labels(labels))] = value
+
+    def remove_gauge(self, name: str, **labels: str):
+        self.gauges.pop((name, _labels(labels)), None)
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counters_named(self, name: str) -> Dict[Labels, float]:
+        return {labels: value for (metric, labels), value in self.counters.items() if metric == name}
+
+    def gauges_named(self, name: str) -> Dict[Labels, float]:
+        return {labels: value for (metric, labels), value in self.gauges.items() if metric == name}
+
+    def histograms_named(self, name: str) -> Dict[Labels, Histogram]:
+        return {labels: histogram for (metric, labels), histogram in self.histograms.items() if metric == name}
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Writes the Prometheus text format atomically so that a scraper never reads a partial file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+metrics = Metrics()
+
+
+def timed_listener(func: Callable) -> Callable:
+    """
+    Records the latency of a cog listener in the `listener_seconds` histogram.
+    Apply it below @commands.Cog.listener() so the listener keeps its name.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with metrics.timer("listener_seconds", listener=func.__name__):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def instrument_http(http: HTTPClient):
+    """
+    Counts and times every REST request per route, and counts the 429 responses that disnake retries internally.
+    """
+    request = http.request
+
+    @functools.wraps(request)
+    async def timed_request(route: Route, **kwargs):
+        route_name = f"{route.method} {route.path}"
+        metrics.increment("rest_requests_total", route=route_name)
+        token = _rest_route.set(route_name)
+        start = time.perf_counter()
+        try:
+            return await request(route, **kwargs)
+        except Exception as e:
+            metrics.increment("rest_errors_total", route=route_name, status=getattr(e, "status", "error"))
+            raise
+        finally:
+            metrics.observe("rest_request_seconds", time.perf_counter() - start, route=route_name)
+            _rest_route.reset(token)
+
+    http.request = timed_request
+    logging.getLogger("disnake.http").addHandler(_RateLimitCounter())
+
+
+class _RateLimitCounter(logging.Handler):
+    """
+    disnake sleeps and retries on a 429 itself, so rate limits are only visible through its warning log records. They
+    are logged from the request's own task, which still has its route set.
+    """
+
+    def emit(self, record: logging.LogRecord):
+        if not isinstance(record.msg, str):
+            return
+        if record.msg.startswith("We are being rate limited") and len(record.args) == 2:
+            metrics.increment("rest_rate_limits_total", route=_rest_route.get() or "unknown")
+        elif record.msg.startswith("Global rate limit"):
+            metrics.increment("rest_rate_limits_total", route="global")
+
+
+async def sample_event_loop():
+    """
+    Records how many callbacks are waiting to run on the event loop and how long it takes to get through them.
+    A growing queue or lag means the loop is saturated.
+    """
+    loop = asyncio.get_running_loop()
+    ready = getattr(loop, "_ready", None)
+    if ready is not None:
+        metrics.set_gauge("event_loop_ready_callbacks", len(ready))
+    metrics.set_gauge("event_loop_tasks", len(asyncio.all_tasks(loop)))
+    start = loop.time()
+    await asyncio.sleep(0)
+    metrics.observe("event_loop_lag_seconds", loop.time() - start)
@@ -1,16 +1,106 @@
+import atexit
 import logging
+import queue
 from datetime import date
-from os import path, mkdir
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener
+from os import path, mkdir, replace
+from typing import Dict, Optional
 import disnake
 
-_log_level = "info"
-
 _log_folder_name = "Logs"
 if not path.exists(_log_folder_name):
     mkdir(_log_folder_name)
 
+# Log files are started anew each day and whenever they grow past this size.
+LOG_FILE_MAX_BYTES = 20 * 1024 * 1024
+
+# Level of each subsystem's logger. Subsystems are children of the shared logger, e.g. logger.getChild("rsvp").
+LOG_LEVELS: Dict[str, str] = {
+    "disnake": "info",
+    "disnake.gateway": "info",
+    "disnake.http": "info",
+    "disnake.rsvp": "info",
+    "disnake.roles": "info",
+    "disnake.jobs": "info",
+}
+
+# Fields passed with `extra=` that are appended to the log line, e.g. extra={"event_id": event.id}.
+STRUCTURED_FIELDS = ("guild_id", "event_id", "user_id", "role_id")
+
+
+class DatedRotatingFileHandler(BaseRotatingHandler):
+    """
+    Writes to Logs/<date>-info.log, moving to a new file when the date changes. A file that grows past `max_bytes` is
+    renamed to <date>-info.1.log, <date>-info.2.log, ... and a fresh one is started.
+    """
+
+    def __init__(self, folder: str, name: str = "info", max_bytes: int = LOG_FILE_MAX_BYTES):
+        self.folder = folder
+        self.name_suffix = name
+        self.max_bytes = max_bytes
+        self.day = date.today()
+        super().__init__(self._path(self.day), "a", encoding="utf-8", delay=True)
+
+    def _path(self, day: date, part: Optional[int] = None) -> str:
+        return path.abspath(path.join(self.folder, f"{day}-{self.name_suffix}{f'.{part}' if part else ''}.log"))
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if date.today() != self.day:
+            return True
+        if self.stream is None:
+            self.stream = self._open()
+        return self.max_bytes > 0 and self.stream.tell() >= self.max_bytes
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        today = date.today()
+        if today == self.day:
+            part = 1
+            while path.exists(self._path(today, part)):
+                part += 1
+            replace(self.baseFilename, self._path(today, part))
+        self.day = today
+        self.baseFilename = self._path(today)
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Appends the structured fields of a record to its message as key=value pairs.
+    """
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        fields = " ".join(f"{field}={getattr(record, field)}" for field in STRUCTURED_FIELDS if hasattr(record, field))
+        return f"{message} [{fields}]" if fields else message
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Puts records on the queue as they are, so that their messages are formatted on the listener thread instead of the
+    event loop. Arguments should be values that do not change after they are logged, such as names and IDs.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def set_log_levels(levels: Optional[Dict[str, str]] = None):
+    """
+    Sets the level of each subsystem's logger by name, e.g. {"disnake.rsvp": "debug"}.
+    """
+    for name, level in {**LOG_LEVELS, **(levels or {})}.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+
 logger = logging.getLogger('disnake')
-logger.setLevel(logging.INFO if _log_level == "info" else logging.DEBUG)
-_handler = logging.FileHandler(filename=f'{_log_folder_name}/{date.today()}-info.log', encoding='utf-8')
-_handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-logger.addHandler(_handler)
+set_log_levels()
+_handler = DatedRotatingFileHandler(_log_folder_name)
+_handler.setFormatter(StructuredFormatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+# Only the listener thread touches the disk, so a slow write never holds up the event loop.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = QueueListener(_log_queue, _handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+logger.addHandler(LazyQueueHandler(_log_queue))
@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Union
+import disnake
+from disnake.ext.commands import Bot
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least recently used cache whose entries also expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Caches the value for `ttl` seconds, or for the cache's own TTL if it is not given."""
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Resolver:
+    """
+    Resolves guilds, roles, channels, and messages from the gateway cache first, then from its own TTL cache, and only
+    then over REST. Cached objects are dropped when the gateway reports that they changed or were deleted. A role that
+    REST does not have either is cached as missing for `miss_ttl` seconds, so records of deleted roles do not fetch
+    every role of the guild on each lookup.
+    """
+
+    def __init__(self, bot: Bot, ttl: float = 300.0, maxsize: int = 1024, miss_ttl: float = 30.0):
+        self.bot = bot
+        self.cache = TTLCache(ttl, maxsize)
+        self.miss_ttl = miss_ttl
+        self.gateway_hits = 0
+        self.cache_hits = 0
+        self.rest_calls = 0
+        for listener in (self.on_guild_role_update, self.on_guild_role_delete,
+                         self.on_guild_channel_update, self.on_guild_channel_delete,
+                         self.on_thread_update, self.on_thread_delete,
+                         self.on_raw_message_edit, self.on_raw_message_delete):
+            bot.add_listener(listener)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.gateway_hits + self.cache_hits + self.rest_calls
+        return {"gateway_hits": self.gateway_hits,
+                "cache_hits": self.cache_hits,
+                "rest_calls": self.rest_calls,
+                "hit_rate": (self.gateway_hits + self.cache_hits) / lookups if lookups else 1.0,
+                "cached": len(self.cache)}
+
+    def _from_caches(self, gateway_value: Any, key: Hashable) -> Any:
+        if gateway_value is not None:
+            self.gateway_hits += 1
+            return gateway_value
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.cache_hits += 1
+        return cached
+
+    async def guild(self, guild_id: int) -> disnake.Guild:
+        guild = self._from_caches(self.bot.get_guild(guild_id), ("guild", guild_id))
+        if guild is _MISSING:
+            self.rest_calls += 1
+            guild = await self.bot.fetch_guild(guild_id)
+            self.cache.set(("guild", guild_id), guild)
+        return guild
+
+    async def role(self, guild_id: int, role_id: int) -> Optional[disnake.Role]:
+        guild = self.bot.get_guild(guild_id)
+        role = self._from_caches(guild.get_role(role_id) if guild else None, ("role", role_id))
+        if role is _MISSING:
+            self.rest_calls += 1
+            guild = guild or await self.guild(guild_id)
+            role = None
+            for fetched_role in await guild.fetch_roles():
+                self.cache.set(("role", fetched_role.id), fetched_role)
+                if fetched_role.id == role_id:
+                    role = fetched_role
+            if role is None:
+                self.cache.set(("role", role_id), None, ttl=self.miss_ttl)
+        return role
+
+    async def channel(self, channel_id: int) -> Union[disnake.abc.GuildChannel, disnake.Thread]:
+        channel = self._from_caches(self.bot.get_channel(channel_id), ("channel", channel_id))
+        if channel is _MISSING:
+            self.rest_calls += 1
+            channel = await self.bot.fetch_channel(channel_id)
+            self.cache.set(("channel", channel_id), channel)
+        return channel
+
+    async def message(self, channel: disnake.abc.Messageable, message_id: int) -> disnake.Message:
+        message = self._from_caches(self.bot.get_message(message_id), ("message", message_id))
+        if message is _MISSING:
+            self.rest_calls += 1
+            message = await channel.fetch_message(message_id)
+            self.cache.set(("message", message_id), message)
+        return message
+
+    """ Invalidation """
+
+    async def on_guild_role_update(self, before: disnake.Role, after: disnake.Role):
+        self.cache.pop(("role", after.id))
+
+    async def on_guild_role_delete(self, role: disnake.Role):
+        self.cache.pop(("role", role.id))
+
+    async def on_guild_channel_update(self, before: disnake.abc.GuildChannel, after: disnake.abc.GuildChannel):
+        self.cache.pop(("channel", after.id))
+
+    async def on_guild_channel_delete(self, channel: disnake.abc.GuildChannel):
+        self.cache.pop(("channel", channel.id))
+
+    async def on_thread_update(self, before: disnake.Thread, after: disnake.Thread):
+        self.cache.pop(("channel", after.id))
+
+    async def on_thread_delete(self, thread: disnake.Thread):
+        self.cache.pop(("channel", thread.id))
+
+    async def on_raw_message_edit(self, payload: disnake.RawMessageUpdateEvent):
+        self.cache.pop(("message", payload.message_id))
+
+    async def on_raw_message_delete(self, payload: disnake.RawMessageDeleteEvent):
+        self.cache.pop(("message", payload.message_id))
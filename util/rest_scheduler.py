@@ -0,0 +1,153 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional, Tuple
+from disnake.ext.commands import Bot
+from disnake.http import HTTPClient, Route
+from .metrics import metrics
+
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BULK: "bulk"}
+
+DEFAULT_MAX_IN_FLIGHT = 24
+# Bulk jobs together never use more than this many of the slots, so a request someone is waiting on always gets one.
+DEFAULT_BULK_IN_FLIGHT = 16
+# Bulk requests per second, kept under Discord's global limit of 50 so that the rest still fit in it.
+DEFAULT_BULK_RATE = 40.0
+
+_rest_priority: ContextVar[Tuple[int, Optional[str]]] = ContextVar("rest_priority", default=(NORMAL, None))
+
+
+@contextmanager
+def rest_priority(priority: int, job: Optional[str] = None) -> Iterator[None]:
+    """
+    Sends the REST requests made inside the block, including those of tasks started in it, with the priority.
+    Requests of different bulk jobs take turns, so one large job cannot hold up another.
+    """
+    token = _rest_priority.set((priority, job))
+    try:
+        yield
+    finally:
+        _rest_priority.reset(token)
+
+
+class RestScheduler:
+    """
+    Decides which REST request is sent next when more are waiting than there are slots. Interactive requests go first,
+    then normal ones, then bulk ones round robin by job. Bulk requests are also limited in how many slots they take and
+    how fast they start.
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, bulk_in_flight: int = DEFAULT_BULK_IN_FLIGHT,
+                 bulk_rate: Optional[float] = DEFAULT_BULK_RATE):
+        self.max_in_flight = max_in_flight
+        self.bulk_in_flight = min(bulk_in_flight, max_in_flight)
+        self.bulk_rate = bulk_rate
+        self.in_flight = 0
+        self.bulk_running = 0
+        self._next_bulk_start = 0.0
+        self._bulk_timer: Optional[asyncio.TimerHandle] = None
+        self._waiting: Dict[int, "OrderedDict[Optional[str], Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_NAMES}
+
+    def waiting(self, priority: int) -> int:
+        return sum(len(futures) for futures in self._waiting[priority].values())
+
+    def _has_room(self, priority: int) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        if priority == BULK:
+            return self.bulk_running < self.bulk_in_flight and time.monotonic() >= self._next_bulk_start
+        return True
+
+    def _start(self, priority: int):
+        self.in_flight += 1
+        if priority == BULK:
+            self.bulk_running += 1
+            if self.bulk_rate:
+                self._next_bulk_start = max(time.monotonic(), self._next_bulk_start) + 1 / self.bulk_rate
+
+    async def acquire(self, priority: int, job: Optional[str] = None):
+        """Waits for a slot. Every acquire must be followed by a release with the same priority."""
+        if self._has_room(priority) and not any(self._waiting[p] for p in PRIORITY_NAMES if p <= priority):
+            self._start(priority)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[priority].setdefault(job, deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the request was cancelled, so pass it on.
+                self.release(priority)
+            raise
+
+    def release(self, priority: int):
+        self.in_flight -= 1
+        if priority == BULK:
+            self.bulk_running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        for priority in sorted(self._waiting):
+            jobs = self._waiting[priority]
+            while jobs and self._has_room(priority):
+                job, futures = next(iter(jobs.items()))
+                future = futures.popleft()
+                if futures:
+                    jobs.move_to_end(job)
+                else:
+                    del jobs[job]
+                if not future.cancelled():
+                    self._start(priority)
+                    future.set_result(None)
+        if (self._waiting[BULK] and self._bulk_timer is None and self.in_flight < self.max_in_flight
+                and self.bulk_running < self.bulk_in_flight):
+            # Bulk requests are only waiting for the rate limit, so nothing else would wake them.
+            delay = max(0.0, self._next_bulk_start - time.monotonic())
+            self._bulk_timer = asyncio.get_running_loop().call_later(delay, self._wake_bulk)
+
+    def _wake_bulk(self):
+        self._bulk_timer = None
+        self._dispatch()
+
+
+def schedule_http(http: HTTPClient, scheduler: RestScheduler):
+    """
+    Sends every request of the client through the scheduler and records how long each one waited for a slot in the
+    `rest_queue_seconds` histogram by priority.
+    """
+    request = http.request
+
+    @functools.wraps(request)
+    async def scheduled_request(route: Route, **kwargs):
+        priority, job = _rest_priority.get()
+        queued_at = time.perf_counter()
+        await scheduler.acquire(priority, job)
+        metrics.observe("rest_queue_seconds", time.perf_counter() - queued_at, priority=PRIORITY_NAMES[priority])
+        try:
+            return await request(route, **kwargs)
+        finally:
+            scheduler.release(priority)
+
+    http.request = scheduled_request
+
+
+def prioritize_interactions(bot: Bot):
+    """
+    Makes the REST requests of every interaction handler interactive. The handlers are started while the gateway
+    payload is parsed, so they inherit the priority set around the parser.
+    """
+    parsers = bot._connection.parsers
+    parse_interaction = parsers["INTERACTION_CREATE"]
+
+    def parse_interactive(data: dict):
+        with rest_priority(INTERACTIVE):
+            parse_interaction(data)
+    parsers["INTERACTION_CREATE"] = parse_interactive
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from .metrics import metrics
+
+
+class StartupTimer:
+    """
+    Times the phases of startup from when the process started, such as loading cogs, connecting to the gateway,
+    syncing commands and reconciling, and prints them as one report once the bot is ready and every phase has ended.
+    Phases may overlap, so each one is reported with when it started as well as how long it took.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.phases: List[Tuple[str, float, float]] = []
+        self.reported = False
+        self._last_mark = self.started_at
+        self._open = 0
+        self._ready = False
+
+    def mark(self, name: str):
+        """Ends a phase that started where the previous mark ended, e.g. "imports" or "gateway connect"."""
+        now = time.perf_counter()
+        self._record(name, self._last_mark, now)
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times the block as a phase. Phases started after the report has been printed are not timed."""
+        if self.reported:
+            yield
+            return
+        start = time.perf_counter()
+        self._open += 1
+        try:
+            yield
+        finally:
+            self._open -= 1
+            self._record(name, start, time.perf_counter())
+            self._report_if_done()
+
+    def ready(self):
+        """
+        Marks the bot ready. The report is printed once the phases that started in response, like reconciliation in
+        the cogs' on_ready listeners, have ended too.
+        """
+        if self._ready:
+            return
+        self._ready = True
+        self.mark("ready")
+        # Listeners of the same event are started together, so theirs run before this callback.
+        asyncio.get_running_loop().call_soon(self._report_if_done)
+
+    def report(self) -> str:
+        total = max(start + seconds for _, start, seconds in self.phases) if self.phases else 0.0
+        lines = [f"Startup took {total:.2f}s:"]
+        width = max((len(name) for name, *_ in self.phases), default=0)
+        lines += [f"  {name:<{width}}  at {start:6.2f}s  took {seconds:6.2f}s"
+                  for name, start, seconds in sorted(self.phases, key=lambda phase: phase[1])]
+        return "\n".join(lines)
+
+    def _record(self, name: str, start: float, end: float):
+        if self.reported:
+            return
+        self.phases.append((name, start - self.started_at, end - start))
+        metrics.set_gauge("startup_phase_seconds", end - start, phase=name)
+
+    def _report_if_done(self):
+        if self._ready and not self._open and not self.reported:
+            print(self.report())
+            self.reported = True